@@ -10,8 +10,10 @@ PROMPT_PATH = Path(__file__).resolve().parents[1] / "shared" / "prompts" / "syst
 
 
 @function_tool
-def search_products(keywords: str, category: str | None = None, limit: int = 3):
-    return shared_tools.search_products(keywords, category, limit)
+def search_products(
+    keywords: str, category: str | None = None, limit: int = 3, ranked: bool = False
+):
+    return shared_tools.search_products(keywords, category, limit, ranked)
 
 
 @function_tool
@@ -19,6 +21,11 @@ def get_pricing(sku: str, quantity: int = 1, promo_code: str | None = None):
     return shared_tools.get_pricing(sku, quantity, promo_code)
 
 
+@function_tool
+def quote_cart(lines: list[shared_tools.CartLine], promo_code: str | None = None):
+    return shared_tools.quote_cart(lines, promo_code)
+
+
 @function_tool
 def check_order_status(order_id: str):
     return shared_tools.check_order_status(order_id)
@@ -43,6 +50,7 @@ def build_agent(model: str = "gpt-4o-mini") -> Agent:
         tools=[
             search_products,
             get_pricing,
+            quote_cart,
             check_order_status,
             open_support_ticket,
         ],
@@ -5,6 +5,7 @@ from pathlib import Path
 from agents import Agent, Runner, function_tool
 
 from shared import (
+    catalog_search,
     mcp_calendar_tools,
     mcp_hubspot_tools,
     mysql_tools,
@@ -25,11 +26,21 @@ def search_product_vectors(query: str, limit: int = 3):
     return qdrant_tools.search_product_vectors(query, limit)
 
 
+@function_tool
+def search_catalog(query: str, category: str | None = None, limit: int = 5):
+    return catalog_search.search_catalog(query, category, limit)
+
+
 @function_tool
 def get_pricing(sku: str, quantity: int = 1, promo_code: str | None = None):
     return shared_tools.get_pricing(sku, quantity, promo_code)
 
 
+@function_tool
+def quote_cart(lines: list[shared_tools.CartLine], promo_code: str | None = None):
+    return shared_tools.quote_cart(lines, promo_code)
+
+
 @function_tool
 def check_order_status(order_id: str):
     return shared_tools.check_order_status(order_id)
@@ -62,8 +73,8 @@ def get_ticket(ticket_id: str):
 
 
 @function_tool
-def list_open_tickets(limit: int = 10):
-    return mysql_tools.list_open_tickets(limit)
+def list_open_tickets(limit: int = 10, cursor: str | None = None):
+    return mysql_tools.list_open_tickets(limit, cursor)
 
 
 @function_tool
@@ -130,13 +141,16 @@ def create_crm_contact(
 
 
 def build_sales_agent(model: str = "gpt-4o-mini") -> Agent:
+    qdrant_tools.start_warm_up()
     return Agent(
         name="DriftDesk Sales",
         instructions=_load_prompt("sales.md"),
         model=model,
         tools=[
+            search_catalog,
             search_product_vectors,
             get_pricing,
+            quote_cart,
             check_calendar_availability,
             schedule_calendar_event,
             create_crm_contact,
@@ -145,11 +159,13 @@ def build_sales_agent(model: str = "gpt-4o-mini") -> Agent:
 
 
 def build_support_agent(model: str = "gpt-4o-mini") -> Agent:
+    qdrant_tools.start_warm_up()
     return Agent(
         name="DriftDesk Support",
         instructions=_load_prompt("support.md"),
         model=model,
         tools=[
+            search_catalog,
             search_product_vectors,
             check_order_status,
             create_support_ticket,
@@ -8,6 +8,7 @@ from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_openai import ChatOpenAI
 
 from shared import (
+    catalog_search,
     mcp_calendar_tools,
     mcp_hubspot_tools,
     mysql_tools,
@@ -35,12 +36,15 @@ def _build_prompt(system_text: str) -> ChatPromptTemplate:
 
 
 def build_sales_agent(model: str = "gpt-4o-mini") -> AgentExecutor:
+    qdrant_tools.start_warm_up()
     tools = [
+        StructuredTool.from_function(catalog_search.search_catalog),
         StructuredTool.from_function(qdrant_tools.search_product_vectors),
         StructuredTool.from_function(mcp_calendar_tools.check_calendar_availability),
         StructuredTool.from_function(mcp_calendar_tools.schedule_calendar_event),
         StructuredTool.from_function(mcp_hubspot_tools.create_crm_contact),
         StructuredTool.from_function(shared_tools.get_pricing),
+        StructuredTool.from_function(shared_tools.quote_cart),
     ]
     agent = create_tool_calling_agent(
         ChatOpenAI(model=model),
@@ -51,7 +55,9 @@ def build_sales_agent(model: str = "gpt-4o-mini") -> AgentExecutor:
 
 
 def build_support_agent(model: str = "gpt-4o-mini") -> AgentExecutor:
+    qdrant_tools.start_warm_up()
     tools = [
+        StructuredTool.from_function(catalog_search.search_catalog),
         StructuredTool.from_function(qdrant_tools.search_product_vectors),
         StructuredTool.from_function(shared_tools.check_order_status),
         StructuredTool.from_function(mysql_tools.create_support_ticket),
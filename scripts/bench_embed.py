@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List
+
+from shared.qdrant_tools import DEFAULT_DIM, embed_batch, embed_text
+
+WORDS = [
+    "electric", "standing", "desk", "bamboo", "mesh", "chair", "lumbar", "led",
+    "lamp", "ambient", "usb-c", "cable", "tray", "compact", "walnut", "oak",
+    "memory", "presets", "ergonomic", "office", "adjustable", "breathable",
+    "monitor", "arm", "drawer", "footrest", "keyboard", "wireless", "dimmable",
+]
+
+
+def _descriptions(count: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(6, 14))) for _ in range(count)]
+
+
+def run(count: int, python_sample: int, dim: int) -> None:
+    texts = _descriptions(count)
+
+    sample = texts[:python_sample]
+    start = time.perf_counter()
+    reference = [embed_text(text, dim) for text in sample]
+    python_rate = len(sample) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    matrix = embed_batch(texts, dim)
+    numpy_rate = count / (time.perf_counter() - start)
+
+    import numpy as np
+
+    expected = np.asarray(reference, dtype=np.float64).astype(np.float32)
+    if not np.array_equal(matrix[: len(sample)].view(np.uint32), expected.view(np.uint32)):
+        raise AssertionError("embed_batch is not bit-identical to embed_text")
+
+    print(f"descriptions      {count:>12,}")
+    print(f"embed_text        {python_rate:>12,.0f} /s  (sample of {len(sample):,})")
+    print(f"embed_batch       {numpy_rate:>12,.0f} /s")
+    print(f"speedup           {numpy_rate / python_rate:>12.1f}x")
+    print(f"matrix            {matrix.shape} {matrix.dtype} {matrix.nbytes / 1e6:,.0f} MB")
+    print(f"python 1M est.    {1_000_000 / python_rate:>12.1f} s")
+    print(f"numpy 1M est.     {1_000_000 / numpy_rate:>12.1f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark embed_text vs embed_batch.")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--python-sample", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    args = parser.parse_args()
+    run(args.count, min(args.python_sample, args.count), args.dim)
+
+
+if __name__ == "__main__":
+    main()
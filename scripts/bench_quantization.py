@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import List
+
+from scripts.bench_embed import _descriptions
+from shared.qdrant_tools import DEFAULT_DIM, embed_batch, embed_text
+from shared.vector_index import ExactIndex, QuantizedIndex
+
+
+def _recall(truth: List[List[int]], found: List[List[int]]) -> float:
+    hits = sum(len(set(expected) & set(actual)) for expected, actual in zip(truth, found))
+    return hits / sum(len(expected) for expected in truth)
+
+
+def _run_queries(index, queries, limit: int):
+    start = time.perf_counter()
+    rows = [[hit[1]["row"] for hit in index.search(query, limit)] for query in queries]
+    return rows, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def run(sizes: List[int], queries: int, limit: int) -> None:
+    sample = embed_text("standing desk bamboo", DEFAULT_DIM)
+    list_bytes = sys.getsizeof(sample) + sum(sys.getsizeof(value) for value in sample)
+
+    print(
+        f"{'products':>10} {'variant':<18} {'bytes/vec':>9} {'total_MB':>9}"
+        f" {'recall@' + str(limit):>9} {'ms/query':>9}"
+    )
+    for size in sizes:
+        texts = _descriptions(size)
+        vectors = embed_batch(texts)
+        payloads = [{"row": row} for row in range(size)]
+        query_vectors = embed_batch(_descriptions(queries, seed=size + 1))
+
+        exact = ExactIndex(vectors, payloads)
+        truth, exact_ms = _run_queries(exact, query_vectors, limit)
+        approximate = QuantizedIndex(vectors, payloads)
+        rescored = QuantizedIndex(
+            vectors, payloads, rescore=lambda rows: embed_batch([texts[row] for row in rows])
+        )
+        del vectors
+
+        print(f"{size:>10} {'python lists':<18} {list_bytes:>9} {list_bytes * size / 1e6:>9.0f} {'-':>9} {'-':>9}")
+        print(
+            f"{size:>10} {'float32 exact':<18} {exact.vectors.nbytes // size:>9}"
+            f" {exact.vectors.nbytes / 1e6:>9.0f} {1.0:>9.3f} {exact_ms:>9.2f}"
+        )
+        for label, index in (("int8", approximate), ("int8 + rescore", rescored)):
+            found, elapsed = _run_queries(index, query_vectors, limit)
+            print(
+                f"{size:>10} {label:<18} {index.nbytes / size:>9.0f} {index.nbytes / 1e6:>9.0f}"
+                f" {_recall(truth, found):>9.3f} {elapsed:>9.2f}"
+            )
+        del exact
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recall vs memory for int8-quantized vectors.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    run(args.sizes, args.queries, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from shared.product_index import ProductIndex
+
+CATEGORIES = ["standing-desk", "chair", "lighting", "accessory", "storage"]
+WORDS = [
+    "electric", "standing", "desk", "bamboo", "mesh", "chair", "lumbar", "led",
+    "lamp", "ambient", "usb-c", "cable", "tray", "compact", "walnut", "oak",
+    "memory", "presets", "ergonomic", "office", "adjustable", "breathable",
+    "monitor", "arm", "drawer", "footrest", "keyboard", "wireless", "dimmable",
+]
+QUERIES = [
+    ("standing desk", None),
+    ("bamboo", "standing-desk"),
+    ("ergonomic mesh chair", None),
+    ("usb-c lamp", "lighting"),
+    ("walnut drawer wireless", None),
+]
+
+
+def _make_catalog(size: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    products = []
+    for index in range(size):
+        products.append(
+            {
+                "sku": f"SKU-{index:07d}",
+                "name": " ".join(rng.sample(WORDS, 2)).title(),
+                "category": rng.choice(CATEGORIES),
+                "description": " ".join(rng.sample(WORDS, 8)) + ".",
+                "tags": rng.sample(WORDS, 3),
+            }
+        )
+    return products
+
+
+def _scan_search(
+    products: List[Dict[str, Any]], keywords: str, category: Optional[str], limit: int
+) -> Dict[str, Any]:
+    # Linear scan that search_products used before the inverted index.
+    tokens = [token.strip().lower() for token in keywords.split() if token.strip()]
+    matches = []
+    for product in products:
+        if category and product["category"].lower() != category.lower():
+            continue
+        haystack = " ".join(
+            [product["name"], product["description"], " ".join(product.get("tags", []))]
+        ).lower()
+        if all(token in haystack for token in tokens):
+            matches.append(product)
+    return {"matches": matches[: max(limit, 1)], "count": len(matches)}
+
+
+def _index_search(
+    index: ProductIndex, keywords: str, category: Optional[str], limit: int
+) -> Dict[str, Any]:
+    tokens = [token.strip().lower() for token in keywords.split() if token.strip()]
+    positions = index.match(tokens, category)
+    matches = [index.products[position] for position in index.first(positions, max(limit, 1))]
+    return {"matches": matches, "count": len(positions)}
+
+
+def _time_per_query(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for keywords, category in QUERIES:
+            fn(keywords, category)
+    return (time.perf_counter() - start) / (repeat * len(QUERIES))
+
+
+def run(sizes: List[int], repeat: int) -> None:
+    print(f"{'products':>10} {'build_s':>9} {'scan_ms':>10} {'index_ms':>10} {'speedup':>8}")
+    for size in sizes:
+        products = _make_catalog(size)
+        start = time.perf_counter()
+        index = ProductIndex(products)
+        build = time.perf_counter() - start
+
+        for keywords, category in QUERIES:
+            expected = _scan_search(products, keywords, category, 3)
+            actual = _index_search(index, keywords, category, 3)
+            if expected != actual:
+                raise AssertionError(f"Result mismatch for {keywords!r} at {size} products")
+
+        scan = _time_per_query(lambda k, c: _scan_search(products, k, c, 3), repeat)
+        indexed = _time_per_query(lambda k, c: _index_search(index, k, c, 3), repeat)
+        print(
+            f"{size:>10} {build:>9.2f} {scan * 1000:>10.2f} {indexed * 1000:>10.3f}"
+            f" {scan / indexed:>7.1f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark search_products scan vs index.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared.mysql_pool import get_pool
+from shared.mysql_tools import _decode_cursor, _encode_cursor
+from shared.ticket_store import (
+    OPEN_STATUSES,
+    _insert_rows,
+    _open_tickets_params,
+    _open_tickets_query,
+)
+
+INDEXES = {
+    "idx_tickets_status": "(status)",
+    "idx_tickets_status_created": "(status, created_at, ticket_id)",
+}
+STATUS_WEIGHTS = [("open", 20), ("pending", 10), ("closed", 70)]
+
+
+def _offset_query(table: str) -> str:
+    # list_open_tickets before keyset pagination, with a ticket_id tie-break
+    # added so pages can be compared row for row.
+    statuses = ", ".join(["%s"] * len(OPEN_STATUSES))
+    return f"""
+        SELECT ticket_id, subject, status, priority, created_at
+        FROM {table}
+        WHERE status IN ({statuses})
+        ORDER BY created_at DESC, ticket_id DESC
+        LIMIT %s OFFSET %s
+    """
+
+
+def _seed(cursor, table: str, rows: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    statuses = [status for status, weight in STATUS_WEIGHTS for _ in range(weight)]
+    newest = datetime(2025, 1, 1)
+    span = int(timedelta(days=3 * 365).total_seconds())
+    started = time.perf_counter()
+    batch: List[Tuple[Any, ...]] = []
+    for index in range(rows):
+        created_at = newest - timedelta(seconds=rng.randrange(span))
+        batch.append(
+            (
+                f"TCK-{index:08X}",
+                1,
+                f"Bench ticket {index}",
+                rng.choice(statuses),
+                rng.choice(["low", "normal", "high"]),
+                "email",
+                created_at,
+            )
+        )
+        if len(batch) == 5000 or index == rows - 1:
+            _insert_rows(
+                cursor,
+                f"INSERT INTO {table} "
+                "(ticket_id, customer_id, subject, status, priority, channel, created_at)",
+                batch,
+                chunk_rows=1000,
+            )
+            batch = []
+            rate = (index + 1) / (time.perf_counter() - started)
+            sys.stderr.write(f"\rseeded {index + 1:,}/{rows:,} tickets ({rate:,.0f}/s)")
+            sys.stderr.flush()
+    sys.stderr.write("\n")
+
+
+def _prepare(cursor, table: str, rows: int, reseed: bool) -> None:
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} LIKE support_tickets")
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    (existing,) = cursor.fetchone()
+    if reseed or existing != rows:
+        cursor.execute(f"TRUNCATE TABLE {table}")
+        _seed(cursor, table, rows)
+    cursor.execute(f"ANALYZE TABLE {table}")
+    cursor.fetchall()
+
+
+def _use_index(cursor, table: str, wanted: str) -> None:
+    cursor.execute(
+        """
+        SELECT DISTINCT index_name FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s
+        """,
+        (table,),
+    )
+    present = {row[0] for row in cursor.fetchall()}
+    for name in INDEXES:
+        if name != wanted and name in present:
+            cursor.execute(f"DROP INDEX {name} ON {table}")
+    if wanted not in present:
+        started = time.perf_counter()
+        cursor.execute(f"CREATE INDEX {wanted} ON {table} {INDEXES[wanted]}")
+        sys.stderr.write(f"built {wanted} in {time.perf_counter() - started:.1f}s\n")
+
+
+def _explain_extra(cursor, sql: str, params: List[Any]) -> str:
+    cursor.execute("EXPLAIN " + sql, params)
+    rows = cursor.fetchall()
+    return "; ".join(sorted({row["Extra"] or "" for row in rows} - {""}))
+
+
+def _time(cursor, sql: str, params: List[Any], repeat: int) -> Tuple[float, List[Dict[str, Any]]]:
+    best = float("inf")
+    rows: List[Dict[str, Any]] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, rows
+
+
+def _run_index(cursor, table: str, limit: int, pages: int, repeat: int) -> Dict[str, Any]:
+    offset_sql = _offset_query(table)
+    first_offset, expected = _time(
+        cursor, offset_sql, [*OPEN_STATUSES, limit, 0], repeat
+    )
+    deep_offset, deep_expected = _time(
+        cursor, offset_sql, [*OPEN_STATUSES, limit, (pages - 1) * limit], repeat
+    )
+
+    after: Optional[Tuple[str, str]] = None
+    keyset_ms: List[float] = []
+    rows: List[Dict[str, Any]] = []
+    for page in range(pages):
+        sql = _open_tickets_query(table, after=after is not None)
+        elapsed, rows = _time(cursor, sql, _open_tickets_params(limit, after), repeat)
+        keyset_ms.append(elapsed)
+        if page == 0 and rows != expected:
+            raise AssertionError("First keyset page differs from the OFFSET query")
+        after = _decode_cursor(_encode_cursor(rows[-1]))
+    if rows != deep_expected:
+        raise AssertionError(f"Keyset page {pages} differs from the OFFSET query")
+
+    return {
+        "offset_first_ms": first_offset,
+        "offset_deep_ms": deep_offset,
+        "keyset_first_ms": keyset_ms[0],
+        "keyset_deep_ms": keyset_ms[-1],
+        "offset_plan": _explain_extra(cursor, offset_sql, [*OPEN_STATUSES, limit, 0]),
+        "keyset_plan": _explain_extra(
+            cursor, _open_tickets_query(table), _open_tickets_params(limit, None)
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark list_open_tickets OFFSET vs keyset pages on a seeded table."
+    )
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=200, help="depth of the deep page")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--table", default="bench_support_tickets")
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--drop", action="store_true", help="drop the bench table afterwards")
+    args = parser.parse_args()
+
+    with get_pool().connection() as connection:
+        cursor = connection.cursor()
+        _prepare(cursor, args.table, args.rows, args.reseed)
+        dict_cursor = connection.cursor(dictionary=True)
+
+        print(
+            f"{args.rows:,} tickets, limit {args.limit}, deep page = page {args.pages}\n"
+            f"{'index':>28} {'offset_p1_ms':>13} {'offset_pN_ms':>13} {'keyset_p1_ms':>13}"
+            f" {'keyset_pN_ms':>13}"
+        )
+        plans = []
+        for index in INDEXES:
+            _use_index(cursor, args.table, index)
+            result = _run_index(dict_cursor, args.table, args.limit, args.pages, args.repeat)
+            print(
+                f"{index:>28} {result['offset_first_ms']:>13.2f} {result['offset_deep_ms']:>13.2f}"
+                f" {result['keyset_first_ms']:>13.2f} {result['keyset_deep_ms']:>13.2f}"
+            )
+            plans.append((index, result["offset_plan"], result["keyset_plan"]))
+
+        print("\nEXPLAIN Extra (first page):")
+        for index, offset_plan, keyset_plan in plans:
+            print(f"  {index}\n    offset: {offset_plan}\n    keyset: {keyset_plan}")
+
+        if args.drop:
+            cursor.execute(f"DROP TABLE {args.table}")
+
+
+if __name__ == "__main__":
+    main()
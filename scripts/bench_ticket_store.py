@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from shared import mysql_tools
+from shared.ticket_store import MySQLTicketStore, SQLiteTicketStore, TicketStore, set_store
+
+
+def _rate(label: str, count: int, fn: Callable[[int], object]) -> Dict[str, float]:
+    started = time.perf_counter()
+    for index in range(count):
+        fn(index)
+    elapsed = time.perf_counter() - started
+    result = {"ops_per_s": count / elapsed, "us_per_op": elapsed / count * 1e6}
+    print(f"{label:>24} {result['ops_per_s']:>12,.0f} {result['us_per_op']:>12.1f}")
+    return result
+
+
+def run(store: TicketStore, count: int, bulk: int) -> None:
+    set_store(store)
+    print(f"backend: {store.name}, {count:,} ops per step")
+    print(f"{'operation':>24} {'ops/s':>12} {'us/op':>12}")
+
+    ticket_ids: List[str] = []
+
+    def create(index: int) -> None:
+        result = mysql_tools.create_support_ticket(
+            f"bench{index % 500}@example.com",
+            "Bench Customer",
+            f"Bench ticket {index}",
+            "Desk wobbles at full height.",
+            tags=["bench", "desk"],
+        )
+        ticket_ids.append(result["ticket_id"])
+
+    _rate("create_support_ticket", count, create)
+    _rate(
+        "add_ticket_update",
+        count,
+        lambda index: mysql_tools.add_ticket_update(ticket_ids[index], "agent", "Checked logs."),
+    )
+
+    def uncached_get(index: int) -> None:
+        mysql_tools.TICKET_CACHE.invalidate(ticket_ids[index])
+        mysql_tools.get_ticket(ticket_ids[index])
+
+    _rate("get_ticket (uncached)", count, uncached_get)
+    # A small working set, like an agent re-reading the tickets in its conversations.
+    _rate(
+        "get_ticket (cached)",
+        count,
+        lambda index: mysql_tools.get_ticket(ticket_ids[index % 100]),
+    )
+
+    cursor: Dict[str, object] = {"next": None}
+
+    def list_page(index: int) -> None:
+        page = mysql_tools.list_open_tickets(limit=10, cursor=cursor["next"])
+        cursor["next"] = page["next_cursor"]
+
+    _rate("list_open_tickets page", count, list_page)
+
+    batches = max(count // bulk, 1)
+    tickets = [
+        {
+            "email": f"bulk{index % 500}@example.com",
+            "full_name": "Bulk Customer",
+            "subject": f"Imported ticket {index}",
+            "issue": "Imported from the email backlog.",
+        }
+        for index in range(bulk)
+    ]
+    started = time.perf_counter()
+    for _ in range(batches):
+        mysql_tools.create_support_tickets_bulk(tickets)
+    elapsed = time.perf_counter() - started
+    created = batches * bulk
+    print(
+        f"{'bulk create (tickets)':>24} {created / elapsed:>12,.0f}"
+        f" {elapsed / created * 1e6:>12.1f}"
+    )
+
+    _rate(
+        "close_ticket",
+        count,
+        lambda index: mysql_tools.close_ticket(ticket_ids[index], "Resolved in benchmark."),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ticket tool throughput per storage backend.")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--path", type=Path, help="SQLite file (default: a temporary file)")
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--bulk", type=int, default=1000, help="tickets per bulk-create call")
+    args = parser.parse_args()
+
+    if args.backend == "mysql":
+        run(MySQLTicketStore(), args.count, args.bulk)
+        return
+    if args.path:
+        run(SQLiteTicketStore(str(args.path)), args.count, args.bulk)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteTicketStore(str(Path(directory) / "bench.sqlite3"))
+        run(store, args.count, args.bulk)
+        store.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from shared.order_index import build_order_index
+
+DEFAULT_SOURCE = Path(__file__).resolve().parents[1] / "shared" / "data" / "orders.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build the memory-mapped order index from orders.json or a JSONL dump."
+    )
+    parser.add_argument("--source", type=Path, default=DEFAULT_SOURCE)
+    parser.add_argument(
+        "--out",
+        type=Path,
+        required=True,
+        help="Output prefix; writes <out>.idx and <out>.dat",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = build_order_index(args.source, args.out)
+    result["seconds"] = round(time.perf_counter() - start, 2)
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from shared.mysql_pool import get_pool
+from shared.ticket_store import update_content_hash
+
+# The update type the ETL ingests. Agents write it too (every ticket they
+# create starts with one), so the type alone does not mark a row as ingested.
+INGESTED_UPDATE_TYPE = "customer"
+
+
+def _next_tickets(cursor, after: str, limit: int) -> List[str]:
+    # Only the ETL sets content_hash, so these are the tickets it has synced.
+    cursor.execute(
+        """
+        SELECT DISTINCT ticket_id FROM ticket_updates
+        WHERE ticket_id > %s AND update_type = %s AND content_hash IS NOT NULL
+        ORDER BY ticket_id
+        LIMIT %s
+        """,
+        (after, INGESTED_UPDATE_TYPE, limit),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _plan(rows: List[Tuple[int, str, str, Any]]) -> Tuple[List[int], List[Tuple[str, int]]]:
+    """Return duplicate update_ids to delete and (hash, update_id) pairs to backfill.
+
+    ``rows`` are (update_id, ticket_id, note, content_hash), oldest first.
+    Copies of a note are collapsed only if one of them carries its hash, i.e.
+    the ETL has ingested that note for that ticket; the oldest copy is kept
+    and takes the hash. Anything else may be an agent's note and is left alone.
+    """
+    groups: Dict[Tuple[str, str], List[Tuple[int, Any]]] = {}
+    for update_id, ticket_id, note, content_hash in rows:
+        digest = update_content_hash(INGESTED_UPDATE_TYPE, note)
+        groups.setdefault((ticket_id, digest), []).append((update_id, content_hash))
+
+    delete: List[int] = []
+    backfill: List[Tuple[str, int]] = []
+    for (_, digest), copies in groups.items():
+        if all(content_hash != digest for _, content_hash in copies):
+            continue
+        (oldest, oldest_hash), *later = copies
+        delete.extend(update_id for update_id, _ in later)
+        if oldest_hash != digest:
+            backfill.append((digest, oldest))
+    delete.sort()
+    return delete, backfill
+
+
+def compact(batch_tickets: int = 500, dry_run: bool = False) -> Dict[str, int]:
+    """Delete repeated ingested updates per ticket, keeping the oldest, and hash the rest.
+
+    Only tickets the ETL has synced since migration 004 carry the hashes that
+    prove a note was ingested, so run a full sync first. Runs one transaction
+    per ``batch_tickets`` tickets. Duplicates are deleted before the
+    survivors are hashed, so the unique key never trips.
+    """
+    totals = {"tickets": 0, "scanned": 0, "deleted": 0, "hashed": 0}
+    started = time.perf_counter()
+    with get_pool().connection() as connection:
+        cursor = connection.cursor()
+        after = ""
+        while True:
+            ticket_ids = _next_tickets(cursor, after, batch_tickets)
+            if not ticket_ids:
+                break
+            after = ticket_ids[-1]
+            placeholders = ", ".join(["%s"] * len(ticket_ids))
+            connection.start_transaction()
+            try:
+                cursor.execute(
+                    f"""
+                    SELECT update_id, ticket_id, note, content_hash FROM ticket_updates
+                    WHERE ticket_id IN ({placeholders}) AND update_type = %s
+                    ORDER BY update_id
+                    FOR UPDATE
+                    """,
+                    (*ticket_ids, INGESTED_UPDATE_TYPE),
+                )
+                rows = cursor.fetchall()
+                delete, backfill = _plan(rows)
+                if not dry_run:
+                    if delete:
+                        cursor.execute(
+                            "DELETE FROM ticket_updates WHERE update_id IN ("
+                            + ", ".join(["%s"] * len(delete))
+                            + ")",
+                            delete,
+                        )
+                    if backfill:
+                        cursor.executemany(
+                            "UPDATE ticket_updates SET content_hash = %s WHERE update_id = %s",
+                            backfill,
+                        )
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            totals["tickets"] += len(ticket_ids)
+            totals["scanned"] += len(rows)
+            totals["deleted"] += len(delete)
+            totals["hashed"] += len(backfill)
+            rate = totals["scanned"] / (time.perf_counter() - started)
+            sys.stderr.write(
+                f"\r{totals['tickets']:,} tickets, {totals['deleted']:,} duplicates"
+                f" ({rate:,.0f} rows/s)"
+            )
+            sys.stderr.flush()
+    sys.stderr.write("\n")
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Remove duplicate ETL-ingested ticket updates and backfill content hashes."
+    )
+    parser.add_argument("--batch-tickets", type=int, default=500, help="tickets per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="report without changing rows")
+    args = parser.parse_args()
+
+    totals = compact(args.batch_tickets, args.dry_run)
+    deleted, hashed = ("would delete", "would hash") if args.dry_run else ("deleted", "hashed")
+    print(
+        f"{totals['tickets']:,} tickets, {totals['scanned']:,} ingested updates:"
+        f" {deleted} {totals['deleted']:,} duplicates, {hashed} {totals['hashed']:,}"
+    )
+
+
+if __name__ == "__main__":
+    main()
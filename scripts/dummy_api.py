@@ -1,12 +1,24 @@
 from __future__ import annotations
 
+import argparse
 import json
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
 
 DATA = {
     "customers": [
-        {"email": "morgan@east.ai", "full_name": "Morgan Lee"},
-        {"email": "riley@pluto.dev", "full_name": "Riley Chen"},
+        {
+            "email": "morgan@east.ai",
+            "full_name": "Morgan Lee",
+            "updated_at": "2024-12-20T09:00:00Z",
+        },
+        {
+            "email": "riley@pluto.dev",
+            "full_name": "Riley Chen",
+            "updated_at": "2024-12-22T14:30:00Z",
+        },
     ],
     "orders": [
         {
@@ -15,6 +27,7 @@ DATA = {
             "status": "processing",
             "order_total": 449.00,
             "ordered_at": "2024-12-27",
+            "updated_at": "2024-12-27T16:05:00Z",
         },
         {
             "order_id": "ORD-3002",
@@ -22,6 +35,7 @@ DATA = {
             "status": "shipped",
             "order_total": 129.00,
             "ordered_at": "2024-12-26",
+            "updated_at": "2024-12-28T08:40:00Z",
         },
     ],
     "tickets": [
@@ -33,6 +47,7 @@ DATA = {
             "priority": "normal",
             "channel": "chat",
             "tags": ["setup"],
+            "updated_at": "2024-12-28T10:15:00Z",
         },
         {
             "ticket_id": "TCK-DP12",
@@ -42,40 +57,172 @@ DATA = {
             "priority": "high",
             "channel": "email",
             "tags": ["hardware"],
+            "updated_at": "2024-12-29T11:20:00Z",
         },
     ],
 }
 
 
+ENDPOINTS = ("customers", "orders", "tickets")
+MAX_PAGE_SIZE = 10000
+# Synthetic record N was last updated N seconds after this instant.
+SYNTHETIC_EPOCH = datetime(2024, 12, 1)
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _synthetic_record(endpoint: str, index: int) -> Dict[str, Any]:
+    email = f"customer{index % 100000}@example.com"
+    updated_at = (SYNTHETIC_EPOCH + timedelta(seconds=index)).strftime(TIMESTAMP_FORMAT)
+    if endpoint == "customers":
+        return {"email": email, "full_name": f"Customer {index % 100000}", "updated_at": updated_at}
+    if endpoint == "orders":
+        return {
+            "order_id": f"ORD-S{index:09d}",
+            "customer_email": email,
+            "status": ("processing", "shipped", "delivered")[index % 3],
+            "order_total": round(49 + (index % 900) * 1.5, 2),
+            "ordered_at": "2024-12-01",
+            "updated_at": updated_at,
+        }
+    return {
+        "ticket_id": f"TCK-S{index:09d}",
+        "customer_email": email,
+        "subject": f"Synthetic ticket {index}",
+        "issue": "Generated for ETL load testing.",
+        "priority": ("low", "normal", "high")[index % 3],
+        "channel": ("chat", "email")[index % 2],
+        "tags": ["synthetic"],
+        "updated_at": updated_at,
+    }
+
+
+class RecordSource:
+    """Records per endpoint in ``updated_at`` order, addressable by position.
+
+    With ``synthetic`` set every endpoint serves that many generated records
+    without materialising them, so paging and streaming stay flat in memory.
+    """
+
+    def __init__(self, synthetic: int = 0) -> None:
+        self.synthetic = synthetic
+        self._data = {
+            endpoint: sorted(records, key=lambda record: record["updated_at"])
+            for endpoint, records in DATA.items()
+        }
+
+    def count(self, endpoint: str) -> int:
+        return self.synthetic if self.synthetic else len(DATA[endpoint])
+
+    def record(self, endpoint: str, index: int) -> Dict[str, Any]:
+        if self.synthetic:
+            return _synthetic_record(endpoint, index)
+        return self._data[endpoint][index]
+
+    def first_since(self, endpoint: str, updated_since: str) -> int:
+        """Position of the first record updated at or after ``updated_since``.
+
+        Inclusive, so records sharing the caller's last-seen timestamp are
+        served again rather than skipped if they arrived after its last read.
+        """
+        low, high = 0, self.count(endpoint)
+        while low < high:
+            middle = (low + high) // 2
+            if self.record(endpoint, middle)["updated_at"] < updated_since:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def iter_from(
+        self, endpoint: str, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        end = self.count(endpoint) if stop is None else min(stop, self.count(endpoint))
+        for index in range(start, end):
+            yield self.record(endpoint, index)
+
+
 class DummyHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        if self.path in ("/", "/health"):
-            payload = {"status": "ok"}
-        elif self.path == "/customers":
-            payload = {"customers": DATA["customers"]}
-        elif self.path == "/orders":
-            payload = {"orders": DATA["orders"]}
-        elif self.path == "/tickets":
-            payload = {"tickets": DATA["tickets"]}
-        else:
-            self.send_response(404)
-            self.end_headers()
-            return
+    source = RecordSource()
 
+    def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
         body = json.dumps(payload).encode("utf-8")
-        self.send_response(200)
+        self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.send_header("Content-Length", str(len(body)))
         self.end_headers()
         self.wfile.write(body)
 
+    def _stream(self, endpoint: str, start: int) -> None:
+        # HTTP/1.0 response without Content-Length: the body ends when the
+        # connection closes, so records are written as they are produced.
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        buffer: List[str] = []
+        for record in self.source.iter_from(endpoint, start):
+            buffer.append(json.dumps(record))
+            if len(buffer) == 1000:
+                self.wfile.write(("\n".join(buffer) + "\n").encode("utf-8"))
+                buffer = []
+        if buffer:
+            self.wfile.write(("\n".join(buffer) + "\n").encode("utf-8"))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        endpoint = url.path.strip("/")
+        if endpoint in ("", "health"):
+            self._send_json({"status": "ok"})
+            return
+        if endpoint not in ENDPOINTS:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        query = parse_qs(url.query)
+        try:
+            start = int(query.get("cursor", ["0"])[0] or 0)
+            limit = int(query["limit"][0]) if "limit" in query else None
+        except ValueError:
+            self._send_json({"error": "cursor and limit must be integers"}, status=400)
+            return
+        updated_since = query.get("updated_since", [""])[0]
+        if updated_since:
+            # Cursors are absolute positions, so later pages are already past it.
+            start = max(start, self.source.first_since(endpoint, updated_since))
+
+        if query.get("format", [""])[0] == "ndjson":
+            self._stream(endpoint, start)
+            return
+        if limit is None:
+            # Unpaginated: the whole collection in one payload, as before.
+            self._send_json({endpoint: list(self.source.iter_from(endpoint, start))})
+            return
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        stop = start + limit
+        records = list(self.source.iter_from(endpoint, start, stop))
+        next_cursor = str(stop) if stop < self.source.count(endpoint) else None
+        self._send_json({endpoint: records, "next_cursor": next_cursor})
+
     def log_message(self, format, *args):
         return
 
 
 def main() -> None:
-    server = HTTPServer(("127.0.0.1", 8000), DummyHandler)
-    print("Dummy API running at http://127.0.0.1:8000")
+    parser = argparse.ArgumentParser(description="Dummy customers/orders/tickets API for the ETL.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=0,
+        help="serve this many generated records per endpoint instead of the sample data",
+    )
+    args = parser.parse_args()
+
+    DummyHandler.source = RecordSource(args.synthetic)
+    server = ThreadingHTTPServer((args.host, args.port), DummyHandler)
+    print(f"Dummy API running at http://{args.host}:{args.port}")
     server.serve_forever()
 
 
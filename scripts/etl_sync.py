@@ -1,25 +1,53 @@
 from __future__ import annotations
 
+import argparse
+import csv
 import json
 import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlencode
 from urllib.request import urlopen
 
-import mysql.connector
+from shared.customer_resolver import CustomerResolver, UnresolvedCustomerError
+from shared.metrics import LatencyStats
+from shared.mysql_pool import get_pool
+from shared.ticket_store import _insert_rows, update_content_hash
 
 DEFAULT_API = "http://127.0.0.1:8000"
+# "pages" follows next_cursor page by page; "stream" reads one NDJSON response
+# line by line. Both keep memory flat regardless of the feed size.
+ETL_SOURCE_MODE = os.getenv("ETL_SOURCE_MODE", "pages").lower()
+ETL_PAGE_SIZE = int(os.getenv("ETL_PAGE_SIZE", "1000"))
+# Records per transaction; each batch is written with multi-row statements.
+ETL_BATCH_SIZE = int(os.getenv("ETL_BATCH_SIZE", "1000"))
+# Batches with at least this many rows go through LOAD DATA LOCAL INFILE (0 = never).
+ETL_INFILE_MIN_ROWS = int(os.getenv("ETL_INFILE_MIN_ROWS", "0"))
+# Batches each pipeline queue holds before its producer blocks.
+ETL_QUEUE_DEPTH = int(os.getenv("ETL_QUEUE_DEPTH", "4"))
+ETL_DEADLOCK_RETRIES = int(os.getenv("ETL_DEADLOCK_RETRIES", "3"))
+CUSTOMERS = CustomerResolver("mysql")
+
+ORDER_COLUMNS = ("order_id", "customer_id", "status", "order_total", "ordered_at")
+ORDER_UPDATES = ("status", "order_total", "ordered_at")
+TICKET_COLUMNS = ("ticket_id", "customer_id", "subject", "status", "priority", "channel")
+TICKET_UPDATES = ("status", "priority", "channel")
+UPDATE_COLUMNS = ("ticket_id", "update_type", "note", "content_hash")
+# Server/client refusals of LOAD DATA LOCAL INFILE; anything else is a real error.
+INFILE_REFUSED_ERRNOS = (1148, 2068, 3948)
+ER_LOCK_DEADLOCK = 1213
+ENTITIES = ("customers", "orders", "tickets")
 
 
 def _get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("MYSQL_HOST", "localhost"),
-        port=int(os.getenv("MYSQL_PORT", "3306")),
-        user=os.getenv("MYSQL_USER", "root"),
-        password=os.getenv("MYSQL_PASSWORD", ""),
-        database=os.getenv("MYSQL_DATABASE", "driftdesk_support"),
-        autocommit=True,
-    )
+    return get_pool().connection()
 
 
 def _fetch_json(url: str) -> Dict[str, Any]:
@@ -27,102 +55,558 @@ def _fetch_json(url: str) -> Dict[str, Any]:
         return json.loads(response.read().decode("utf-8"))
 
 
-def _get_or_create_customer(cursor, email: str, full_name: str) -> int:
-    cursor.execute("SELECT customer_id FROM customers WHERE email = %s", (email,))
-    row = cursor.fetchone()
-    if row:
-        cursor.execute(
-            "UPDATE customers SET full_name = %s WHERE customer_id = %s",
-            (full_name, row[0]),
-        )
-        return row[0]
-    cursor.execute(
-        "INSERT INTO customers (email, full_name) VALUES (%s, %s)",
-        (email, full_name),
+def _stream_records(
+    base_url: str, endpoint: str, updated_since: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    query = {"format": "ndjson"}
+    if updated_since:
+        query["updated_since"] = updated_since
+    with urlopen(f"{base_url}/{endpoint}?{urlencode(query)}") as response:
+        for line in response:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _page_records(
+    base_url: str, endpoint: str, page_size: int, updated_since: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    cursor = None
+    while True:
+        query: Dict[str, Any] = {"limit": page_size}
+        if updated_since:
+            query["updated_since"] = updated_since
+        if cursor:
+            query["cursor"] = cursor
+        page = _fetch_json(f"{base_url}/{endpoint}?{urlencode(query)}")
+        yield from page.get(endpoint, [])
+        cursor = page.get("next_cursor")
+        if not cursor:
+            return
+
+
+def iter_records(
+    base_url: str, endpoint: str, updated_since: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yield ``endpoint`` records one at a time, never holding the full feed.
+
+    With ``updated_since`` only records updated at or after it are read. The
+    boundary is inclusive because several records can share one timestamp;
+    re-reading the ones already applied is harmless since every load upserts.
+    """
+    if ETL_SOURCE_MODE == "stream":
+        return _stream_records(base_url, endpoint, updated_since)
+    return _page_records(base_url, endpoint, ETL_PAGE_SIZE, updated_since)
+
+
+def _batches(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, max(size, 1)))
+        if not batch:
+            return
+        yield batch
+
+
+def _fallback_name(email: str) -> str:
+    return email.split("@")[0].title()
+
+
+def load_watermarks(cursor, source: str) -> Dict[str, str]:
+    """Return entity -> last applied ``updated_at`` for ``source``."""
+    cursor.execute("SELECT entity, watermark FROM etl_watermarks WHERE source = %s", (source,))
+    return {entity: watermark for entity, watermark in cursor.fetchall()}
+
+
+def _watermark(records: List[Dict[str, Any]]) -> str:
+    return max((record.get("updated_at") or "" for record in records), default="")
+
+
+@dataclass
+class TableWrite:
+    table: str
+    columns: Tuple[str, ...]
+    rows: List[Tuple[Any, ...]]
+    # Upsert these columns on duplicate keys; plain insert when empty.
+    update_columns: Tuple[str, ...] = ()
+    ignore: bool = False
+    # Position of a customer email that the loader swaps for its customer_id.
+    customer_column: Optional[int] = None
+
+
+@dataclass
+class StagedBatch:
+    """One source batch turned into rows, ready for a single transaction."""
+
+    entity: str
+    records: int
+    customers: Dict[str, str]
+    update_names: bool = False
+    writes: List[TableWrite] = field(default_factory=list)
+    watermark: str = ""
+
+
+def _transform_customers(customers: List[Dict[str, Any]]) -> StagedBatch:
+    # The customers feed is authoritative for names, so refresh them.
+    names = {customer["email"]: customer["full_name"] for customer in customers}
+    return StagedBatch(
+        "customers", len(customers), names, update_names=True, watermark=_watermark(customers)
     )
-    return cursor.lastrowid
 
 
-def _ingest_customers(cursor, base_url: str) -> int:
-    payload = _fetch_json(f"{base_url}/customers")
-    count = 0
-    for customer in payload.get("customers", []):
-        _get_or_create_customer(cursor, customer["email"], customer["full_name"])
-        count += 1
-    return count
+def _transform_orders(orders: List[Dict[str, Any]]) -> StagedBatch:
+    rows = [
+        (
+            order["order_id"],
+            order["customer_email"],
+            order["status"],
+            order["order_total"],
+            order["ordered_at"],
+        )
+        for order in orders
+    ]
+    return StagedBatch(
+        "orders",
+        len(orders),
+        {order["customer_email"]: _fallback_name(order["customer_email"]) for order in orders},
+        writes=[TableWrite("orders", ORDER_COLUMNS, rows, ORDER_UPDATES, customer_column=1)],
+        watermark=_watermark(orders),
+    )
 
 
-def _ingest_orders(cursor, base_url: str) -> int:
-    payload = _fetch_json(f"{base_url}/orders")
-    count = 0
-    for order in payload.get("orders", []):
-        customer_id = _get_or_create_customer(
-            cursor, order["customer_email"], order["customer_email"].split("@")[0].title()
+def _transform_tickets(tickets: List[Dict[str, Any]]) -> StagedBatch:
+    ticket_rows = [
+        (
+            ticket["ticket_id"],
+            ticket["customer_email"],
+            ticket["subject"],
+            "open",
+            ticket.get("priority", "normal"),
+            ticket.get("channel", "chat"),
         )
-        cursor.execute(
-            """
-            INSERT INTO orders (order_id, customer_id, status, order_total, ordered_at)
-            VALUES (%s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-              status = VALUES(status),
-              order_total = VALUES(order_total),
-              ordered_at = VALUES(ordered_at)
-            """,
-            (
-                order["order_id"],
-                customer_id,
-                order["status"],
-                order["order_total"],
-                order["ordered_at"],
-            ),
+        for ticket in tickets
+    ]
+    # Hashed so re-syncing an unchanged ticket does not append its issue again.
+    update_rows = [
+        (
+            ticket["ticket_id"],
+            "customer",
+            ticket["issue"],
+            update_content_hash("customer", ticket["issue"]),
         )
-        count += 1
-    return count
+        for ticket in tickets
+    ]
+    tag_rows = [
+        (ticket["ticket_id"], tag)
+        for ticket in tickets
+        for tag in dict.fromkeys(ticket.get("tags", []))
+    ]
+    return StagedBatch(
+        "tickets",
+        len(tickets),
+        {ticket["customer_email"]: _fallback_name(ticket["customer_email"]) for ticket in tickets},
+        writes=[
+            TableWrite(
+                "support_tickets", TICKET_COLUMNS, ticket_rows, TICKET_UPDATES, customer_column=1
+            ),
+            TableWrite("ticket_updates", UPDATE_COLUMNS, update_rows, ignore=True),
+            TableWrite("ticket_tags", ("ticket_id", "tag"), tag_rows, ignore=True),
+        ],
+        watermark=_watermark(tickets),
+    )
+
+
+TRANSFORMS: Dict[str, Callable[[List[Dict[str, Any]]], StagedBatch]] = {
+    "customers": _transform_customers,
+    "orders": _transform_orders,
+    "tickets": _transform_tickets,
+}
+
 
+class BatchLoader:
+    """Writes staged batches with multi-row statements, one transaction each.
 
-def _ingest_tickets(cursor, base_url: str) -> int:
-    payload = _fetch_json(f"{base_url}/tickets")
-    count = 0
-    for ticket in payload.get("tickets", []):
-        customer_id = _get_or_create_customer(
-            cursor, ticket["customer_email"], ticket["customer_email"].split("@")[0].title()
+    Upserts use ``INSERT ... ON DUPLICATE KEY UPDATE``. The entity's
+    watermark advances in the same transaction as the rows it covers, so a
+    failed run resumes after its last committed batch. Batches of at least
+    ``infile_min_rows`` rows are instead written to a CSV file and loaded with
+    ``LOAD DATA LOCAL INFILE``, through a temporary staging table when rows
+    must be upserted. If the server refuses local infile the loader falls back
+    to multi-row inserts for the rest of the run.
+    """
+
+    def __init__(
+        self, connection, ingest_id: int, source: str, infile_min_rows: int = 0
+    ) -> None:
+        self.connection = connection
+        self.cursor = connection.cursor()
+        self.ingest_id = ingest_id
+        self.source = source
+        self.infile_min_rows = infile_min_rows
+        self._staged: Set[str] = set()
+
+    def _use_infile(self, rows: Sequence[Tuple[Any, ...]]) -> bool:
+        return bool(self.infile_min_rows) and len(rows) >= self.infile_min_rows
+
+    def _load_infile(
+        self, table: str, columns: Sequence[str], rows: Sequence[Tuple[Any, ...]], ignore: bool
+    ) -> None:
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", newline="", encoding="utf-8", delete=False
+        ) as handle:
+            writer = csv.writer(handle, quoting=csv.QUOTE_ALL, lineterminator="\n")
+            writer.writerows(rows)
+        try:
+            self.cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s {'IGNORE ' if ignore else ''}INTO TABLE {table} "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' ENCLOSED BY '\"' ESCAPED BY '' "
+                f"LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                (handle.name,),
+            )
+        finally:
+            os.unlink(handle.name)
+
+    def _infile_failed(self, exc: Exception) -> None:
+        sys.stderr.write(f"LOAD DATA LOCAL INFILE unavailable ({exc}); using multi-row inserts\n")
+        self.infile_min_rows = 0
+
+    def upsert(
+        self,
+        table: str,
+        columns: Sequence[str],
+        update_columns: Sequence[str],
+        rows: Sequence[Tuple[Any, ...]],
+    ) -> str:
+        updates = ", ".join(f"{column} = VALUES({column})" for column in update_columns)
+        if self._use_infile(rows):
+            stage = f"etl_stage_{table}"
+            try:
+                if stage not in self._staged:
+                    # Temporary tables neither commit the open transaction nor
+                    # copy foreign keys, so rows land here before the upsert.
+                    self.cursor.execute(
+                        f"CREATE TEMPORARY TABLE IF NOT EXISTS {stage} LIKE {table}"
+                    )
+                    self._staged.add(stage)
+                self.cursor.execute(f"DELETE FROM {stage}")
+                self._load_infile(stage, columns, rows, ignore=False)
+                column_list = ", ".join(columns)
+                self.cursor.execute(
+                    f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {stage} "
+                    f"ON DUPLICATE KEY UPDATE {updates}"
+                )
+                return "infile"
+            except Exception as exc:
+                if getattr(exc, "errno", None) not in INFILE_REFUSED_ERRNOS:
+                    raise
+                self._infile_failed(exc)
+        _insert_rows(
+            self.cursor,
+            f"INSERT INTO {table} ({', '.join(columns)})",
+            rows,
+            suffix=f" ON DUPLICATE KEY UPDATE {updates}",
         )
-        cursor.execute(
+        return "multirow"
+
+    def append(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Sequence[Tuple[Any, ...]],
+        ignore: bool = False,
+    ) -> str:
+        if self._use_infile(rows):
+            try:
+                self._load_infile(table, columns, rows, ignore)
+                return "infile"
+            except Exception as exc:
+                if getattr(exc, "errno", None) not in INFILE_REFUSED_ERRNOS:
+                    raise
+                self._infile_failed(exc)
+        _insert_rows(
+            self.cursor,
+            f"INSERT {'IGNORE ' if ignore else ''}INTO {table} ({', '.join(columns)})",
+            rows,
+        )
+        return "multirow"
+
+    def _advance_watermark(self, entity: str, watermark: str) -> None:
+        if not watermark:
+            return
+        self.cursor.execute(
             """
-            INSERT INTO support_tickets
-              (ticket_id, customer_id, subject, status, priority, channel)
-            VALUES (%s, %s, %s, %s, %s, %s)
+            INSERT INTO etl_watermarks (source, entity, watermark, ingest_id)
+            VALUES (%s, %s, %s, %s)
             ON DUPLICATE KEY UPDATE
-              status = VALUES(status),
-              priority = VALUES(priority),
-              channel = VALUES(channel)
+              watermark = GREATEST(watermark, VALUES(watermark)),
+              ingest_id = VALUES(ingest_id)
             """,
-            (
-                ticket["ticket_id"],
-                customer_id,
-                ticket["subject"],
-                "open",
-                ticket.get("priority", "normal"),
-                ticket.get("channel", "chat"),
-            ),
+            (self.source, entity, watermark, self.ingest_id),
         )
-        cursor.execute(
+
+    def _write(self, batch: StagedBatch, resolved: Dict[str, Tuple[int, str]]) -> Tuple[int, str]:
+        customer_ids = CUSTOMERS.resolve_many(
+            self.cursor, batch.customers, update_names=batch.update_names, deferred=resolved
+        )
+        unresolved = [email for email in batch.customers if email not in customer_ids]
+        if unresolved:
+            raise UnresolvedCustomerError(unresolved)
+        if not batch.writes:
+            return len(batch.customers), "multirow"
+        written, methods = 0, []
+        for write in batch.writes:
+            rows = write.rows
+            if write.customer_column is not None:
+                column = write.customer_column
+                rows = [
+                    row[:column] + (customer_ids[row[column]],) + row[column + 1 :]
+                    for row in rows
+                ]
+            if write.update_columns:
+                methods.append(self.upsert(write.table, write.columns, write.update_columns, rows))
+            else:
+                methods.append(self.append(write.table, write.columns, rows, write.ignore))
+            written += len(rows)
+        return written, "infile" if "infile" in methods else "multirow"
+
+    def run_batch(self, batch: StagedBatch) -> int:
+        """Load one batch in its own transaction and log its row count and timing.
+
+        Orders and tickets load concurrently and may both create a customer,
+        so a batch that loses a deadlock is retried from the start.
+        """
+        started = time.perf_counter()
+        for attempt in range(ETL_DEADLOCK_RETRIES + 1):
+            resolved: Dict[str, Tuple[int, str]] = {}
+            self.connection.start_transaction()
+            try:
+                rows, method = self._write(batch, resolved)
+                self._advance_watermark(batch.entity, batch.watermark)
+                self.connection.commit()
+                break
+            except Exception as exc:
+                self.connection.rollback()
+                deadlock = getattr(exc, "errno", None) == ER_LOCK_DEADLOCK
+                if not deadlock or attempt == ETL_DEADLOCK_RETRIES:
+                    raise
+        CUSTOMERS.remember(resolved)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.cursor.execute(
             """
-            INSERT INTO ticket_updates (ticket_id, update_type, note)
-            VALUES (%s, %s, %s)
+            INSERT INTO etl_ingest_batches
+              (ingest_id, entity, records, rows_written, method, duration_ms)
+            VALUES (%s, %s, %s, %s, %s, %s)
             """,
-            (ticket["ticket_id"], "customer", ticket["issue"]),
+            (self.ingest_id, batch.entity, batch.records, rows, method, round(elapsed_ms, 3)),
         )
-        for tag in ticket.get("tags", []):
-            cursor.execute(
-                "INSERT IGNORE INTO ticket_tags (ticket_id, tag) VALUES (%s, %s)",
-                (ticket["ticket_id"], tag),
-            )
-        count += 1
-    return count
+        return batch.records
+
+
+class StageStats:
+    """Records and per-batch busy time for one pipeline stage of one entity.
+
+    ``blocked`` is time spent waiting on the downstream queue, i.e. how much
+    backpressure the stage saw.
+    """
+
+    def __init__(self) -> None:
+        self.batch_stats = LatencyStats()
+        self._lock = threading.Lock()
+        self.records = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+
+    def record(self, records: int, busy_seconds: float) -> None:
+        self.batch_stats.record(busy_seconds * 1000)
+        with self._lock:
+            self.records += records
+            self.busy_seconds += busy_seconds
+
+    def blocked(self, seconds: float) -> None:
+        with self._lock:
+            self.blocked_seconds += seconds
+
+    def snapshot(self, wall_seconds: float) -> Dict[str, Any]:
+        with self._lock:
+            records, busy, blocked = self.records, self.busy_seconds, self.blocked_seconds
+        return {
+            "records": records,
+            "records_per_s": round(records / wall_seconds, 1) if wall_seconds else 0.0,
+            "busy_s": round(busy, 3),
+            "blocked_s": round(blocked, 3),
+            "batch": self.batch_stats.snapshot(),
+        }
+
+
+_DONE = object()
+
+
+class EtlPipeline:
+    """Concurrent fetch -> transform -> load stages, one chain per entity.
+
+    Each entity has a fetcher thread, a transform thread and a loader thread
+    with its own pooled connection, joined by queues of ``queue_depth``
+    batches; a full queue blocks its producer, so a slow database throttles
+    the fetchers instead of buffering the feed in memory. Order and ticket
+    loaders start once the customers loader has committed everything, while
+    their fetchers and transforms run ahead up to the queue bound. One loader
+    per entity keeps its batches, and so its watermark, in source order.
+    """
+
+    STAGES = ("fetch", "transform", "load")
+
+    def __init__(
+        self,
+        base_url: str,
+        ingest_id: int,
+        watermarks: Dict[str, str],
+        batch_size: int = ETL_BATCH_SIZE,
+        infile_min_rows: int = ETL_INFILE_MIN_ROWS,
+        queue_depth: int = ETL_QUEUE_DEPTH,
+    ) -> None:
+        self.base_url = base_url
+        self.ingest_id = ingest_id
+        self.watermarks = watermarks
+        self.batch_size = batch_size
+        self.infile_min_rows = infile_min_rows
+        self.queue_depth = max(int(queue_depth), 1)
+        self.stats = {
+            stage: {entity: StageStats() for entity in ENTITIES} for stage in self.STAGES
+        }
+        self.customers_loaded = threading.Event()
+        self._abort = threading.Event()
+        self._errors: List[BaseException] = []
+        self._started = 0.0
+        self._finished = 0.0
 
+    def _put(self, target: "queue.Queue[Any]", item: Any, stats: StageStats) -> bool:
+        started = time.perf_counter()
+        try:
+            while not self._abort.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats.blocked(time.perf_counter() - started)
 
-def run_etl(base_url: str) -> None:
+    def _get(self, source: "queue.Queue[Any]") -> Any:
+        while not self._abort.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fetch(self, entity: str, out: "queue.Queue[Any]") -> None:
+        stats = self.stats["fetch"][entity]
+        records = iter_records(self.base_url, entity, self.watermarks.get(entity))
+        batches = _batches(records, self.batch_size)
+        while True:
+            started = time.perf_counter()
+            batch = next(batches, None)
+            if batch is None:
+                break
+            stats.record(len(batch), time.perf_counter() - started)
+            if not self._put(out, batch, stats):
+                return
+        self._put(out, _DONE, stats)
+
+    def _transform(self, entity: str, source: "queue.Queue[Any]", out: "queue.Queue[Any]") -> None:
+        stats = self.stats["transform"][entity]
+        transform = TRANSFORMS[entity]
+        while True:
+            batch = self._get(source)
+            if batch is _DONE:
+                break
+            started = time.perf_counter()
+            staged = transform(batch)
+            stats.record(staged.records, time.perf_counter() - started)
+            if not self._put(out, staged, stats):
+                return
+        self._put(out, _DONE, stats)
+
+    def _load(self, entity: str, source: "queue.Queue[Any]") -> None:
+        stats = self.stats["load"][entity]
+        if entity != "customers":
+            while not self.customers_loaded.wait(0.1):
+                if self._abort.is_set():
+                    return
+        with _get_connection() as connection:
+            loader = BatchLoader(connection, self.ingest_id, self.base_url, self.infile_min_rows)
+            while True:
+                batch = self._get(source)
+                if batch is _DONE:
+                    break
+                started = time.perf_counter()
+                loader.run_batch(batch)
+                stats.record(batch.records, time.perf_counter() - started)
+        if entity == "customers" and not self._abort.is_set():
+            self.customers_loaded.set()
+
+    def _guard(self, target: Callable[..., None], *args: Any) -> None:
+        try:
+            target(*args)
+        except BaseException as exc:
+            self._errors.append(exc)
+            self._abort.set()
+
+    def run(self) -> int:
+        """Run every stage to completion; re-raises the first stage error."""
+        self._started = time.perf_counter()
+        threads = []
+        for entity in ENTITIES:
+            raw: "queue.Queue[Any]" = queue.Queue(self.queue_depth)
+            staged: "queue.Queue[Any]" = queue.Queue(self.queue_depth)
+            for stage, target, args in (
+                ("fetch", self._fetch, (entity, raw)),
+                ("transform", self._transform, (entity, raw, staged)),
+                ("load", self._load, (entity, staged)),
+            ):
+                threads.append(
+                    threading.Thread(
+                        target=self._guard,
+                        args=(target, *args),
+                        name=f"etl-{stage}-{entity}",
+                        daemon=True,
+                    )
+                )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self._finished = time.perf_counter()
+        if self._errors:
+            raise self._errors[0]
+        return sum(stats.records for stats in self.stats["load"].values())
+
+    def report(self) -> Dict[str, Any]:
+        wall = (self._finished or time.perf_counter()) - self._started
+        stages: Dict[str, Any] = {}
+        for stage, per_entity in self.stats.items():
+            entities = {entity: stats.snapshot(wall) for entity, stats in per_entity.items()}
+            records = sum(snapshot["records"] for snapshot in entities.values())
+            stages[stage] = {
+                "records": records,
+                "records_per_s": round(records / wall, 1) if wall else 0.0,
+                "entities": entities,
+            }
+        return {"seconds": round(wall, 3), "stages": stages}
+
+
+def run_etl(
+    base_url: str,
+    batch_size: int = ETL_BATCH_SIZE,
+    infile_min_rows: int = ETL_INFILE_MIN_ROWS,
+    full: bool = False,
+    queue_depth: int = ETL_QUEUE_DEPTH,
+) -> Dict[str, Any]:
+    """Apply source changes since the stored watermarks; ``full`` reloads everything.
+
+    Returns the ingest id, records loaded and per-stage throughput.
+    """
     with _get_connection() as connection:
         cursor = connection.cursor()
         cursor.execute(
@@ -130,11 +614,24 @@ def run_etl(base_url: str) -> None:
             (base_url, "running"),
         )
         ingest_id = cursor.lastrowid
+        watermarks = {} if full else load_watermarks(cursor, base_url)
+        pipeline = EtlPipeline(
+            base_url, ingest_id, watermarks, batch_size, infile_min_rows, queue_depth
+        )
 
-        total = 0
-        total += _ingest_customers(cursor, base_url)
-        total += _ingest_orders(cursor, base_url)
-        total += _ingest_tickets(cursor, base_url)
+        try:
+            total = pipeline.run()
+        except Exception:
+            loaded = pipeline.report()["stages"]["load"]["records"]
+            cursor.execute(
+                """
+                UPDATE etl_ingest_log
+                SET records_loaded = %s, finished_at = %s, status = %s
+                WHERE ingest_id = %s
+                """,
+                (loaded, datetime.utcnow(), "failed", ingest_id),
+            )
+            raise
 
         cursor.execute(
             """
@@ -144,9 +641,53 @@ def run_etl(base_url: str) -> None:
             """,
             (total, datetime.utcnow(), "success", ingest_id),
         )
+    return {"ingest_id": ingest_id, "records": total, **pipeline.report()}
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"{'stage':>10} {'entity':>10} {'records':>10} {'rec/s':>10}"
+        f" {'busy_s':>8} {'blocked_s':>9}"
+    )
+    for stage, summary in report["stages"].items():
+        for entity, stats in summary["entities"].items():
+            print(
+                f"{stage:>10} {entity:>10} {stats['records']:>10,} {stats['records_per_s']:>10,.0f}"
+                f" {stats['busy_s']:>8.2f} {stats['blocked_s']:>9.2f}"
+            )
+        print(
+            f"{stage:>10} {'total':>10} {summary['records']:>10,}"
+            f" {summary['records_per_s']:>10,.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync dummy API records into MySQL.")
+    parser.add_argument("--api-url", default=os.getenv("DUMMY_API_URL", DEFAULT_API))
+    parser.add_argument(
+        "--full", action="store_true", help="ignore watermarks and reload everything"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0,
+        help="repeat every N seconds (0 = run once)",
+    )
+    args = parser.parse_args()
+
+    full = args.full
+    while True:
+        report = run_etl(args.api_url, full=full)
+        print(
+            f"ETL loaded {report['records']:,} records from {args.api_url}"
+            f" in {report['seconds']:.1f}s"
+        )
+        _print_report(report)
+        if not args.interval:
+            return
+        full = False
+        time.sleep(max(args.interval - report["seconds"], 0))
 
 
 if __name__ == "__main__":
-    api_url = os.getenv("DUMMY_API_URL", DEFAULT_API)
-    run_etl(api_url)
-    print(f"ETL completed from {api_url}")
+    main()
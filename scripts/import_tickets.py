@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from shared.mysql_tools import create_support_tickets_bulk
+
+
+def _read_tickets(source: Path) -> Iterator[Dict[str, Any]]:
+    if source.suffix == ".jsonl":
+        with source.open(encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        yield from json.loads(source.read_text(encoding="utf-8"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk-import support tickets into MySQL.")
+    parser.add_argument("--source", type=Path, required=True, help=".json list or .jsonl file")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=5000,
+        help="tickets per transaction",
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    created = 0
+    batch: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        nonlocal created
+        result = create_support_tickets_bulk(batch)
+        if "error" in result:
+            raise SystemExit(f"Import stopped after {created:,} tickets: {result['error']}")
+        created += result["count"]
+        batch.clear()
+        elapsed = time.perf_counter() - started
+        sys.stderr.write(f"\rcreated {created:,} tickets ({created / elapsed:,.0f}/s)")
+        sys.stderr.flush()
+
+    for ticket in _read_tickets(args.source):
+        batch.append(ticket)
+        if len(batch) >= args.batch_size:
+            flush()
+    if batch:
+        flush()
+    if created:
+        sys.stderr.write("\n")
+
+    seconds = round(time.perf_counter() - started, 3)
+    print({"status": "ok", "created": created, "seconds": seconds})
+
+
+if __name__ == "__main__":
+    main()
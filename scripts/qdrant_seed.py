@@ -1,16 +1,42 @@
 from __future__ import annotations
 
+import argparse
 import json
+import sys
+import time
 from pathlib import Path
 
-from shared.qdrant_tools import seed_products
+from shared.qdrant_tools import SEED_BATCH_SIZE, SEED_PARALLELISM, seed_products
 
 DATA_PATH = Path(__file__).resolve().parents[1] / "shared" / "data" / "products.json"
 
 
 def main() -> None:
-    products = json.loads(DATA_PATH.read_text(encoding="utf-8"))
-    result = seed_products(products)
+    parser = argparse.ArgumentParser(description="Incrementally seed Qdrant with product vectors.")
+    parser.add_argument("--source", type=Path, default=DATA_PATH)
+    parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE)
+    parser.add_argument("--parallelism", type=int, default=SEED_PARALLELISM)
+    args = parser.parse_args()
+
+    products = json.loads(args.source.read_text(encoding="utf-8"))
+    started = time.perf_counter()
+
+    def report(done: int, total: int) -> None:
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed else 0.0
+        sys.stderr.write(f"\rupserted {done:,}/{total:,} ({rate:,.0f} products/s)")
+        sys.stderr.flush()
+
+    result = seed_products(
+        products,
+        batch_size=args.batch_size,
+        parallelism=args.parallelism,
+        progress=report,
+    )
+    if result.get("upserted"):
+        sys.stderr.write("\n")
+    if result.get("seconds"):
+        result["throughput_per_s"] = round(len(products) / result["seconds"], 1)
     print(result)
 
 
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import re
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+
+DATA_PATH = Path(__file__).resolve().parents[1] / "shared" / "data" / "products.json"
+
+# collection name -> point id -> {"vector": [...], "payload": {...}}
+COLLECTIONS: Dict[str, Dict[str, Dict[str, Any]]] = {}
+STATS = {"requests": 0, "searches": 0, "connections": 0}
+
+
+def _cosine(left: List[float], right: List[float]) -> float:
+    dot = sum(a * b for a, b in zip(left, right))
+    norm = math.sqrt(sum(a * a for a in left)) * math.sqrt(sum(b * b for b in right))
+    return dot / norm if norm else 0.0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Minimal subset of the Qdrant REST API used by shared.qdrant_tools."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        super().setup()
+        STATS["connections"] += 1
+        self.server.open_connections.add(self.connection)
+
+    def finish(self) -> None:
+        self.server.open_connections.discard(self.connection)
+        super().finish()
+
+    def _send(self, result: Any, status: int = 200) -> None:
+        body = json.dumps({"result": result, "status": "ok", "time": 0.0}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        STATS["requests"] += 1
+        path = self.path.split("?")[0]
+        if path in ("/", "/healthz"):
+            self._send({"title": "qdrant stub", "version": "1.12.0"})
+        elif path == "/collections":
+            self._send({"collections": [{"name": name} for name in COLLECTIONS]})
+        elif match := re.fullmatch(r"/collections/([^/]+)/exists", path):
+            self._send({"exists": match.group(1) in COLLECTIONS})
+        elif match := re.fullmatch(r"/collections/([^/]+)", path):
+            points = COLLECTIONS.get(match.group(1))
+            if points is None:
+                self._send(None, status=404)
+            else:
+                self._send({"status": "green", "points_count": len(points)})
+        else:
+            self._send(None, status=404)
+
+    def do_PUT(self):
+        STATS["requests"] += 1
+        path = self.path.split("?")[0]
+        body = self._body()
+        if match := re.fullmatch(r"/collections/([^/]+)", path):
+            COLLECTIONS.setdefault(match.group(1), {})
+            self._send(True)
+        elif match := re.fullmatch(r"/collections/([^/]+)/points", path):
+            points = COLLECTIONS.setdefault(match.group(1), {})
+            for point in body.get("points", []):
+                points[str(point["id"])] = {"vector": point["vector"], "payload": point.get("payload")}
+            self._send({"operation_id": 0, "status": "completed"})
+        else:
+            self._send(None, status=404)
+
+    def do_PATCH(self):
+        STATS["requests"] += 1
+        self._body()
+        name = self.path.split("?")[0].rsplit("/", 1)[-1]
+        self._send(True, status=200 if name in COLLECTIONS else 404)
+
+    def do_POST(self):
+        STATS["requests"] += 1
+        path = self.path.split("?")[0]
+        body = self._body()
+        match = re.fullmatch(r"/collections/([^/]+)/points/(search|scroll|delete)", path)
+        if not match or match.group(1) not in COLLECTIONS:
+            self._send(None, status=404)
+            return
+        points = COLLECTIONS[match.group(1)]
+        action = match.group(2)
+
+        if action == "delete":
+            for point_id in body.get("points", []):
+                points.pop(str(point_id), None)
+            self._send({"operation_id": 0, "status": "completed"})
+            return
+
+        if action == "scroll":
+            ids = sorted(points)
+            start = ids.index(body["offset"]) if body.get("offset") in points else 0
+            limit = int(body.get("limit", 10))
+            page = ids[start : start + limit]
+            self._send(
+                {
+                    "points": [{"id": point_id, "payload": points[point_id]["payload"]} for point_id in page],
+                    "next_page_offset": ids[start + limit] if start + limit < len(ids) else None,
+                }
+            )
+            return
+
+        STATS["searches"] += 1
+        vector = body["vector"]
+        scored = [
+            {"id": point_id, "version": 0, "score": _cosine(vector, point["vector"]),
+             "payload": point["payload"]}
+            for point_id, point in points.items()
+        ]
+        scored.sort(key=lambda item: -item["score"])
+        self._send(scored[: int(body.get("limit", 10))])
+
+    def log_message(self, format, *args):
+        return
+
+
+def _make_server(port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.open_connections = set()
+    return server
+
+
+def serve(port: int) -> ThreadingHTTPServer:
+    server = _make_server(port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop(server: ThreadingHTTPServer) -> None:
+    """Stop like a crashed server would: kill keep-alive connections too."""
+    server.shutdown()
+    server.server_close()
+    for connection in list(server.open_connections):
+        try:
+            connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def selftest(port: int) -> int:
+    """Exercise client reuse, warm-up and reconnect against the stub."""
+    os.environ["QDRANT_URL"] = f"http://127.0.0.1:{port}"
+    from shared import qdrant_tools
+
+    server = serve(port)
+    products = json.loads(DATA_PATH.read_text(encoding="utf-8"))
+    print("seed:", qdrant_tools.seed_products(products))
+    print("warm_up:", qdrant_tools.warm_up())
+
+    connections = STATS["connections"]
+    for query in ["standing desk bamboo", "mesh chair", "standing desk bamboo"]:
+        result = qdrant_tools.search_product_vectors(query, limit=1)
+        print("search:", query, "->", [match["sku"] for match in result.get("matches", [])])
+    reused = STATS["connections"] == connections
+    print(f"new connections during searches: {STATS['connections'] - connections}")
+
+    print("restarting stub server")
+    stop(server)
+    server = serve(port)
+    result = qdrant_tools.search_product_vectors("mesh chair", limit=1)
+    print("search after restart:", "ok" if result.get("count") else result)
+    print("client:", qdrant_tools.client_stats())
+    stop(server)
+    return 0 if reused and result.get("count") else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local Qdrant REST stub for client checks.")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--selftest", action="store_true", help="Run the client checks and exit")
+    args = parser.parse_args()
+    if args.selftest:
+        return selftest(args.port)
+
+    server = _make_server(args.port)
+    print(f"Qdrant stub running at http://127.0.0.1:{args.port}")
+    server.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
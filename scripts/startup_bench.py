@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_MODULES = [
+    "shared.tools",
+    "shared.qdrant_tools",
+    "shared.mysql_tools",
+    "shared.support_tools",
+    "agents_sdk.multi_agent",
+    "langchain_app.agent",
+]
+WATCHED = ("mysql", "qdrant_client", "markdown", "numpy")
+
+
+def _importtime(module: str) -> Tuple[int, List[Tuple[int, int, str]], str]:
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    rows: List[Tuple[int, int, str]] = []
+    errors: List[str] = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            errors.append(line)
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        rows.append((int(fields[0]), int(fields[1]), fields[2].rstrip()))
+    error = errors[-1] if completed.returncode and errors else ""
+    total = next((cumulative for _, cumulative, name in rows if name.strip() == module), 0)
+    return total, rows, error
+
+
+def _fixture_load_ms() -> float:
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    code = (
+        "import time; from shared import tools; start = time.perf_counter(); "
+        "tools.FIXTURE_STORE.current(); print((time.perf_counter() - start) * 1000)"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    return float(completed.stdout.strip() or 0)
+
+
+def run(modules: List[str], top: int, budget_ms: float) -> int:
+    over_budget = 0
+    for module in modules:
+        start = time.perf_counter()
+        total_us, rows, error = _importtime(module)
+        wall_ms = (time.perf_counter() - start) * 1000
+        if error:
+            print(f"\n{module}: skipped ({error.strip()})")
+            continue
+
+        loaded: Dict[str, bool] = {
+            name: any(row[2].strip().split(".")[0] == name for row in rows) for name in WATCHED
+        }
+        print(f"\n{module}: import {total_us / 1000:.1f} ms (process wall {wall_ms:.0f} ms)")
+        states = ", ".join(f"{name}={'loaded' if seen else 'lazy'}" for name, seen in loaded.items())
+        print(f"  heavy optional imports: {states}")
+        for self_us, cumulative_us, name in sorted(rows, key=lambda row: -row[0])[:top]:
+            print(f"  {self_us / 1000:>8.2f} ms self {cumulative_us / 1000:>9.2f} ms cum  {name.strip()}")
+        if budget_ms and total_us / 1000 > budget_ms:
+            print(f"  over budget: {total_us / 1000:.1f} ms > {budget_ms:.1f} ms")
+            over_budget += 1
+
+    print(f"\nfirst fixture load: {_fixture_load_ms():.1f} ms")
+    return 1 if over_budget else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Report cold-start import time for the agent modules (python -X importtime)."
+    )
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per module")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=0.0,
+        help="Exit non-zero if any module's cumulative import time exceeds this",
+    )
+    args = parser.parse_args()
+    return run(args.modules, args.top, args.budget_ms)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
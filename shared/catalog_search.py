@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from shared import qdrant_tools, tools
+
+RRF_K = 60
+CANDIDATE_DEPTH = 20
+# Index tokens match as substrings, so short and filler words would hit most
+# products; the any-token keyword search ignores them.
+KEYWORD_MIN_LENGTH = 3
+KEYWORD_STOPWORDS = frozenset(
+    """
+    about also and any are but can could does for from get got has have how into
+    its just like looking need not one our please should some that the their them
+    then there these they this those was what when where which who why will with
+    would you your
+    """.split()
+)
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="catalog-search")
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    name: str
+    description: str
+    parameters: Dict[str, Any]
+
+
+def _keyword_search(query: str, category: Optional[str], depth: int) -> Dict[str, Any]:
+    """BM25 over the product index where any query word may match.
+
+    Natural-language questions rarely have every word in one product, so the
+    keyword side ranks partial matches instead of requiring all tokens, after
+    dropping stopwords and tokens shorter than ``KEYWORD_MIN_LENGTH``.
+    """
+    index = tools.FIXTURE_STORE.current().product_index
+    tokens = [
+        token
+        for token in re.findall(r"[a-z0-9]+(?:-[a-z0-9]+)*", query.lower())
+        if len(token) >= KEYWORD_MIN_LENGTH and token not in KEYWORD_STOPWORDS
+    ]
+    positions = index.matching_any(tokens, category)
+    matches = [
+        {**index.products[position], "score": round(score, 4)}
+        for position, score in index.top(tokens, positions, depth)
+    ]
+    return {"matches": matches, "count": len(positions)}
+
+
+def _fuse(ranked_lists: Dict[str, List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+    """Reciprocal rank fusion over per-retriever result lists, deduplicated by SKU."""
+    fused: Dict[str, Dict[str, Any]] = {}
+    for source, matches in ranked_lists.items():
+        for rank, match in enumerate(matches, start=1):
+            sku = match.get("sku")
+            if not sku:
+                continue
+            entry = fused.setdefault(
+                sku,
+                {
+                    "sku": sku,
+                    "name": match.get("name"),
+                    "description": match.get("description"),
+                    "category": match.get("category"),
+                    "score": 0.0,
+                    "ranks": {},
+                },
+            )
+            entry["score"] += 1.0 / (RRF_K + rank)
+            entry["ranks"][source] = rank
+
+    ordered = sorted(fused.values(), key=lambda entry: -entry["score"])[:limit]
+    for entry in ordered:
+        entry["score"] = round(entry["score"], 6)
+    return ordered
+
+
+def search_catalog(query: str, category: Optional[str] = None, limit: int = 5) -> Dict[str, Any]:
+    """Search products by keyword and vector similarity in one call, fused by rank."""
+    limit = max(int(limit), 1)
+    depth = max(limit, CANDIDATE_DEPTH)
+    keyword = _EXECUTOR.submit(_keyword_search, query, category, depth)
+    vector = _EXECUTOR.submit(qdrant_tools.search_product_vectors, query, depth)
+
+    ranked_lists: Dict[str, List[Dict[str, Any]]] = {}
+    errors: Dict[str, str] = {}
+    for source, future in (("keyword", keyword), ("vector", vector)):
+        try:
+            result = future.result()
+        except Exception as exc:
+            result = {"error": str(exc)}
+        if "error" in result:
+            errors[source] = result["error"]
+            continue
+        matches = result.get("matches", [])
+        if category:
+            matches = [
+                match
+                for match in matches
+                if (match.get("category") or "").lower() == category.lower()
+            ]
+        ranked_lists[source] = matches
+
+    if not ranked_lists:
+        return {"error": "; ".join(f"{source}: {error}" for source, error in errors.items())}
+
+    matches = _fuse(ranked_lists, limit)
+    response: Dict[str, Any] = {"matches": matches, "count": len(matches)}
+    if errors:
+        response["errors"] = errors
+    return response
+
+
+TOOL_SPECS: List[ToolSpec] = [
+    ToolSpec(
+        name="search_catalog",
+        description=(
+            "Search products by keywords and semantic similarity at once; "
+            "returns one deduplicated, relevance-ranked list."
+        ),
+        parameters={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string"},
+                "category": {"type": "string"},
+                "limit": {"type": "integer", "default": 5},
+            },
+            "required": ["query"],
+        },
+    )
+]
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+CUSTOMER_CACHE_SIZE = int(os.getenv("CUSTOMER_CACHE_SIZE", "100000"))
+RESOLVE_CHUNK_ROWS = int(os.getenv("CUSTOMER_RESOLVE_CHUNK_ROWS", "1000"))
+
+# dialect -> (placeholder, keep-name conflict clause, update-name conflict clause)
+_DIALECTS: Dict[str, Tuple[str, str, str]] = {
+    "mysql": (
+        "%s",
+        " ON DUPLICATE KEY UPDATE email = email",
+        " ON DUPLICATE KEY UPDATE full_name = VALUES(full_name)",
+    ),
+    "sqlite": (
+        "?",
+        " ON CONFLICT (email) DO NOTHING",
+        " ON CONFLICT (email) DO UPDATE SET full_name = excluded.full_name",
+    ),
+}
+
+
+class UnresolvedCustomerError(LookupError):
+    """Emails ``resolve_many`` could not map back to a customer row."""
+
+    def __init__(self, emails: Sequence[str]) -> None:
+        super().__init__(f"No customer row matched: {', '.join(emails)}")
+        self.emails = list(emails)
+
+
+def _collation_key(email: str) -> str:
+    """Fold ``email`` the way MySQL's accent- and case-insensitive collations compare it.
+
+    Case and accents are ignored and PAD SPACE collations ignore trailing spaces.
+    """
+    email = email.rstrip(" ")
+    if email.isascii():
+        return email.lower()
+    decomposed = unicodedata.normalize("NFKD", email.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class CustomerResolver:
+    """Email -> customer_id resolution with a bounded LRU cache.
+
+    ``resolve_many`` creates missing customers with one multi-row upsert and
+    reads all ids back with one ``IN (...)`` query per chunk; cached emails
+    skip the database entirely. Emails are matched case-insensitively like
+    the ``customers.email`` column. The database may hand back a stored
+    spelling that differs in accents or trailing spaces, so rows are matched
+    back by a folded key, and any email still unmatched is looked up on its
+    own; emails even that misses are left out of the result.
+
+    Ids found inside a transaction must only be cached once it commits, so
+    transactional callers pass a ``deferred`` dict to collect the entries and
+    hand it to ``remember`` after committing.
+    """
+
+    def __init__(self, dialect: str = "mysql", max_entries: int = CUSTOMER_CACHE_SIZE) -> None:
+        if dialect not in _DIALECTS:
+            raise ValueError(f"Unknown SQL dialect: {dialect}")
+        self.dialect = dialect
+        self.placeholder, self._keep_name, self._update_name = _DIALECTS[dialect]
+        self.max_entries = max(int(max_entries), 1)
+        # Two bind parameters per email; older SQLite builds cap a statement at 999.
+        self.chunk_rows = RESOLVE_CHUNK_ROWS
+        if dialect == "sqlite":
+            self.chunk_rows = min(RESOLVE_CHUNK_ROWS, 400)
+        # lowercased email -> (customer_id, full_name)
+        self._entries: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.upserts = 0
+        self.evictions = 0
+        self.unresolved = 0
+
+    def _cached(self, email: str, full_name: str, update_name: bool) -> Any:
+        with self._lock:
+            entry = self._entries.get(email.lower())
+            if entry is not None and (not update_name or entry[1] == full_name):
+                self._entries.move_to_end(email.lower())
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def remember(self, resolved: Mapping[str, Tuple[int, str]]) -> None:
+        """Cache committed ``email -> (customer_id, full_name)`` pairs."""
+        with self._lock:
+            for email, entry in resolved.items():
+                key = email.lower()
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def resolve(
+        self,
+        cursor,
+        email: str,
+        full_name: str,
+        update_name: bool = False,
+        deferred: Optional[Dict[str, Tuple[int, str]]] = None,
+    ) -> Optional[int]:
+        """Return the customer_id for ``email``, creating the customer if needed.
+
+        On MySQL a miss costs one statement: the upsert sets
+        ``LAST_INSERT_ID(customer_id)`` on duplicates, so ``lastrowid`` is the
+        id whether the row was inserted or already existed. None if the row
+        could not be read back.
+        """
+        customer_id = self._cached(email, full_name, update_name)
+        if customer_id is not None:
+            return customer_id
+        if self.dialect != "mysql":
+            resolved = self._resolve_missing(cursor, {email: full_name}, update_name, deferred)
+            return resolved.get(email)
+
+        name_clause = ", full_name = VALUES(full_name)" if update_name else ""
+        cursor.execute(
+            "INSERT INTO customers (email, full_name) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE customer_id = LAST_INSERT_ID(customer_id)" + name_clause,
+            (email, full_name),
+        )
+        customer_id = cursor.lastrowid
+        with self._lock:
+            self.upserts += 1
+        # Without update_name the stored name may differ; cache it as unknown
+        # so a later update_name call still writes the name.
+        self._store({email: (customer_id, full_name if update_name else "")}, deferred)
+        return customer_id
+
+    def resolve_many(
+        self,
+        cursor,
+        customers: Mapping[str, str],
+        update_names: bool = False,
+        deferred: Optional[Dict[str, Tuple[int, str]]] = None,
+    ) -> Dict[str, int]:
+        """Map the emails in ``customers`` (email -> full_name) to customer_ids.
+
+        Emails missing from the result could not be matched back to a row;
+        callers report them, e.g. with ``UnresolvedCustomerError``.
+        """
+        resolved: Dict[str, int] = {}
+        missing: Dict[str, str] = {}
+        for email, full_name in customers.items():
+            customer_id = self._cached(email, full_name, update_names)
+            if customer_id is None:
+                missing[email] = full_name
+            else:
+                resolved[email] = customer_id
+        if missing:
+            resolved.update(self._resolve_missing(cursor, missing, update_names, deferred))
+        return resolved
+
+    def _store(
+        self,
+        entries: Mapping[str, Tuple[int, str]],
+        deferred: Optional[Dict[str, Tuple[int, str]]],
+    ) -> None:
+        if deferred is None:
+            self.remember(entries)
+        else:
+            deferred.update(entries)
+
+    def _resolve_missing(
+        self,
+        cursor,
+        customers: Mapping[str, str],
+        update_names: bool,
+        deferred: Optional[Dict[str, Tuple[int, str]]],
+    ) -> Dict[str, int]:
+        # Sorted so concurrent upserts lock customers rows in the same order.
+        emails = sorted(customers)
+        conflict = self._update_name if update_names else self._keep_name
+        group = f"({self.placeholder}, {self.placeholder})"
+        for chunk in _chunks(emails, self.chunk_rows):
+            cursor.execute(
+                "INSERT INTO customers (email, full_name) VALUES "
+                + ", ".join([group] * len(chunk))
+                + conflict,
+                [value for email in chunk for value in (email, customers[email])],
+            )
+
+        exact: Dict[str, Tuple[int, str]] = {}
+        folded: Dict[str, Tuple[int, str]] = {}
+        for chunk in _chunks(emails, self.chunk_rows):
+            placeholders = ", ".join([self.placeholder] * len(chunk))
+            cursor.execute(
+                "SELECT email, customer_id, full_name FROM customers "
+                f"WHERE email IN ({placeholders})",
+                list(chunk),
+            )
+            for email, customer_id, full_name in cursor.fetchall():
+                exact[email] = folded[_collation_key(email)] = (customer_id, full_name)
+
+        entries: Dict[str, Tuple[int, str]] = {}
+        unmatched = 0
+        for email in emails:
+            entry = exact.get(email) or folded.get(_collation_key(email))
+            if entry is None:
+                # Let the column's own collation decide which row this email hit.
+                cursor.execute(
+                    "SELECT customer_id, full_name FROM customers "
+                    f"WHERE email = {self.placeholder}",
+                    (email,),
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    unmatched += 1
+                    continue
+                entry = (row[0], row[1])
+            entries[email] = entry
+
+        with self._lock:
+            self.upserts += len(emails)
+            self.unresolved += unmatched
+        self._store(entries, deferred)
+        return {email: entry[0] for email, entry in entries.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "upserts": self.upserts,
+                "evictions": self.evictions,
+                "unresolved": self.unresolved,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _chunks(rows: Sequence[str], size: int) -> Iterator[List[str]]:
+    size = max(size, 1)
+    for start in range(0, len(rows), size):
+        yield list(rows[start : start + size])
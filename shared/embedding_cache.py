@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CacheKey = Tuple[str, int]
+
+
+class EmbeddingCache:
+    """Bounded, thread-safe LRU cache of text embeddings.
+
+    Entries are keyed by (sha1 of the text, dim). With ``path`` set, misses
+    also consult a SQLite file and new vectors are written to it, so a warm
+    cache survives worker restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024, path: Optional[Path] = None) -> None:
+        self.max_entries = max(int(max_entries), 1)
+        self.path = Path(path) if path else None
+        self._entries: "OrderedDict[CacheKey, Tuple[float, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self.disk_writes = 0
+
+    @staticmethod
+    def key(text: str, dim: int) -> CacheKey:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest(), dim
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                  text_hash TEXT NOT NULL,
+                  dim INTEGER NOT NULL,
+                  vector BLOB NOT NULL,
+                  PRIMARY KEY (text_hash, dim)
+                )
+                """
+            )
+        return self._db
+
+    def _store(self, key: CacheKey, vector: Tuple[float, ...]) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, text: str, dim: int, compute: Callable[[str, int], List[float]]) -> List[float]:
+        """Return the cached embedding for ``text``, computing it on a miss."""
+        key = self.key(text, dim)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(vector)
+            self.misses += 1
+
+            db = self._disk()
+            if db is not None:
+                row = db.execute(
+                    "SELECT vector FROM embeddings WHERE text_hash = ? AND dim = ?", key
+                ).fetchone()
+                if row is not None:
+                    vector = tuple(array("d", row[0]))
+                    self.disk_hits += 1
+                    self._store(key, vector)
+                    return list(vector)
+
+        # Compute outside the lock; a concurrent miss on the same text only
+        # costs a duplicate computation of the same deterministic vector.
+        vector = tuple(compute(text, dim))
+        with self._lock:
+            self._store(key, vector)
+            db = self._disk()
+            if db is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO embeddings (text_hash, dim, vector) VALUES (?, ?, ?)",
+                    (*key, array("d", vector).tobytes()),
+                )
+                db.commit()
+                self.disk_writes += 1
+        return list(vector)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_hits": self.disk_hits,
+                "disk_writes": self.disk_writes,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "path": str(self.path) if self.path else None,
+            }
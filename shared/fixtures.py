@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared.product_index import ProductIndex
+
+FIXTURE_FILES = ("products.json", "pricing.json", "orders.json")
+
+
+@dataclass(frozen=True)
+class FixtureSnapshot:
+    """One fully built, immutable generation of the fixture data."""
+
+    version: int
+    products: List[Dict[str, Any]]
+    pricing: Dict[str, Any]
+    orders: Dict[str, Any]
+    product_index: ProductIndex
+    content_hashes: Dict[str, str]
+    loaded_at: float
+
+
+@dataclass
+class ReloadStats:
+    reloads: int = 0
+    failed_reloads: int = 0
+    last_reload_ms: float = 0.0
+    max_reload_ms: float = 0.0
+    last_checked_at: float = 0.0
+    last_error: Optional[str] = None
+
+
+class FixtureStore:
+    """Loads the JSON fixtures and hot-swaps them when the files change.
+
+    Readers call ``current()`` once per tool call and work off that snapshot,
+    so a reload never exposes a half-built state: the replacement snapshot is
+    parsed and indexed off to the side, then published with a single
+    reference assignment. Nothing is read until the first ``current()`` call.
+    A background thread polls file mtimes and only rebuilds when the content
+    hash actually changed.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        reload_interval: float = 0.0,
+        files: Tuple[str, ...] = FIXTURE_FILES,
+    ) -> None:
+        self.data_dir = Path(data_dir)
+        self.reload_interval = reload_interval
+        self.files = files
+        self._lock = threading.Lock()
+        self._stats = ReloadStats()
+        self._mtimes: Dict[str, Tuple[int, int]] = {}
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._snapshot: Optional[FixtureSnapshot] = None
+
+    def current(self) -> FixtureSnapshot:
+        """Return the live snapshot, loading the fixtures on first use."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None:
+                raw, mtimes = self._read_files()
+                self._snapshot = self._build(version=1, raw=raw)
+                self._mtimes = mtimes
+                self.start_watching()
+            return self._snapshot
+
+    def _read_files(self) -> Tuple[Dict[str, bytes], Dict[str, Tuple[int, int]]]:
+        """Return the file contents and the (mtime, size) they were read at.
+
+        Callers record the mtimes only once the contents were accepted, so a
+        file that fails to parse is retried on the next poll.
+        """
+        raw: Dict[str, bytes] = {}
+        mtimes: Dict[str, Tuple[int, int]] = {}
+        for name in self.files:
+            path = self.data_dir / name
+            stat = path.stat()
+            mtimes[name] = (stat.st_mtime_ns, stat.st_size)
+            raw[name] = path.read_bytes()
+        return raw, mtimes
+
+    def _build(self, version: int, raw: Dict[str, bytes]) -> FixtureSnapshot:
+        products = json.loads(raw.get("products.json", b"[]"))
+        return FixtureSnapshot(
+            version=version,
+            products=products,
+            pricing=json.loads(raw.get("pricing.json", b'{"items": {}}')),
+            orders=json.loads(raw.get("orders.json", b"{}")),
+            product_index=ProductIndex(products),
+            content_hashes={
+                name: hashlib.sha1(payload).hexdigest() for name, payload in raw.items()
+            },
+            loaded_at=time.time(),
+        )
+
+    def _changed(self) -> bool:
+        for name in self.files:
+            try:
+                stat = (self.data_dir / name).stat()
+            except OSError:
+                return False
+            if self._mtimes.get(name) != (stat.st_mtime_ns, stat.st_size):
+                return True
+        return False
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild and publish a new snapshot if the fixture content changed."""
+        with self._lock:
+            if self._snapshot is None:
+                return False
+            self._stats.last_checked_at = time.time()
+            if not force and not self._changed():
+                return False
+
+            started = time.perf_counter()
+            previous = self._snapshot
+            try:
+                raw, mtimes = self._read_files()
+                hashes = {name: hashlib.sha1(payload).hexdigest() for name, payload in raw.items()}
+                if not force and hashes == previous.content_hashes:
+                    self._mtimes = mtimes
+                    return False
+                snapshot = self._build(version=previous.version + 1, raw=raw)
+            except (OSError, ValueError, KeyError) as exc:
+                # Keep serving the previous snapshot. The old mtimes stay
+                # recorded, so the next poll tries the broken files again.
+                self._stats.failed_reloads += 1
+                self._stats.last_error = str(exc)
+                return False
+
+            self._snapshot = snapshot
+            self._mtimes = mtimes
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._stats.reloads += 1
+            self._stats.last_reload_ms = elapsed_ms
+            self._stats.max_reload_ms = max(self._stats.max_reload_ms, elapsed_ms)
+            self._stats.last_error = None
+            return True
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            self.reload()
+
+    def start_watching(self) -> None:
+        if self.reload_interval <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="fixture-reload", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Version and reload-latency counters for confirming a replica is current."""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else 0,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "content_hashes": dict(snapshot.content_hashes) if snapshot else {},
+            "reloads": self._stats.reloads,
+            "failed_reloads": self._stats.failed_reloads,
+            "last_reload_ms": round(self._stats.last_reload_ms, 3),
+            "max_reload_ms": round(self._stats.max_reload_ms, 3),
+            "last_checked_at": self._stats.last_checked_at,
+            "last_error": self._stats.last_error,
+        }
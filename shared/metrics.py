@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict
+
+
+class LatencyStats:
+    """Thread-safe call counter with latency percentiles over a sliding window."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+
+    def record(self, elapsed_ms: float, error: bool = False) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if error:
+                self.errors += 1
+            self._samples.append(elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+            count, errors, total_ms = self.count, self.errors, self.total_ms
+
+        def percentile(fraction: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(int(fraction * len(samples)), len(samples) - 1)], 3)
+
+        return {
+            "count": count,
+            "errors": errors,
+            "mean_ms": round(total_ms / count, 3) if count else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(samples[-1], 3) if samples else 0.0,
+        }
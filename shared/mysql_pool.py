@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from shared.metrics import LatencyStats
+
+
+def connect() -> Any:
+    """Open a new MySQL connection from the MYSQL_* environment variables."""
+    import mysql.connector
+
+    return mysql.connector.connect(
+        host=os.getenv("MYSQL_HOST", "localhost"),
+        port=int(os.getenv("MYSQL_PORT", "3306")),
+        user=os.getenv("MYSQL_USER", "root"),
+        password=os.getenv("MYSQL_PASSWORD", ""),
+        database=os.getenv("MYSQL_DATABASE", "driftdesk_support"),
+        autocommit=True,
+        # Needed by the ETL's LOAD DATA LOCAL INFILE path (server local_infile=ON too).
+        allow_local_infile=os.getenv("MYSQL_LOCAL_INFILE", "0") == "1",
+    )
+
+
+class PoolTimeout(RuntimeError):
+    pass
+
+
+class ConnectionPool:
+    """Thread-safe MySQL connection pool.
+
+    Keeps up to ``size`` idle connections and allows ``max_overflow`` extra
+    ones under load, which are closed on return. Idle connections older than
+    ``recycle_seconds`` are replaced, and with ``pre_ping`` each checkout
+    verifies the connection is still alive before handing it out. Returned
+    connections are rolled back and put back in ``autocommit`` mode, so a
+    borrower's open transaction or session change never leaks to the next.
+    """
+
+    def __init__(
+        self,
+        size: int = 5,
+        max_overflow: int = 5,
+        pre_ping: bool = True,
+        recycle_seconds: float = 3600.0,
+        timeout: float = 30.0,
+        autocommit: bool = True,
+        connector: Callable[[], Any] = connect,
+    ) -> None:
+        self.size = max(int(size), 1)
+        self.max_overflow = max(int(max_overflow), 0)
+        self.pre_ping = pre_ping
+        self.recycle_seconds = recycle_seconds
+        self.timeout = timeout
+        self.autocommit = autocommit
+        self._connector = connector
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._open = 0
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self.wait_stats = LatencyStats()
+        self.counters: Dict[str, int] = {
+            "checkouts": 0,
+            "connects": 0,
+            "recycled": 0,
+            "ping_failures": 0,
+            "discarded": 0,
+            "reset_failures": 0,
+            "timeouts": 0,
+        }
+
+    def _new_connection(self) -> Tuple[Any, float]:
+        connection = self._connector()
+        with self._condition:
+            self.counters["connects"] += 1
+        return connection, time.monotonic()
+
+    def _close(self, connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _checkout(self) -> Tuple[Any, float]:
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while not self._idle and self._open >= self.size + self.max_overflow:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters["timeouts"] += 1
+                    self.wait_stats.record((time.perf_counter() - started) * 1000, error=True)
+                    raise PoolTimeout(
+                        f"No MySQL connection available within {self.timeout:.0f}s "
+                        f"(size={self.size}, max_overflow={self.max_overflow})"
+                    )
+                self._condition.wait(remaining)
+            entry = self._idle.popleft() if self._idle else None
+            if entry is None:
+                self._open += 1
+            self._in_use += 1
+            self.counters["checkouts"] += 1
+
+        try:
+            if entry is not None:
+                connection, created = entry
+                if time.monotonic() - created > self.recycle_seconds:
+                    self._close(connection)
+                    with self._condition:
+                        self.counters["recycled"] += 1
+                    entry = None
+                elif self.pre_ping and not connection.is_connected():
+                    self._close(connection)
+                    with self._condition:
+                        self.counters["ping_failures"] += 1
+                    entry = None
+            if entry is None:
+                entry = self._new_connection()
+        except Exception:
+            with self._condition:
+                self._open -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+        self.wait_stats.record((time.perf_counter() - started) * 1000)
+        return entry
+
+    def _reset(self, connection: Any) -> bool:
+        """Discard any open transaction and restore the pool's autocommit mode."""
+        try:
+            connection.rollback()
+            # Reading ``autocommit`` costs a round trip too, so just set it.
+            connection.autocommit = self.autocommit
+        except Exception:
+            with self._condition:
+                self.counters["reset_failures"] += 1
+            return False
+        return True
+
+    def _checkin(self, entry: Tuple[Any, float], broken: bool) -> None:
+        if not broken and not self._reset(entry[0]):
+            broken = True
+        with self._condition:
+            self._in_use -= 1
+            keep = not broken and len(self._idle) < self.size
+            if keep:
+                self._idle.append(entry)
+            else:
+                self._open -= 1
+                if broken:
+                    self.counters["discarded"] += 1
+            self._condition.notify()
+        if not keep:
+            self._close(entry[0])
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection for the duration of the ``with`` block."""
+        entry = self._checkout()
+        broken = False
+        try:
+            yield entry[0]
+        except BaseException:
+            # Roll back anything the block left open; if even that fails the
+            # connection is unusable and is dropped instead of pooled.
+            try:
+                entry[0].rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            self._checkin(entry, broken)
+
+    def close(self) -> None:
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+        for connection, _ in idle:
+            self._close(connection)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            state = {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                **self.counters,
+            }
+        state["wait"] = self.wait_stats.snapshot()
+        return state
+
+
+_POOL: Optional[ConnectionPool] = None
+_POOL_PID: Optional[int] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool configured from MYSQL_POOL_* variables.
+
+    A forked child gets a fresh pool rather than sharing its parent's sockets.
+    """
+    global _POOL, _POOL_PID
+    if _POOL is not None and _POOL_PID == os.getpid():
+        return _POOL
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_PID != os.getpid():
+            _POOL = ConnectionPool(
+                size=int(os.getenv("MYSQL_POOL_SIZE", "5")),
+                max_overflow=int(os.getenv("MYSQL_POOL_MAX_OVERFLOW", "5")),
+                pre_ping=os.getenv("MYSQL_POOL_PRE_PING", "1") != "0",
+                recycle_seconds=float(os.getenv("MYSQL_POOL_RECYCLE", "3600")),
+                timeout=float(os.getenv("MYSQL_POOL_TIMEOUT", "30")),
+            )
+            _POOL_PID = os.getpid()
+        return _POOL
@@ -1,12 +1,23 @@
 from __future__ import annotations
 
+import base64
+import json
 import os
-import uuid
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import mysql.connector
-from mysql.connector import MySQLConnection
+from shared.customer_resolver import UnresolvedCustomerError
+from shared.mysql_pool import get_pool
+from shared.ticket_cache import TicketCache
+from shared.ticket_store import get_store
+from shared.update_queue import WRITE_BEHIND_ENABLED, get_update_queue
+
+TICKET_REQUIRED_FIELDS = ("email", "full_name", "subject", "issue")
+
+TICKET_CACHE = TicketCache(
+    max_entries=int(os.getenv("TICKET_CACHE_SIZE", "512")),
+    ttl_seconds=float(os.getenv("TICKET_CACHE_TTL", "30")),
+)
 
 
 @dataclass(frozen=True)
@@ -16,27 +27,30 @@ class ToolSpec:
     parameters: Dict[str, Any]
 
 
-def _get_connection() -> MySQLConnection:
-    return mysql.connector.connect(
-        host=os.getenv("MYSQL_HOST", "localhost"),
-        port=int(os.getenv("MYSQL_PORT", "3306")),
-        user=os.getenv("MYSQL_USER", "root"),
-        password=os.getenv("MYSQL_PASSWORD", ""),
-        database=os.getenv("MYSQL_DATABASE", "driftdesk_support"),
-        autocommit=True,
-    )
+def pool_stats() -> Dict[str, Any]:
+    """Checkout, handshake and wait-time counters for the shared MySQL pool."""
+    return get_pool().stats()
+
+
+def store_stats() -> Dict[str, Any]:
+    """Which ticket backend is active, plus its connection counters."""
+    return get_store().stats()
+
+
+def ticket_cache_stats() -> Dict[str, Any]:
+    """Hit ratio and eviction counters for the ``get_ticket`` view cache."""
+    return TICKET_CACHE.stats()
+
 
+def update_queue_stats() -> Dict[str, Any]:
+    """Queue depth, batch sizes and flush/lag latency for write-behind updates."""
+    if not WRITE_BEHIND_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **get_update_queue(on_flush=_invalidate_tickets).stats()}
 
-def _get_or_create_customer(cursor, email: str, full_name: str) -> int:
-    cursor.execute("SELECT customer_id FROM customers WHERE email = %s", (email,))
-    row = cursor.fetchone()
-    if row:
-        return row[0]
-    cursor.execute(
-        "INSERT INTO customers (email, full_name) VALUES (%s, %s)",
-        (email, full_name),
-    )
-    return cursor.lastrowid
+
+def _invalidate_tickets(ticket_ids: List[str]) -> None:
+    TICKET_CACHE.invalidate(*ticket_ids)
 
 
 def create_support_ticket(
@@ -50,117 +64,121 @@ def create_support_ticket(
     tags: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
     """Create a support ticket and initial update entry."""
-    ticket_id = f"TCK-{uuid.uuid4().hex[:6].upper()}"
-    tags = tags or []
-
-    with _get_connection() as connection:
-        cursor = connection.cursor()
-        customer_id = _get_or_create_customer(cursor, email, full_name)
-        cursor.execute(
-            """
-            INSERT INTO support_tickets
-              (ticket_id, customer_id, order_id, subject, status, priority, channel)
-            VALUES
-              (%s, %s, %s, %s, %s, %s, %s)
-            """,
-            (ticket_id, customer_id, order_id, subject, "open", priority, channel),
-        )
-        cursor.execute(
-            """
-            INSERT INTO ticket_updates (ticket_id, update_type, note)
-            VALUES (%s, %s, %s)
-            """,
-            (ticket_id, "customer", issue),
-        )
-        for tag in tags:
-            cursor.execute(
-                "INSERT INTO ticket_tags (ticket_id, tag) VALUES (%s, %s)",
-                (ticket_id, tag),
-            )
+    ticket = {
+        "email": email,
+        "full_name": full_name,
+        "subject": subject,
+        "issue": issue,
+        "order_id": order_id,
+        "priority": priority,
+        "channel": channel,
+        "tags": tags or [],
+    }
+    store = get_store()
+    try:
+        (ticket_id,) = store.create_tickets([ticket])
+    except (UnresolvedCustomerError, *store.database_errors()) as exc:
+        return {"error": f"Could not create ticket: {exc}"}
+    TICKET_CACHE.invalidate(ticket_id)
 
     return {"ticket_id": ticket_id, "status": "open"}
 
 
+def create_support_tickets_bulk(tickets: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create many tickets in one transaction using multi-row inserts.
+
+    Each item takes the same fields as ``create_support_ticket``. Nothing is
+    written if any item is missing a required field or the transaction fails.
+    """
+    for position, ticket in enumerate(tickets):
+        missing = [field for field in TICKET_REQUIRED_FIELDS if not ticket.get(field)]
+        if missing:
+            return {"error": f"Ticket {position} is missing: {', '.join(missing)}"}
+    if not tickets:
+        return {"ticket_ids": [], "count": 0, "status": "open"}
+
+    store = get_store()
+    try:
+        ticket_ids = store.create_tickets(tickets)
+    except (UnresolvedCustomerError, *store.database_errors()) as exc:
+        return {"error": f"Could not create tickets: {exc}"}
+    TICKET_CACHE.invalidate(*ticket_ids)
+
+    return {"ticket_ids": ticket_ids, "count": len(ticket_ids), "status": "open"}
+
+
 def add_ticket_update(ticket_id: str, update_type: str, note: str) -> Dict[str, Any]:
-    """Append an update to a support ticket."""
-    with _get_connection() as connection:
-        cursor = connection.cursor()
-        cursor.execute(
-            "SELECT ticket_id FROM support_tickets WHERE ticket_id = %s", (ticket_id,)
-        )
-        if cursor.fetchone() is None:
+    """Append an update to a support ticket.
+
+    With TICKET_UPDATE_WRITE_BEHIND=1 the update is validated and queued for a
+    group commit instead, and the result status is ``queued``.
+    """
+    if WRITE_BEHIND_ENABLED:
+        if not get_store().ticket_exists(ticket_id):
             return {"error": f"Ticket not found: {ticket_id}"}
-        cursor.execute(
-            "INSERT INTO ticket_updates (ticket_id, update_type, note) VALUES (%s, %s, %s)",
-            (ticket_id, update_type, note),
-        )
+        get_update_queue(on_flush=_invalidate_tickets).submit(ticket_id, update_type, note)
+        return {"ticket_id": ticket_id, "status": "queued"}
+    if not get_store().add_update(ticket_id, update_type, note):
+        return {"error": f"Ticket not found: {ticket_id}"}
+    TICKET_CACHE.invalidate(ticket_id)
     return {"ticket_id": ticket_id, "status": "updated"}
 
 
 def get_ticket(ticket_id: str) -> Dict[str, Any]:
     """Fetch a ticket with latest updates."""
-    with _get_connection() as connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM support_tickets WHERE ticket_id = %s", (ticket_id,))
-        ticket = cursor.fetchone()
-        if not ticket:
-            return {"error": f"Ticket not found: {ticket_id}"}
-        cursor.execute(
-            """
-            SELECT update_type, note, updated_at
-            FROM ticket_updates
-            WHERE ticket_id = %s
-            ORDER BY updated_at DESC
-            LIMIT 5
-            """,
-            (ticket_id,),
-        )
-        updates = cursor.fetchall()
-        cursor.execute("SELECT tag FROM ticket_tags WHERE ticket_id = %s", (ticket_id,))
-        tags = [row["tag"] for row in cursor.fetchall()]
-
-    return {"ticket": ticket, "recent_updates": updates, "tags": tags}
-
-
-def list_open_tickets(limit: int = 10) -> Dict[str, Any]:
-    """List open or pending tickets."""
-    with _get_connection() as connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute(
-            """
-            SELECT ticket_id, subject, status, priority, created_at
-            FROM support_tickets
-            WHERE status IN ('open', 'pending')
-            ORDER BY created_at DESC
-            LIMIT %s
-            """,
-            (max(limit, 1),),
-        )
-        tickets = cursor.fetchall()
-    return {"tickets": tickets, "count": len(tickets)}
+    view = TICKET_CACHE.get(ticket_id, get_store().load_ticket_view)
+    if view is None:
+        return {"error": f"Ticket not found: {ticket_id}"}
+    return view
+
+
+def _encode_cursor(row: Dict[str, Any]) -> str:
+    created_at = row["created_at"]
+    if hasattr(created_at, "isoformat"):
+        created_at = created_at.isoformat(sep=" ")
+    payload = json.dumps([str(created_at), row["ticket_id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    created_at, ticket_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    return str(created_at), str(ticket_id)
+
+
+def list_open_tickets(limit: int = 10, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """List open or pending tickets, newest first.
+
+    Pass the returned ``next_cursor`` back as ``cursor`` to fetch the next page.
+    """
+    limit = max(limit, 1)
+    try:
+        after = _decode_cursor(cursor) if cursor else None
+    except (ValueError, TypeError):
+        return {"error": f"Invalid cursor: {cursor}"}
+
+    tickets = get_store().list_open(limit + 1, after)
+    next_cursor = None
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        next_cursor = _encode_cursor(tickets[-1])
+    return {"tickets": tickets, "count": len(tickets), "next_cursor": next_cursor}
 
 
 def close_ticket(ticket_id: str, resolution_note: str) -> Dict[str, Any]:
     """Close a ticket and write a resolution update."""
-    with _get_connection() as connection:
-        cursor = connection.cursor()
-        cursor.execute(
-            "UPDATE support_tickets SET status = %s, closed_at = NOW() WHERE ticket_id = %s",
-            ("closed", ticket_id),
-        )
-        if cursor.rowcount == 0:
-            return {"error": f"Ticket not found: {ticket_id}"}
-        cursor.execute(
-            "INSERT INTO ticket_updates (ticket_id, update_type, note) VALUES (%s, %s, %s)",
-            (ticket_id, "resolution", resolution_note),
-        )
+    if WRITE_BEHIND_ENABLED:
+        # Queued notes were written before the resolution; commit them first.
+        get_update_queue(on_flush=_invalidate_tickets).flush()
+    if not get_store().close(ticket_id, resolution_note):
+        return {"error": f"Ticket not found: {ticket_id}"}
+    TICKET_CACHE.invalidate(ticket_id)
     return {"ticket_id": ticket_id, "status": "closed"}
 
 
 TOOL_SPECS: List[ToolSpec] = [
     ToolSpec(
         name="create_support_ticket",
-        description="Create a support ticket in MySQL.",
+        description="Create a support ticket.",
         parameters={
             "type": "object",
             "properties": {
@@ -200,10 +218,16 @@ TOOL_SPECS: List[ToolSpec] = [
     ),
     ToolSpec(
         name="list_open_tickets",
-        description="List open or pending support tickets.",
+        description=(
+            "List open or pending support tickets, newest first. "
+            "Pass next_cursor back as cursor to get the next page."
+        ),
         parameters={
             "type": "object",
-            "properties": {"limit": {"type": "integer", "default": 10}},
+            "properties": {
+                "limit": {"type": "integer", "default": 10},
+                "cursor": {"type": "string"},
+            },
         },
     ),
     ToolSpec(
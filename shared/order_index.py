@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# orders.idx: header, then fixed-width entries sorted by key
+#   header  = magic(8) | count(u64) | key_width(u32) | build_id(16)
+#   entry   = key(key_width, NUL padded) | offset(u64) | length(u32)
+# orders.dat: build_id(16), then the order records as compact UTF-8 JSON,
+# back to back. Both files of one build carry the same random build_id.
+MAGIC = b"DDORDX02"
+_HEADER = struct.Struct("<8sQI16s")
+_BUILD_ID = struct.Struct("<16s")
+_POINTER = struct.Struct("<QI")
+
+# A rebuild swaps the two files with separate renames, so an open that lands
+# between them sees a mismatched pair and tries again.
+OPEN_ATTEMPTS = 100
+OPEN_RETRY_SECONDS = 0.01
+
+
+def index_paths(prefix: Path) -> Tuple[Path, Path]:
+    prefix = Path(prefix)
+    return prefix.with_name(prefix.name + ".idx"), prefix.with_name(prefix.name + ".dat")
+
+
+def index_signature(prefix: Path) -> Tuple[int, int, int]:
+    """(inode, mtime_ns, size) of the index file; changes when a rebuild swaps it in."""
+    stat = index_paths(prefix)[0].stat()
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _iter_source(source: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    if source.suffix == ".jsonl":
+        with source.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                order_id = record.pop("order_id")
+                yield order_id, record
+        return
+
+    with source.open("r", encoding="utf-8") as handle:
+        orders = json.load(handle)
+    if isinstance(orders, dict):
+        yield from orders.items()
+    else:
+        for record in orders:
+            record = dict(record)
+            yield record.pop("order_id"), record
+
+
+def build_order_index(source: Path, prefix: Path) -> Dict[str, Any]:
+    """Convert an orders.json mapping or a JSONL dump into the on-disk index.
+
+    Records are streamed into the data file; only the (key, offset, length)
+    triples are held in memory for sorting. Both files are written next to
+    their final names and swapped in with ``os.replace`` so running readers
+    keep their existing mapping; a shared build id lets readers reject a pair
+    from two different builds.
+    """
+    idx_path, dat_path = index_paths(prefix)
+    idx_tmp = idx_path.with_name(idx_path.name + ".tmp")
+    dat_tmp = dat_path.with_name(dat_path.name + ".tmp")
+
+    build_id = uuid.uuid4().bytes
+    pointers: List[Tuple[bytes, int, int]] = []
+    offset = _BUILD_ID.size
+    with dat_tmp.open("wb") as data:
+        data.write(_BUILD_ID.pack(build_id))
+        for order_id, record in _iter_source(Path(source)):
+            payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+            data.write(payload)
+            pointers.append((order_id.encode("utf-8"), offset, len(payload)))
+            offset += len(payload)
+
+    pointers.sort()
+    for previous, current in zip(pointers, pointers[1:]):
+        if previous[0] == current[0]:
+            raise ValueError(f"Duplicate order id: {current[0].decode('utf-8')}")
+    key_width = max((len(key) for key, _, _ in pointers), default=1)
+
+    with idx_tmp.open("wb") as index:
+        index.write(_HEADER.pack(MAGIC, len(pointers), key_width, build_id))
+        for key, record_offset, length in pointers:
+            index.write(key.ljust(key_width, b"\0"))
+            index.write(_POINTER.pack(record_offset, length))
+
+    os.replace(dat_tmp, dat_path)
+    os.replace(idx_tmp, idx_path)
+    return {"orders": len(pointers), "index": str(idx_path), "data": str(dat_path)}
+
+
+class OrderIndex:
+    """Read-only order lookups over the memory-mapped index files.
+
+    Opening only maps the files, so startup cost does not grow with the number
+    of orders, and the page cache is shared by every worker process mapping
+    the same files. Lookups binary-search the fixed-width key table.
+    ``signature`` identifies the index file that was mapped.
+    """
+
+    def __init__(self, prefix: Path) -> None:
+        idx_path, dat_path = index_paths(prefix)
+        for _ in range(OPEN_ATTEMPTS):
+            with idx_path.open("rb") as handle:
+                stat = os.fstat(handle.fileno())
+                self.signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                self._index = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            with dat_path.open("rb") as handle:
+                self._data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+            if len(self._index) < _HEADER.size:
+                self.close()
+                raise ValueError(f"Not an order index: {idx_path}")
+            magic, self.count, self.key_width, build_id = _HEADER.unpack_from(self._index, 0)
+            if magic != MAGIC:
+                self.close()
+                raise ValueError(f"Not an order index (rebuild it): {idx_path}")
+            data_id = self._data[: _BUILD_ID.size]
+            if data_id == build_id:
+                break
+            self.close()
+            time.sleep(OPEN_RETRY_SECONDS)
+        else:
+            raise ValueError(f"Order index and data files are from different builds: {prefix}")
+        self._entry_size = self.key_width + _POINTER.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _key_at(self, slot: int) -> bytes:
+        start = _HEADER.size + slot * self._entry_size
+        return self._index[start : start + self.key_width]
+
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        key = order_id.encode("utf-8")
+        if len(key) > self.key_width:
+            return None
+        key = key.ljust(self.key_width, b"\0")
+
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self._key_at(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low == self.count or self._key_at(low) != key:
+            return None
+
+        start = _HEADER.size + low * self._entry_size + self.key_width
+        offset, length = _POINTER.unpack_from(self._index, start)
+        return json.loads(self._data[offset : offset + length])
+
+    def close(self) -> None:
+        self._index.close()
+        self._data.close()
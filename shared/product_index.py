@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Any, Collection, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+_EXPANSION_CACHE_SIZE = 4096
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_FIELD_WEIGHTS: Dict[str, float] = {"name": 2.0, "tags": 1.5, "description": 1.0}
+
+
+class ProductIndex:
+    """In-memory inverted index over product name, description and tags.
+
+    Each whitespace-delimited term maps to the catalog positions that contain
+    it, so a keyword query becomes a posting-list intersection instead of a
+    scan. Query tokens keep substring semantics: a token matches every indexed
+    term that contains it. Postings carry a BM25F-normalized term frequency so
+    the same lists can also rank results.
+    """
+
+    def __init__(self, products: Sequence[Dict[str, Any]]) -> None:
+        self.products = products
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.categories: Dict[str, List[int]] = {}
+        self._expansions: Dict[str, Dict[int, float]] = {}
+
+        field_lengths = [0] * len(BM25_FIELD_WEIGHTS)
+        for product in products:
+            for slot, field in enumerate(BM25_FIELD_WEIGHTS):
+                field_lengths[slot] += len(_field_text(product, field).split())
+        count = len(products) or 1
+        average_lengths = [(total / count) or 1.0 for total in field_lengths]
+
+        for position, product in enumerate(products):
+            weighted: Dict[str, float] = {}
+            for slot, (field, weight) in enumerate(BM25_FIELD_WEIGHTS.items()):
+                terms = _field_text(product, field).lower().split()
+                norm = 1 - BM25_B + BM25_B * len(terms) / average_lengths[slot]
+                for term in terms:
+                    weighted[term] = weighted.get(term, 0.0) + weight / norm
+            for term, tf in weighted.items():
+                self.postings.setdefault(term, {})[position] = tf
+            self.categories.setdefault(product["category"].lower(), []).append(position)
+
+    def _scores_for(self, token: str) -> Dict[int, float]:
+        """Map each position containing ``token`` to its BM25 contribution."""
+        cached = self._expansions.get(token)
+        if cached is not None:
+            return cached
+        total_docs = len(self.products)
+        scores: Dict[int, float] = {}
+        for term, postings in self.postings.items():
+            if token not in term:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+            for position, tf in postings.items():
+                gain = idf * tf * (BM25_K1 + 1) / (tf + BM25_K1)
+                scores[position] = scores.get(position, 0.0) + gain
+        if len(self._expansions) >= _EXPANSION_CACHE_SIZE:
+            self._expansions.clear()
+        self._expansions[token] = scores
+        return scores
+
+    def match(self, tokens: Iterable[str], category: Optional[str] = None) -> Set[int]:
+        """Return the set of catalog positions matching every token."""
+        candidates: List[Collection[int]] = [self._scores_for(token) for token in set(tokens)]
+        if category:
+            candidates.append(self.categories.get(category.lower(), ()))
+        if not candidates:
+            return set(range(len(self.products)))
+
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for positions in candidates[1:]:
+            if not result:
+                break
+            result.intersection_update(positions)
+        return result
+
+    def matching_any(self, tokens: Iterable[str], category: Optional[str] = None) -> Set[int]:
+        """Return the set of catalog positions matching at least one token."""
+        result: Set[int] = set()
+        for token in set(tokens):
+            result.update(self._scores_for(token))
+        if category:
+            result.intersection_update(self.categories.get(category.lower(), ()))
+        return result
+
+    def first(self, positions: Set[int], limit: int) -> List[int]:
+        """Return the first ``limit`` positions in catalog order."""
+        return heapq.nsmallest(limit, positions)
+
+    def top(self, tokens: Iterable[str], positions: Set[int], limit: int) -> List[Tuple[int, float]]:
+        """Return the ``limit`` best (position, score) pairs by BM25 score."""
+        token_scores = [self._scores_for(token) for token in set(tokens)]
+        scored = (
+            (sum((scores.get(position, 0.0) for scores in token_scores), 0.0), -position)
+            for position in positions
+        )
+        return [(-negated, score) for score, negated in heapq.nlargest(limit, scored)]
+
+
+def _field_text(product: Dict[str, Any], field: str) -> str:
+    if field == "tags":
+        return " ".join(product.get("tags", []))
+    return product[field]
@@ -1,24 +1,58 @@
 from __future__ import annotations
 
 import hashlib
+import json
 import math
 import os
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 
-try:
+from shared.embedding_cache import EmbeddingCache
+from shared.metrics import LatencyStats
+from shared.tools import FIXTURE_STORE
+from shared.vector_index import SearchHit, build_index
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
     from qdrant_client import QdrantClient
-    from qdrant_client.http.models import PointStruct, VectorParams, Distance
-except ImportError:  # pragma: no cover - optional dependency
-    QdrantClient = None
-    PointStruct = None
-    VectorParams = None
-    Distance = None
 
 
 DEFAULT_COLLECTION = os.getenv("QDRANT_COLLECTION", "driftdesk_products")
 DEFAULT_DIM = int(os.getenv("QDRANT_VECTOR_DIM", "128"))
 DEFAULT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
+DEFAULT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "10"))
+DEFAULT_POOL_SIZE = int(os.getenv("QDRANT_POOL_SIZE", "8"))
+EMBED_BATCH_ROWS = 4096
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant").lower()
+LOCAL_INDEX_EXACT_MAX = int(os.getenv("LOCAL_INDEX_EXACT_MAX", "100000"))
+LOCAL_INDEX_QUANTIZE = os.getenv("LOCAL_INDEX_QUANTIZE", "").lower() == "int8"
+QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "").lower()
+QDRANT_OVERSAMPLING = float(os.getenv("QDRANT_OVERSAMPLING", "2.0"))
+SEED_BATCH_SIZE = int(os.getenv("QDRANT_SEED_BATCH_SIZE", "256"))
+SEED_PARALLELISM = int(os.getenv("QDRANT_SEED_PARALLELISM", "4"))
+
+EMBEDDING_CACHE = EmbeddingCache(
+    max_entries=int(os.getenv("EMBED_CACHE_SIZE", "1024")),
+    path=os.getenv("EMBED_CACHE_PATH") or None,
+)
+
+T = TypeVar("T")
+
+_CLIENT: Optional[QdrantClient] = None
+_CLIENT_LOCK = threading.Lock()
+_CLIENT_STATS = LatencyStats()
+_RECONNECTS = 0
+_WARM_UP_THREAD: Optional[threading.Thread] = None
+_WARM_UP_RESULT: Optional[Dict[str, Any]] = None
+_WARM_UP_LOCK = threading.Lock()
+
+# (fixture snapshot version, index) for VECTOR_BACKEND=local
+_LOCAL_INDEX: Optional[Tuple[int, Any]] = None
+_LOCAL_INDEX_LOCK = threading.Lock()
 
 
 @dataclass(frozen=True)
@@ -37,32 +71,272 @@ def embed_text(text: str, dim: int = DEFAULT_DIM) -> List[float]:
     return [val / norm for val in vector]
 
 
+def _numpy():
+    try:
+        import numpy
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("numpy not installed") from exc
+    return numpy
+
+
+def embed_batch(texts: Sequence[str], dim: int = DEFAULT_DIM) -> Any:
+    """Embed many texts at once as a C-contiguous float32 matrix.
+
+    Row ``i`` equals ``embed_text(texts[i], dim)`` cast to float32: the byte
+    histogram is an exact integer ``bincount`` and the norm and division are
+    done in float64 before the single cast, so results are bit-identical.
+    """
+    np = _numpy()
+    matrix = np.empty((len(texts), dim), dtype=np.float32)
+    for start in range(0, len(texts), EMBED_BATCH_ROWS):
+        encoded = [text.encode("utf-8") for text in texts[start : start + EMBED_BATCH_ROWS]]
+        rows = len(encoded)
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=rows)
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.int64)
+        row_ids = np.repeat(np.arange(rows, dtype=np.int64), lengths)
+        positions = np.arange(data.size, dtype=np.int64) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        counts = np.bincount(
+            row_ids * dim + (data + positions) % dim, minlength=rows * dim
+        ).reshape(rows, dim)
+        norms = np.sqrt((counts * counts).sum(axis=1).astype(np.float64))
+        norms[norms == 0] = 1.0
+        matrix[start : start + rows] = counts / norms[:, None]
+    return matrix
+
+
+def _product_text(product: Dict[str, Any]) -> str:
+    return " ".join(
+        [
+            product.get("name", ""),
+            product.get("description", ""),
+            " ".join(product.get("tags", [])),
+        ]
+    )
+
+
+def _embed_products(products: Sequence[Dict[str, Any]]) -> List[List[float]]:
+    texts = [_product_text(product) for product in products]
+    try:
+        return embed_batch(texts).tolist()
+    except RuntimeError:
+        return [embed_text(text) for text in texts]
+
+
+def _qdrant_models():
+    try:
+        from qdrant_client.http import models
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("qdrant-client not installed") from exc
+    return models
+
+
 def _get_client() -> QdrantClient:
-    if QdrantClient is None:
-        raise RuntimeError("qdrant-client not installed")
-    return QdrantClient(url=DEFAULT_URL)
+    """Return the process-wide client, creating it on first use."""
+    global _CLIENT
+    client = _CLIENT
+    if client is not None:
+        return client
+    try:
+        import httpx
+        from qdrant_client import QdrantClient
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("qdrant-client not installed") from exc
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            # qdrant-client turns keep-alive off for localhost by default;
+            # keep a small pool of warm connections instead.
+            _CLIENT = QdrantClient(
+                url=DEFAULT_URL,
+                timeout=DEFAULT_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=DEFAULT_POOL_SIZE,
+                    max_keepalive_connections=DEFAULT_POOL_SIZE,
+                ),
+            )
+        return _CLIENT
 
 
-def search_product_vectors(query: str, limit: int = 3) -> Dict[str, Any]:
-    """Search product info stored in Qdrant."""
+def reset_client() -> None:
+    """Drop the shared client so the next call opens a fresh connection."""
+    global _CLIENT, _RECONNECTS
+    with _CLIENT_LOCK:
+        client, _CLIENT = _CLIENT, None
+        if client is not None:
+            _RECONNECTS += 1
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+@lru_cache(maxsize=1)
+def _transport_errors() -> Tuple[type, ...]:
+    """Exception types that mean the connection failed, not the request."""
+    errors: List[type] = [ConnectionError, TimeoutError]
     try:
+        import httpx
+
+        errors.append(httpx.TransportError)  # includes httpx timeouts
+    except ImportError:  # pragma: no cover - optional dependency
+        pass
+    try:
+        from qdrant_client.http.exceptions import ResponseHandlingException
+
+        errors.append(ResponseHandlingException)
+    except ImportError:  # pragma: no cover - optional dependency
+        pass
+    return tuple(errors)
+
+
+def _call(operation: Callable[[QdrantClient], T]) -> T:
+    """Run ``operation`` on the shared client, reconnecting once on transport errors.
+
+    A restarted server leaves the pooled HTTP connections dead; the first
+    transport failure resets the client and the retry goes out on a new
+    connection. Errors the server answered (404, bad request, validation)
+    would fail the same way again, so they are raised at once.
+    """
+    for attempt in range(2):
         client = _get_client()
-    except RuntimeError as exc:
-        return {"error": str(exc)}
+        start = time.perf_counter()
+        try:
+            result = operation(client)
+        except _transport_errors():
+            _CLIENT_STATS.record((time.perf_counter() - start) * 1000, error=True)
+            if attempt:
+                raise
+            reset_client()
+            continue
+        except Exception:
+            _CLIENT_STATS.record((time.perf_counter() - start) * 1000, error=True)
+            raise
+        _CLIENT_STATS.record((time.perf_counter() - start) * 1000)
+        return result
+    raise AssertionError("unreachable")
+
+
+def _local_index() -> Any:
+    """Return the in-process index, rebuilding it when the fixtures reload."""
+    global _LOCAL_INDEX
+    snapshot = FIXTURE_STORE.current()
+    cached = _LOCAL_INDEX
+    if cached is not None and cached[0] == snapshot.version:
+        return cached[1]
+    with _LOCAL_INDEX_LOCK:
+        if _LOCAL_INDEX is None or _LOCAL_INDEX[0] != snapshot.version:
+            products = snapshot.products
+            vectors = embed_batch([_product_text(product) for product in products])
+            _LOCAL_INDEX = (
+                snapshot.version,
+                build_index(
+                    vectors,
+                    products,
+                    LOCAL_INDEX_EXACT_MAX,
+                    quantize=LOCAL_INDEX_QUANTIZE,
+                    rescore=lambda rows: embed_batch(
+                        [_product_text(products[row]) for row in rows]
+                    ),
+                ),
+            )
+        return _LOCAL_INDEX[1]
+
 
-    embedding = embed_text(query)
-    results = client.search(
-        collection_name=DEFAULT_COLLECTION,
-        query_vector=embedding,
-        limit=max(int(limit), 1),
+def _search(embedding: List[float], limit: int) -> List[SearchHit]:
+    if VECTOR_BACKEND == "local":
+        return _local_index().search(embedding, limit)
+    search_params = None
+    if QDRANT_QUANTIZATION == "int8":
+        models = _qdrant_models()
+        search_params = models.SearchParams(
+            quantization=models.QuantizationSearchParams(
+                rescore=True, oversampling=QDRANT_OVERSAMPLING
+            )
+        )
+    results = _call(
+        lambda client: client.search(
+            collection_name=DEFAULT_COLLECTION,
+            query_vector=embedding,
+            limit=limit,
+            search_params=search_params,
+        )
     )
+    return [(result.score, result.payload or {}) for result in results]
+
+
+def warm_up() -> Dict[str, Any]:
+    """Open the shared connection (or build the local index) ahead of the first turn."""
+    start = time.perf_counter()
+    if VECTOR_BACKEND == "local":
+        try:
+            size = len(_local_index())
+        except RuntimeError as exc:
+            return {"error": str(exc)}
+        return {
+            "status": "ok",
+            "backend": "local",
+            "size": size,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+    try:
+        exists = _call(lambda client: client.collection_exists(DEFAULT_COLLECTION))
+    except Exception as exc:
+        return {"error": str(exc)}
+    return {
+        "status": "ok",
+        "backend": "qdrant",
+        "collection_exists": exists,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+def _background_warm_up() -> None:
+    global _WARM_UP_RESULT
+    _WARM_UP_RESULT = warm_up()
+
+
+def start_warm_up() -> Optional[threading.Thread]:
+    """Run ``warm_up`` on a daemon thread so agent construction never waits on Qdrant.
+
+    An unreachable server would otherwise hold each builder for up to two
+    ``QDRANT_TIMEOUT`` periods. Returns None if a warm-up is already running.
+    """
+    global _WARM_UP_THREAD
+    with _WARM_UP_LOCK:
+        if _WARM_UP_THREAD is not None and _WARM_UP_THREAD.is_alive():
+            return None
+        _WARM_UP_THREAD = threading.Thread(
+            target=_background_warm_up, name="qdrant-warm-up", daemon=True
+        )
+        _WARM_UP_THREAD.start()
+        return _WARM_UP_THREAD
+
+
+def client_stats() -> Dict[str, Any]:
+    """Latency, error and reconnect counters for the shared Qdrant client."""
+    return {
+        "url": DEFAULT_URL,
+        "connected": _CLIENT is not None,
+        "reconnects": _RECONNECTS,
+        "warm_up": _WARM_UP_RESULT,
+        **_CLIENT_STATS.snapshot(),
+    }
+
+
+def search_product_vectors(query: str, limit: int = 3) -> Dict[str, Any]:
+    """Search product info stored in Qdrant (or the local index)."""
+    embedding = EMBEDDING_CACHE.get(query, DEFAULT_DIM, embed_text)
+    try:
+        hits = _search(embedding, max(int(limit), 1))
+    except Exception as exc:
+        return {"error": str(exc)}
 
     matches = []
-    for result in results:
-        payload = result.payload or {}
+    for score, payload in hits:
         matches.append(
             {
-                "score": result.score,
+                "score": score,
                 "sku": payload.get("sku"),
                 "name": payload.get("name"),
                 "description": payload.get("description"),
@@ -89,35 +363,136 @@ TOOL_SPECS: List[ToolSpec] = [
 ]
 
 
-def seed_products(products: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Seed a Qdrant collection with product embeddings."""
-    if QdrantClient is None:
-        return {"error": "qdrant-client not installed"}
+def _point_id(sku: str) -> str:
+    return str(uuid.UUID(hashlib.sha1(sku.encode("utf-8")).hexdigest()[:32]))
+
+
+def _content_hash(product: Dict[str, Any]) -> str:
+    canonical = json.dumps(product, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(f"{DEFAULT_DIM}|{canonical}".encode("utf-8")).hexdigest()
+
+
+def _existing_hashes(client: QdrantClient) -> Dict[str, str]:
+    """Map point id -> content hash for everything already in the collection."""
+    hashes: Dict[str, str] = {}
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=DEFAULT_COLLECTION,
+            limit=SEED_BATCH_SIZE,
+            offset=offset,
+            with_payload=["content_hash"],
+            with_vectors=False,
+        )
+        for record in records:
+            hashes[str(record.id)] = (record.payload or {}).get("content_hash", "")
+        if offset is None:
+            return hashes
+
+
+def seed_products(
+    products: List[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    parallelism: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """Seed a Qdrant collection with product embeddings.
+
+    Only products whose content hash differs from the stored point are
+    re-embedded and upserted, in batches of ``batch_size`` with up to
+    ``parallelism`` requests in flight; points for SKUs no longer in
+    ``products`` are deleted. ``progress(done, total)`` is called after each
+    upserted batch.
+    """
+    try:
+        client = _get_client()
+        models = _qdrant_models()
+    except RuntimeError as exc:
+        return {"error": str(exc)}
+
+    batch_size = max(int(batch_size or SEED_BATCH_SIZE), 1)
+    parallelism = max(int(parallelism or SEED_PARALLELISM), 1)
+    started = time.perf_counter()
+
+    quantization = None
+    if QDRANT_QUANTIZATION == "int8":
+        quantization = models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+            )
+        )
 
-    client = _get_client()
     if not client.collection_exists(DEFAULT_COLLECTION):
         client.create_collection(
             collection_name=DEFAULT_COLLECTION,
-            vectors_config=VectorParams(size=DEFAULT_DIM, distance=Distance.COSINE),
+            vectors_config=models.VectorParams(
+                size=DEFAULT_DIM,
+                distance=models.Distance.COSINE,
+                on_disk=quantization is not None,
+            ),
+            quantization_config=quantization,
         )
+        existing: Dict[str, str] = {}
+    else:
+        if quantization is not None:
+            client.update_collection(
+                collection_name=DEFAULT_COLLECTION, quantization_config=quantization
+            )
+        existing = _existing_hashes(client)
 
-    points = []
-    for index, product in enumerate(products, start=1):
-        text = " ".join(
-            [
-                product.get("name", ""),
-                product.get("description", ""),
-                " ".join(product.get("tags", [])),
-            ]
-        )
-        point_id = hashlib.sha1(product["sku"].encode("utf-8")).hexdigest()[:8]
-        points.append(
-            PointStruct(
+    wanted: Dict[str, Tuple[Dict[str, Any], str]] = {}
+    for product in products:
+        wanted[_point_id(product["sku"])] = (product, _content_hash(product))
+    changed = [
+        (point_id, product, content_hash)
+        for point_id, (product, content_hash) in wanted.items()
+        if existing.get(point_id) != content_hash
+    ]
+    removed = [point_id for point_id in existing if point_id not in wanted]
+
+    def upsert(batch: List[Tuple[str, Dict[str, Any], str]]) -> int:
+        vectors = _embed_products([product for _, product, _ in batch])
+        points = [
+            models.PointStruct(
                 id=point_id,
-                vector=embed_text(text),
-                payload=product,
+                vector=vector,
+                payload={**product, "content_hash": content_hash},
+            )
+            for (point_id, product, content_hash), vector in zip(batch, vectors)
+        ]
+        _call(lambda client: client.upsert(collection_name=DEFAULT_COLLECTION, points=points))
+        return len(points)
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=parallelism) as pool:
+        pending = set()
+        for start in range(0, len(changed), batch_size):
+            # Bound in-flight batches so memory stays flat for huge catalogs.
+            if len(pending) >= parallelism * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done += future.result()
+                    if progress:
+                        progress(done, len(changed))
+            pending.add(pool.submit(upsert, changed[start : start + batch_size]))
+        for future in pending:
+            done += future.result()
+            if progress:
+                progress(done, len(changed))
+
+    for start in range(0, len(removed), batch_size):
+        selector = models.PointIdsList(points=removed[start : start + batch_size])
+        _call(
+            lambda client: client.delete(
+                collection_name=DEFAULT_COLLECTION, points_selector=selector
             )
         )
 
-    client.upsert(collection_name=DEFAULT_COLLECTION, points=points)
-    return {"status": "seeded", "count": len(points)}
+    return {
+        "status": "seeded",
+        "count": len(wanted),
+        "upserted": done,
+        "deleted": len(removed),
+        "unchanged": len(wanted) - len(changed),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -5,7 +5,6 @@ import smtplib
 from dataclasses import dataclass
 from typing import Any, Dict, List
 
-import markdown
 from email.mime.text import MIMEText
 
 
@@ -32,6 +31,8 @@ def escalate_support_email(
 
     message = body
     if any(char in message for char in ["#", "*", "_", "`", "["]):
+        import markdown
+
         message = markdown.markdown(message)
 
     msg = MIMEText(message, "html")
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+TicketView = Dict[str, Any]
+
+
+def _copy_view(view: TicketView) -> TicketView:
+    # Views are dicts of rows and lists of rows/scalars; copying two levels
+    # keeps callers from mutating cached state at a fraction of deepcopy's cost.
+    copied: TicketView = {}
+    for key, value in view.items():
+        if isinstance(value, dict):
+            value = dict(value)
+        elif isinstance(value, list):
+            value = [dict(item) if isinstance(item, dict) else item for item in value]
+        copied[key] = value
+    return copied
+
+
+class TicketCache:
+    """Bounded, thread-safe TTL/LRU cache of assembled ticket views.
+
+    Writers call ``invalidate`` after committing. Each ticket carries a
+    generation number that invalidation bumps, so a read that started before
+    a write cannot put its stale view back into the cache afterwards.
+    ``ttl_seconds`` bounds staleness from writes made by other processes;
+    zero disables caching.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 30.0) -> None:
+        self.max_entries = max(int(max_entries), 1)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, TicketView]]" = OrderedDict()
+        # Generations are only tracked for tickets that are cached or being
+        # loaded, which keeps this map bounded by the cache size.
+        self._generations: Dict[str, int] = {}
+        self._loading: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(
+        self, ticket_id: str, load: Callable[[str], Optional[TicketView]]
+    ) -> Optional[TicketView]:
+        """Return the view for ``ticket_id``, calling ``load`` on a miss.
+
+        ``load`` returns None for unknown tickets, which are not cached.
+        """
+        if self.ttl_seconds <= 0:
+            return load(ticket_id)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(ticket_id)
+            if entry is not None:
+                expires_at, view = entry
+                if expires_at > now:
+                    self._entries.move_to_end(ticket_id)
+                    self.hits += 1
+                    return _copy_view(view)
+                del self._entries[ticket_id]
+                self.expired += 1
+            self.misses += 1
+            generation = self._generations.setdefault(ticket_id, 0)
+            self._loading[ticket_id] = self._loading.get(ticket_id, 0) + 1
+
+        view = None
+        try:
+            view = load(ticket_id)
+        finally:
+            with self._lock:
+                self._loading[ticket_id] -= 1
+                if not self._loading[ticket_id]:
+                    del self._loading[ticket_id]
+                if view is not None and self._generations.get(ticket_id) == generation:
+                    self._entries[ticket_id] = (
+                        time.monotonic() + self.ttl_seconds,
+                        _copy_view(view),
+                    )
+                    self._entries.move_to_end(ticket_id)
+                    while len(self._entries) > self.max_entries:
+                        evicted, _ = self._entries.popitem(last=False)
+                        self._forget(evicted)
+                        self.evictions += 1
+                else:
+                    self._forget(ticket_id)
+        return view
+
+    def _forget(self, ticket_id: str) -> None:
+        if ticket_id not in self._entries and ticket_id not in self._loading:
+            self._generations.pop(ticket_id, None)
+
+    def invalidate(self, *ticket_ids: str) -> None:
+        with self._lock:
+            for ticket_id in ticket_ids:
+                self._entries.pop(ticket_id, None)
+                if ticket_id in self._generations:
+                    self._generations[ticket_id] += 1
+                    self._forget(ticket_id)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for ticket_id in list(self._generations):
+                self._generations[ticket_id] += 1
+                self._forget(ticket_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
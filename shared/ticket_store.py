@@ -0,0 +1,551 @@
+from __future__ import annotations
+
+import abc
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from shared.customer_resolver import CustomerResolver, UnresolvedCustomerError
+from shared.mysql_pool import PoolTimeout, get_pool
+
+TICKET_BACKEND = os.getenv("TICKET_BACKEND", "mysql").lower()
+REPO_ROOT = Path(__file__).resolve().parents[1]
+TICKET_SQLITE_PATH = os.getenv("TICKET_SQLITE_PATH", str(REPO_ROOT / "driftdesk_support.sqlite3"))
+SCHEMA_PATH = REPO_ROOT / "sql" / "schema.sql"
+# Lock wait timeout and deadlock: the statement is fine, retrying it can succeed.
+MYSQL_RETRYABLE_ERRNOS = (1205, 1213)
+
+# Rows per multi-row INSERT; keeps each statement well under max_allowed_packet.
+BULK_CHUNK_ROWS = int(os.getenv("MYSQL_BULK_CHUNK_ROWS", "500"))
+TICKET_COLUMNS = (
+    "ticket_id",
+    "customer_id",
+    "order_id",
+    "subject",
+    "status",
+    "priority",
+    "channel",
+    "created_at",
+    "closed_at",
+)
+OPEN_STATUSES = ("open", "pending")
+
+# Both engines accept this form: the limited update list sits in a derived
+# table because SQLite does not allow parenthesised UNION members.
+_TICKET_VIEW_SQL = f"""
+    SELECT {", ".join("t." + column for column in TICKET_COLUMNS)},
+           r.kind, r.update_type, r.note, r.updated_at, r.tag
+    FROM support_tickets t
+    LEFT JOIN (
+      SELECT * FROM (
+        SELECT 'update' AS kind, update_type, note, updated_at, NULL AS tag
+        FROM ticket_updates
+        WHERE ticket_id = %s
+        ORDER BY updated_at DESC
+        LIMIT 5
+      ) latest
+      UNION ALL
+      SELECT 'tag', NULL, NULL, NULL, tag FROM ticket_tags WHERE ticket_id = %s
+    ) r ON TRUE
+    WHERE t.ticket_id = %s
+    ORDER BY r.kind, r.updated_at DESC
+"""
+
+
+def update_content_hash(update_type: str, note: str) -> str:
+    """Key for ingested updates; ``(ticket_id, content_hash)`` is unique.
+
+    Agent-written updates leave ``content_hash`` NULL, so repeated notes such
+    as "Checked logs." are never collapsed.
+    """
+    return hashlib.sha256(f"{update_type}\n{note}".encode("utf-8")).hexdigest()
+
+
+def _chunks(rows: Sequence[Any], size: int) -> Iterable[Sequence[Any]]:
+    size = max(size, 1)
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def _insert_rows(
+    cursor,
+    statement: str,
+    rows: Sequence[Tuple[Any, ...]],
+    suffix: str = "",
+    chunk_rows: Optional[int] = None,
+    placeholder: str = "%s",
+) -> None:
+    """Write ``rows`` with one multi-row ``INSERT ... VALUES (...), (...)`` per chunk."""
+    if not rows:
+        return
+    group = "(" + ", ".join([placeholder] * len(rows[0])) + ")"
+    for chunk in _chunks(rows, chunk_rows or BULK_CHUNK_ROWS):
+        values = ", ".join([group] * len(chunk))
+        params = [value for row in chunk for value in row]
+        cursor.execute(f"{statement} VALUES {values}{suffix}", params)
+
+
+def _open_tickets_query(table: str = "support_tickets", after: bool = False) -> str:
+    """Newest-first page of open/pending tickets, one index range per status.
+
+    Each branch walks ``idx_tickets_status_created`` backwards and stops after
+    ``limit`` rows, so the outer sort only sees ``limit * len(OPEN_STATUSES)``
+    rows instead of filesorting every open ticket. With ``after`` the branches
+    resume strictly below a (created_at, ticket_id) cursor.
+    """
+    keyset = "AND (created_at < %s OR (created_at = %s AND ticket_id < %s))" if after else ""
+    branches = [
+        f"""
+      SELECT * FROM (
+        SELECT ticket_id, subject, status, priority, created_at
+        FROM {table}
+        WHERE status = %s {keyset}
+        ORDER BY created_at DESC, ticket_id DESC
+        LIMIT %s
+      ) s{position}"""
+        for position in range(len(OPEN_STATUSES))
+    ]
+    return (
+        "SELECT * FROM ("
+        + "\n      UNION ALL".join(branches)
+        + "\n    ) page ORDER BY created_at DESC, ticket_id DESC LIMIT %s"
+    )
+
+
+def _open_tickets_params(limit: int, after: Optional[Tuple[str, str]]) -> List[Any]:
+    params: List[Any] = []
+    for status in OPEN_STATUSES:
+        params.append(status)
+        if after:
+            params.extend([after[0], after[0], after[1]])
+        params.append(limit)
+    params.append(limit)
+    return params
+
+
+def _new_ticket_ids(count: int) -> List[str]:
+    # 64 random bits: collisions stay negligible across millions of imported
+    # tickets without a lookup, so concurrent writers need no coordination.
+    ids: Set[str] = set()
+    ordered: List[str] = []
+    while len(ordered) < count:
+        ticket_id = f"TCK-{uuid.uuid4().hex[:16].upper()}"
+        if ticket_id not in ids:
+            ids.add(ticket_id)
+            ordered.append(ticket_id)
+    return ordered
+
+
+class TicketStore(abc.ABC):
+    """SQL storage behind the ticket tools.
+
+    Queries are written once with ``%s`` placeholders; subclasses supply the
+    connection handling and the few dialect differences.
+    """
+
+    name = "sql"
+    placeholder = "%s"
+    # Bind-parameter cap per statement, or 0 when the driver has none.
+    max_params = 0
+    customers: CustomerResolver
+
+    @abc.abstractmethod
+    def connection(self) -> ContextManager[Any]:
+        """Borrow a connection for the duration of a ``with`` block."""
+
+    @abc.abstractmethod
+    def _begin(self, connection: Any) -> None:
+        """Start an explicit transaction on ``connection``."""
+
+    @abc.abstractmethod
+    def _dict_cursor(self, connection: Any) -> Any:
+        """Return a cursor that yields rows as dicts."""
+
+    @abc.abstractmethod
+    def database_errors(self) -> Tuple[type, ...]:
+        """Driver exception types a failed statement or transaction raises."""
+
+    @abc.abstractmethod
+    def is_transient(self, exc: BaseException) -> bool:
+        """True if ``exc`` means the database is unavailable or busy, not that a row is bad."""
+
+    def _normalize(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return row
+
+    def _sql(self, statement: str) -> str:
+        if self.placeholder == "%s":
+            return statement
+        return statement.replace("%s", self.placeholder)
+
+    def _insert(
+        self, cursor, statement: str, rows: Sequence[Tuple[Any, ...]], suffix: str = ""
+    ) -> None:
+        chunk_rows = BULK_CHUNK_ROWS
+        if self.max_params and rows:
+            chunk_rows = min(chunk_rows, self.max_params // len(rows[0]))
+        _insert_rows(cursor, statement, rows, suffix, chunk_rows, self.placeholder)
+
+    def create_tickets(self, tickets: Sequence[Dict[str, Any]]) -> List[str]:
+        """Create ``tickets`` (validated dicts) in a single transaction.
+
+        Raises ``UnresolvedCustomerError``, writing nothing, if a customer row
+        cannot be read back.
+        """
+        ticket_ids = _new_ticket_ids(len(tickets))
+        customers: Dict[str, str] = {}
+        for ticket in tickets:
+            customers.setdefault(ticket["email"], ticket["full_name"])
+
+        with self.connection() as connection:
+            self._begin(connection)
+            cursor = connection.cursor()
+            resolved: Dict[str, Tuple[int, str]] = {}
+            customer_ids = self.customers.resolve_many(cursor, customers, deferred=resolved)
+            unresolved = [email for email in customers if email not in customer_ids]
+            if unresolved:
+                raise UnresolvedCustomerError(unresolved)
+            self._insert(
+                cursor,
+                "INSERT INTO support_tickets "
+                "(ticket_id, customer_id, order_id, subject, status, priority, channel)",
+                [
+                    (
+                        ticket_id,
+                        customer_ids[ticket["email"]],
+                        ticket.get("order_id"),
+                        ticket["subject"],
+                        "open",
+                        ticket.get("priority") or "normal",
+                        ticket.get("channel") or "chat",
+                    )
+                    for ticket_id, ticket in zip(ticket_ids, tickets)
+                ],
+            )
+            self._insert(
+                cursor,
+                "INSERT INTO ticket_updates (ticket_id, update_type, note)",
+                [
+                    (ticket_id, "customer", ticket["issue"])
+                    for ticket_id, ticket in zip(ticket_ids, tickets)
+                ],
+            )
+            self._insert(
+                cursor,
+                "INSERT INTO ticket_tags (ticket_id, tag)",
+                [
+                    (ticket_id, tag)
+                    for ticket_id, ticket in zip(ticket_ids, tickets)
+                    for tag in dict.fromkeys(ticket.get("tags") or [])
+                ],
+            )
+            connection.commit()
+        self.customers.remember(resolved)
+        return ticket_ids
+
+    def add_update(self, ticket_id: str, update_type: str, note: str) -> bool:
+        """Append an update; False if the ticket does not exist."""
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                self._sql("SELECT ticket_id FROM support_tickets WHERE ticket_id = %s"),
+                (ticket_id,),
+            )
+            if cursor.fetchone() is None:
+                return False
+            cursor.execute(
+                self._sql(
+                    "INSERT INTO ticket_updates (ticket_id, update_type, note) VALUES (%s, %s, %s)"
+                ),
+                (ticket_id, update_type, note),
+            )
+        return True
+
+    def ticket_exists(self, ticket_id: str) -> bool:
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                self._sql("SELECT ticket_id FROM support_tickets WHERE ticket_id = %s"),
+                (ticket_id,),
+            )
+            return cursor.fetchone() is not None
+
+    def add_updates(self, updates: Sequence[Tuple[str, str, str]]) -> None:
+        """Insert (ticket_id, update_type, note) rows in one transaction."""
+        if not updates:
+            return
+        with self.connection() as connection:
+            self._begin(connection)
+            self._insert(
+                connection.cursor(),
+                "INSERT INTO ticket_updates (ticket_id, update_type, note)",
+                updates,
+            )
+            connection.commit()
+
+    def load_ticket_view(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a ticket, its five latest updates and its tags in one round-trip."""
+        with self.connection() as connection:
+            cursor = self._dict_cursor(connection)
+            cursor.execute(self._sql(_TICKET_VIEW_SQL), (ticket_id, ticket_id, ticket_id))
+            rows = [self._normalize(row) for row in cursor.fetchall()]
+        if not rows:
+            return None
+
+        ticket = {column: rows[0][column] for column in TICKET_COLUMNS}
+        updates: List[Dict[str, Any]] = []
+        tags: List[str] = []
+        for row in rows:
+            if row["kind"] == "update":
+                updates.append(
+                    {
+                        "update_type": row["update_type"],
+                        "note": row["note"],
+                        "updated_at": row["updated_at"],
+                    }
+                )
+            elif row["kind"] == "tag":
+                tags.append(row["tag"])
+        return {"ticket": ticket, "recent_updates": updates, "tags": tags}
+
+    def list_open(
+        self, limit: int, after: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Up to ``limit`` open/pending tickets below the ``after`` keyset, newest first."""
+        with self.connection() as connection:
+            cursor = self._dict_cursor(connection)
+            cursor.execute(
+                self._sql(_open_tickets_query(after=after is not None)),
+                _open_tickets_params(limit, after),
+            )
+            return [self._normalize(row) for row in cursor.fetchall()]
+
+    def close(self, ticket_id: str, resolution_note: str) -> bool:
+        """Close a ticket with a resolution update; False if it does not exist."""
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                self._sql(
+                    "UPDATE support_tickets SET status = %s, closed_at = CURRENT_TIMESTAMP "
+                    "WHERE ticket_id = %s"
+                ),
+                ("closed", ticket_id),
+            )
+            if cursor.rowcount == 0:
+                return False
+            cursor.execute(
+                self._sql(
+                    "INSERT INTO ticket_updates (ticket_id, update_type, note) VALUES (%s, %s, %s)"
+                ),
+                (ticket_id, "resolution", resolution_note),
+            )
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "customers": self.customers.stats()}
+
+
+class MySQLTicketStore(TicketStore):
+    """Tickets in MySQL via the shared connection pool."""
+
+    name = "mysql"
+
+    def __init__(self) -> None:
+        self.customers = CustomerResolver("mysql")
+
+    def connection(self) -> ContextManager[Any]:
+        return get_pool().connection()
+
+    def _begin(self, connection: Any) -> None:
+        connection.start_transaction()
+
+    def _dict_cursor(self, connection: Any) -> Any:
+        return connection.cursor(dictionary=True)
+
+    def database_errors(self) -> Tuple[type, ...]:
+        import mysql.connector
+
+        return (mysql.connector.Error,)
+
+    def is_transient(self, exc: BaseException) -> bool:
+        import mysql.connector
+
+        unavailable = (PoolTimeout, mysql.connector.OperationalError, mysql.connector.InterfaceError)
+        if isinstance(exc, unavailable):
+            return True
+        return getattr(exc, "errno", None) in MYSQL_RETRYABLE_ERRNOS
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "customers": self.customers.stats(),
+            "pool": get_pool().stats(),
+        }
+
+
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA busy_timeout = 5000",
+)
+_TIMESTAMP_COLUMNS = ("created_at", "closed_at", "updated_at")
+
+
+def sqlite_schema(schema_sql: str) -> str:
+    """Translate the MySQL DDL in ``sql/schema.sql`` into SQLite DDL."""
+    statements = []
+    without_comments = re.sub(r"--[^\n]*", "", schema_sql)
+    for statement in without_comments.split(";"):
+        statement = statement.strip()
+        if not statement or re.match(r"(CREATE DATABASE|USE)\b", statement, re.IGNORECASE):
+            continue
+        statement = re.sub(
+            r"\bINT AUTO_INCREMENT PRIMARY KEY\b", "INTEGER PRIMARY KEY AUTOINCREMENT", statement
+        )
+        statement = re.sub(r"\)\s*ENGINE\s*=\s*\w+", ")", statement)
+        statement = re.sub(r"\bON UPDATE CURRENT_TIMESTAMP\b", "", statement)
+        statement = re.sub(r"\bUNIQUE KEY \w+\s*\(", "UNIQUE (", statement)
+        # MySQL's default collation compares emails case-insensitively.
+        statement = re.sub(r"\b(email VARCHAR\(\d+\))", r"\1 COLLATE NOCASE", statement)
+        statement = re.sub(
+            r"^CREATE (UNIQUE )?INDEX\b", r"CREATE \1INDEX IF NOT EXISTS", statement
+        )
+        statements.append(statement + ";")
+    return "\n\n".join(statements)
+
+
+def _dict_row(cursor: sqlite3.Cursor, row: Tuple[Any, ...]) -> Dict[str, Any]:
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteTicketStore(TicketStore):
+    """Embedded ticket store for single-box deployments and local benchmarks.
+
+    Each thread gets its own connection in autocommit mode with WAL enabled,
+    so readers never block the writer. The schema is created from
+    ``sql/schema.sql`` on first use, and sqlite3's per-connection statement
+    cache keeps the fixed query texts prepared.
+    """
+
+    name = "sqlite"
+    placeholder = "?"
+    max_params = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+    def __init__(self, path: str = TICKET_SQLITE_PATH, schema_path: Path = SCHEMA_PATH) -> None:
+        self.path = str(path)
+        self.schema_path = schema_path
+        self.customers = CustomerResolver("sqlite")
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        for pragma in _SQLITE_PRAGMAS:
+            connection.execute(pragma)
+        with self._schema_lock:
+            if not self._schema_ready:
+                schema = sqlite_schema(self.schema_path.read_text(encoding="utf-8"))
+                connection.executescript(schema)
+                self._schema_ready = True
+        return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        try:
+            yield connection
+        except BaseException:
+            if connection.in_transaction:
+                connection.rollback()
+            raise
+
+    def _begin(self, connection: sqlite3.Connection) -> None:
+        connection.execute("BEGIN IMMEDIATE")
+
+    def _dict_cursor(self, connection: sqlite3.Connection) -> sqlite3.Cursor:
+        cursor = connection.cursor()
+        cursor.row_factory = _dict_row
+        return cursor
+
+    def database_errors(self) -> Tuple[type, ...]:
+        return (sqlite3.Error,)
+
+    def is_transient(self, exc: BaseException) -> bool:
+        # "database is locked" and I/O failures; constraint violations are IntegrityError.
+        return isinstance(exc, sqlite3.OperationalError)
+
+    def _normalize(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        # SQLite hands timestamps back as text; match the datetimes MySQL returns.
+        for column in _TIMESTAMP_COLUMNS:
+            value = row.get(column)
+            if isinstance(value, str):
+                row[column] = datetime.fromisoformat(value)
+        return row
+
+    def close_connection(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "path": self.path, "customers": self.customers.stats()}
+
+
+_STORE: Optional[TicketStore] = None
+_STORE_PID: Optional[int] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> TicketStore:
+    """Return the process-wide ticket store selected by TICKET_BACKEND."""
+    global _STORE, _STORE_PID
+    if _STORE is not None and _STORE_PID == os.getpid():
+        return _STORE
+    with _STORE_LOCK:
+        if _STORE is None or _STORE_PID != os.getpid():
+            if TICKET_BACKEND == "sqlite":
+                _STORE = SQLiteTicketStore()
+            elif TICKET_BACKEND == "mysql":
+                _STORE = MySQLTicketStore()
+            else:
+                raise RuntimeError(f"Unknown TICKET_BACKEND: {TICKET_BACKEND}")
+            _STORE_PID = os.getpid()
+        return _STORE
+
+
+def set_store(store: Optional[TicketStore]) -> None:
+    """Use ``store`` for the ticket tools in this process (None resets)."""
+    global _STORE, _STORE_PID
+    with _STORE_LOCK:
+        _STORE = store
+        _STORE_PID = os.getpid() if store is not None else None
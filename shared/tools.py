@@ -1,23 +1,62 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import os
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, TypedDict
+
+from shared.fixtures import FIXTURE_FILES, FixtureStore
+from shared.order_index import OrderIndex, index_signature
 
 DATA_DIR = Path(__file__).resolve().parent / "data"
+ORDER_INDEX_PATH = os.getenv("ORDER_INDEX_PATH", "")
+
+FIXTURE_STORE = FixtureStore(
+    DATA_DIR,
+    reload_interval=float(os.getenv("FIXTURE_RELOAD_INTERVAL", "0")),
+    files=tuple(
+        name for name in FIXTURE_FILES if not (ORDER_INDEX_PATH and name == "orders.json")
+    ),
+)
+_ORDER_INDEX: Optional[OrderIndex] = None
+_ORDER_INDEX_LOCK = threading.Lock()
 
 
-def _load_json(filename: str) -> Any:
-    path = DATA_DIR / filename
-    with path.open("r", encoding="utf-8") as handle:
-        return json.load(handle)
+def _order_index() -> OrderIndex:
+    """Return the mapped order index, reopening it after a rebuild swapped the files.
 
+    Like the fixture store, a changed file signature (inode, mtime, size)
+    triggers the reload; if the new files cannot be opened yet, the mapped
+    index keeps serving. Replaced indexes are not closed because other
+    threads may still be reading them; their maps are released once unused.
+    """
+    global _ORDER_INDEX
+    prefix = Path(ORDER_INDEX_PATH)
+    index = _ORDER_INDEX
+    try:
+        signature = index_signature(prefix)
+    except OSError:
+        if index is None:
+            raise
+        return index
+    if index is not None and index.signature == signature:
+        return index
+    with _ORDER_INDEX_LOCK:
+        if _ORDER_INDEX is None or _ORDER_INDEX.signature != signature:
+            try:
+                _ORDER_INDEX = OrderIndex(prefix)
+            except (OSError, ValueError):
+                if _ORDER_INDEX is None:
+                    raise
+        return _ORDER_INDEX
 
-_PRODUCTS = _load_json("products.json")
-_PRICING = _load_json("pricing.json")
-_ORDERS = _load_json("orders.json")
+
+def _lookup_order(order_id: str) -> Optional[Dict[str, Any]]:
+    if not ORDER_INDEX_PATH:
+        return FIXTURE_STORE.current().orders.get(order_id)
+    return _order_index().get(order_id)
 
 
 @dataclass(frozen=True)
@@ -27,44 +66,62 @@ class ToolSpec:
     parameters: Dict[str, Any]
 
 
-def search_products(keywords: str, category: Optional[str] = None, limit: int = 3) -> Dict[str, Any]:
-    """Search products by keywords and optional category."""
+def search_products(
+    keywords: str,
+    category: Optional[str] = None,
+    limit: int = 3,
+    ranked: bool = False,
+) -> Dict[str, Any]:
+    """Search products by keywords and optional category.
+
+    With ``ranked`` the best matches by BM25 score come first, each with a
+    ``score``; otherwise matches are returned in catalog order.
+    """
+    index = FIXTURE_STORE.current().product_index
     tokens = [token.strip().lower() for token in keywords.split() if token.strip()]
-    matches: List[Dict[str, Any]] = []
+    positions = index.match(tokens, category)
+    limit = max(int(limit), 1)
+
+    if ranked:
+        matches = [
+            {**index.products[position], "score": round(score, 4)}
+            for position, score in index.top(tokens, positions, limit)
+        ]
+    else:
+        matches = [index.products[position] for position in index.first(positions, limit)]
+    return {"matches": matches, "count": len(positions)}
+
+
+class CartLine(TypedDict):
+    sku: str
+    quantity: int
 
-    for product in _PRODUCTS:
-        if category and product["category"].lower() != category.lower():
-            continue
-        haystack = " ".join(
-            [product["name"], product["description"], " ".join(product.get("tags", []))]
-        ).lower()
-        if all(token in haystack for token in tokens):
-            matches.append(product)
 
-    return {"matches": matches[: max(limit, 1)], "count": len(matches)}
+def _apply_promo(
+    pricing: Dict[str, Any], subtotal: float, promo_code: Optional[str]
+) -> Tuple[float, Optional[str]]:
+    if not promo_code:
+        return 0.0, None
+    promo = pricing.get("promos", {}).get(promo_code.upper())
+    if promo and subtotal >= promo.get("min_subtotal", 0):
+        percent_off = promo.get("percent_off", 0)
+        return round(subtotal * (percent_off / 100), 2), promo_code.upper()
+    return 0.0, None
 
 
 def get_pricing(
     sku: str, quantity: int = 1, promo_code: Optional[str] = None
 ) -> Dict[str, Any]:
     """Return pricing details for a SKU."""
-    items = _PRICING["items"]
+    pricing = FIXTURE_STORE.current().pricing
+    items = pricing["items"]
     if sku not in items:
         return {"error": f"Unknown SKU: {sku}"}
 
     unit_price = items[sku]["unit_price"]
     qty = max(int(quantity), 1)
     subtotal = unit_price * qty
-    discount = 0.0
-    promo_applied = None
-
-    promos = _PRICING.get("promos", {})
-    if promo_code:
-        promo = promos.get(promo_code.upper())
-        if promo and subtotal >= promo.get("min_subtotal", 0):
-            percent_off = promo.get("percent_off", 0)
-            discount = round(subtotal * (percent_off / 100), 2)
-            promo_applied = promo_code.upper()
+    discount, promo_applied = _apply_promo(pricing, subtotal, promo_code)
 
     total = round(subtotal - discount, 2)
     return {
@@ -74,14 +131,116 @@ def get_pricing(
         "subtotal": subtotal,
         "discount": discount,
         "total": total,
-        "currency": _PRICING.get("currency", "USD"),
+        "currency": pricing.get("currency", "USD"),
         "promo": promo_applied,
     }
 
 
+def quote_cart(lines: List[CartLine], promo_code: Optional[str] = None) -> Dict[str, Any]:
+    """Price a multi-item cart, checking the promo against the cart subtotal."""
+    pricing = FIXTURE_STORE.current().pricing
+    items = pricing["items"]
+    quoted: List[Dict[str, Any]] = []
+    unknown: List[str] = []
+
+    for line in lines:
+        sku = line["sku"]
+        if sku not in items:
+            unknown.append(sku)
+            continue
+        unit_price = items[sku]["unit_price"]
+        qty = max(int(line.get("quantity", 1)), 1)
+        quoted.append(
+            {
+                "sku": sku,
+                "quantity": qty,
+                "unit_price": unit_price,
+                "line_total": round(unit_price * qty, 2),
+            }
+        )
+
+    if unknown and not quoted:
+        return {"error": f"Unknown SKU: {', '.join(unknown)}"}
+
+    subtotal = round(sum(line["line_total"] for line in quoted), 2)
+    discount, promo_applied = _apply_promo(pricing, subtotal, promo_code)
+    return {
+        "lines": quoted,
+        "unknown_skus": unknown,
+        "subtotal": subtotal,
+        "discount": discount,
+        "total": round(subtotal - discount, 2),
+        "currency": pricing.get("currency", "USD"),
+        "promo": promo_applied,
+    }
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("numpy not installed") from exc
+    return numpy
+
+
+def pricing_table(pricing: Optional[Dict[str, Any]] = None) -> Tuple[List[str], Any]:
+    """Return the SKU order and matching unit-price array used by quote_cart_bulk."""
+    np = _numpy()
+    if pricing is None:
+        pricing = FIXTURE_STORE.current().pricing
+    skus = sorted(pricing["items"])
+    prices = np.array([pricing["items"][sku]["unit_price"] for sku in skus], dtype=np.float64)
+    return skus, prices
+
+
+def quote_cart_bulk(
+    sku_index: Any,
+    quantities: Any,
+    order_index: Any = None,
+    promo_code: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Reprice many order lines at once for offline jobs.
+
+    ``sku_index`` holds positions into the SKU list from ``pricing_table`` and
+    ``quantities`` the matching line quantities. Positions outside that list,
+    e.g. -1 for a SKU the caller could not find, are unknown lines: flagged in
+    ``unknown`` and priced at zero, as ``quote_cart`` leaves them out. When
+    ``order_index`` maps each line to a dense 0..n-1 order number, per-order
+    subtotals, discounts and totals are returned as well, with the promo
+    checked per order.
+    """
+    np = _numpy()
+    pricing = FIXTURE_STORE.current().pricing
+    _, prices = pricing_table(pricing)
+    sku_index = np.asarray(sku_index, dtype=np.intp)
+    known = (sku_index >= 0) & (sku_index < len(prices))
+    quantities = np.maximum(np.asarray(quantities, dtype=np.int64), 1)
+    unit_prices = np.where(known, prices[np.where(known, sku_index, 0)], 0.0)
+    line_totals = np.round(unit_prices * quantities, 2)
+    result: Dict[str, Any] = {"line_totals": line_totals, "unknown": ~known}
+    if order_index is None:
+        return result
+
+    subtotals = np.round(np.bincount(np.asarray(order_index), weights=line_totals), 2)
+    discounts = np.zeros_like(subtotals)
+    promo = pricing.get("promos", {}).get(promo_code.upper()) if promo_code else None
+    if promo:
+        eligible = subtotals >= promo.get("min_subtotal", 0)
+        percent_off = promo.get("percent_off", 0)
+        discounts[eligible] = np.round(subtotals[eligible] * (percent_off / 100), 2)
+    result.update(
+        {
+            "order_subtotals": subtotals,
+            "order_discounts": discounts,
+            "order_totals": np.round(subtotals - discounts, 2),
+        }
+    )
+    return result
+
+
 def check_order_status(order_id: str) -> Dict[str, Any]:
     """Return order status details."""
-    order = _ORDERS.get(order_id)
+    order = _lookup_order(order_id)
     if not order:
         return {"error": f"Order not found: {order_id}"}
     return {"order_id": order_id, **order}
@@ -107,13 +266,17 @@ def open_support_ticket(
 TOOL_SPECS: List[ToolSpec] = [
     ToolSpec(
         name="search_products",
-        description="Search the product catalog by keywords and optional category.",
+        description=(
+            "Search the product catalog by keywords and optional category. "
+            "Set ranked to order matches by relevance."
+        ),
         parameters={
             "type": "object",
             "properties": {
                 "keywords": {"type": "string"},
                 "category": {"type": "string"},
                 "limit": {"type": "integer", "default": 3},
+                "ranked": {"type": "boolean", "default": False},
             },
             "required": ["keywords"],
         },
@@ -131,6 +294,28 @@ TOOL_SPECS: List[ToolSpec] = [
             "required": ["sku"],
         },
     ),
+    ToolSpec(
+        name="quote_cart",
+        description="Price a multi-item cart in one call with an optional promo code.",
+        parameters={
+            "type": "object",
+            "properties": {
+                "lines": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "sku": {"type": "string"},
+                            "quantity": {"type": "integer", "default": 1},
+                        },
+                        "required": ["sku"],
+                    },
+                },
+                "promo_code": {"type": "string"},
+            },
+            "required": ["lines"],
+        },
+    ),
     ToolSpec(
         name="check_order_status",
         description="Check the status of an order.",
@@ -0,0 +1,413 @@
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from shared.metrics import LatencyStats
+from shared.ticket_store import REPO_ROOT, TicketStore, get_store
+
+logger = logging.getLogger(__name__)
+
+UpdateRow = Tuple[str, str, str]
+Entry = Tuple[float, UpdateRow]
+
+WRITE_BEHIND_ENABLED = os.getenv("TICKET_UPDATE_WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_BATCH = int(os.getenv("TICKET_UPDATE_BATCH", "500"))
+WRITE_BEHIND_DELAY_MS = float(os.getenv("TICKET_UPDATE_DELAY_MS", "50"))
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("TICKET_UPDATE_MAX_PENDING", "50000"))
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv("TICKET_UPDATE_MAX_ATTEMPTS", "3"))
+WRITE_BEHIND_SPILL_PATH = os.getenv(
+    "TICKET_UPDATE_SPILL_PATH", str(REPO_ROOT / "ticket_updates.spill.jsonl")
+)
+WRITE_BEHIND_DEAD_LETTER_PATH = os.getenv(
+    "TICKET_UPDATE_DEAD_LETTER_PATH", str(REPO_ROOT / "ticket_updates.dead.jsonl")
+)
+
+
+class UpdateQueue:
+    """Write-behind queue that group-commits ticket updates.
+
+    ``submit`` only queues the row; a background writer flushes up to
+    ``max_batch`` rows per transaction once that many are waiting or the
+    oldest has waited ``max_delay_ms``. Failed flushes are retried with
+    backoff: while the store is unavailable, indefinitely; otherwise up to
+    ``max_attempts`` times, after which the batch is halved until the rows
+    that cannot be written are isolated and appended to ``dead_letter_path``
+    with their error. On ``close`` whatever cannot be flushed is appended to
+    ``spill_path`` (fsynced), and the next queue replays that file on start,
+    keeping only rows it still could not write. Replay is at-least-once: a
+    crash between replaying and rewriting the file writes those notes again.
+    Workers sharing a spill file take an exclusive ``flock`` on a sidecar
+    ``.lock`` file to replay and rewrite it or append to it, so one worker's
+    replay neither runs alongside another's nor discards rows spilled meanwhile.
+    """
+
+    def __init__(
+        self,
+        store: TicketStore,
+        max_batch: int = 500,
+        max_delay_ms: float = 50.0,
+        max_pending: int = 50000,
+        spill_path: Optional[Path] = None,
+        on_flush: Optional[Callable[[List[str]], None]] = None,
+        max_attempts: int = 3,
+        dead_letter_path: Optional[Path] = None,
+        retry_backoff: float = 0.1,
+    ) -> None:
+        self.store = store
+        self.max_batch = max(int(max_batch), 1)
+        self.max_delay = max(max_delay_ms, 0.0) / 1000
+        self.max_pending = max(int(max_pending), self.max_batch)
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.on_flush = on_flush
+        self.max_attempts = max(int(max_attempts), 1)
+        self.dead_letter_path = Path(dead_letter_path) if dead_letter_path else None
+        self.retry_backoff = max(retry_backoff, 0.0)
+        self._pending: Deque[Entry] = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._in_flight = 0
+        # Submitted rows that are committed, dead-lettered or spilled (FIFO),
+        # and how many of the oldest submitted rows a flush() is waiting on.
+        self._settled = 0
+        self._flush_target = 0
+        self.flush_stats = LatencyStats()
+        # Submit-to-commit delay per row, i.e. how stale reads can be.
+        self.lag_stats = LatencyStats()
+        self.counters: Dict[str, int] = {
+            "submitted": 0,
+            "flushed": 0,
+            "batches": 0,
+            "flush_errors": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "dead_lettered": 0,
+            "dropped": 0,
+        }
+
+    def start(self) -> None:
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._closing = False
+            self._thread = threading.Thread(
+                target=self._run, name="ticket-update-writer", daemon=True
+            )
+        try:
+            self._replay_spill()
+        except Exception:
+            # Keep the spill file for the next start; new updates still flow.
+            logger.exception("Could not replay ticket update spill %s", self.spill_path)
+        self._thread.start()
+
+    def submit(self, ticket_id: str, update_type: str, note: str) -> None:
+        """Queue one update; blocks while ``max_pending`` rows are waiting."""
+        if self._thread is None:
+            self.start()
+        with self._condition:
+            if self._closing:
+                raise RuntimeError("Ticket update queue is closed")
+            while len(self._pending) >= self.max_pending:
+                self._condition.wait()
+            self._pending.append((time.monotonic(), (ticket_id, update_type, note)))
+            self.counters["submitted"] += 1
+            if len(self._pending) >= self.max_batch:
+                self._condition.notify_all()
+
+    def _take_batch(self) -> List[Entry]:
+        with self._condition:
+            while True:
+                if self._pending:
+                    waited = time.monotonic() - self._pending[0][0]
+                    if self._closing or len(self._pending) >= self.max_batch:
+                        break
+                    if self.counters["submitted"] - len(self._pending) < self._flush_target:
+                        break
+                    if waited >= self.max_delay:
+                        break
+                    self._condition.wait(self.max_delay - waited)
+                elif self._closing:
+                    return []
+                else:
+                    self._condition.wait()
+            count = min(len(self._pending), self.max_batch)
+            batch = [self._pending.popleft() for _ in range(count)]
+            self._in_flight = len(batch)
+            self._condition.notify_all()
+            return batch
+
+    def _flush(self, batch: List[Entry]) -> None:
+        started = time.perf_counter()
+        try:
+            self.store.add_updates([row for _, row in batch])
+        except Exception:
+            self.flush_stats.record((time.perf_counter() - started) * 1000, error=True)
+            raise
+        finished = time.monotonic()
+        self.flush_stats.record((time.perf_counter() - started) * 1000)
+        for queued_at, _ in batch:
+            self.lag_stats.record((finished - queued_at) * 1000)
+
+    def _notify(self, rows: List[UpdateRow]) -> None:
+        if self.on_flush is None:
+            return
+        try:
+            self.on_flush(list(dict.fromkeys(row[0] for row in rows)))
+        except Exception:
+            # The rows are committed; a failing callback must not re-flush them.
+            pass
+
+    def _attempt(self, part: List[Entry], patient: bool) -> Optional[Exception]:
+        """Flush ``part``, retrying with backoff; return the last error on giving up.
+
+        Gives up after ``max_attempts`` failures that are not transient, once
+        the queue is closing, or, unless ``patient``, on a transient failure.
+        """
+        failures = 0
+        tries = 0
+        while True:
+            try:
+                self._flush(part)
+                return None
+            except Exception as exc:
+                tries += 1
+                transient = self.store.is_transient(exc)
+                if not transient:
+                    failures += 1
+                with self._condition:
+                    self.counters["flush_errors"] += 1
+                    if (
+                        self._closing
+                        or failures >= self.max_attempts
+                        or (transient and not patient)
+                    ):
+                        return exc
+                    # Waiting on the condition lets close() cut the backoff short.
+                    self._condition.wait(min(self.retry_backoff * 2 ** min(tries, 6), 5.0))
+
+    def _write(self, batch: List[Entry], patient: bool = True) -> List[Entry]:
+        """Commit ``batch``, isolating and dead-lettering rows that keep failing.
+
+        Returns the entries left unwritten because the queue is closing or,
+        unless ``patient``, because the store is unavailable.
+        """
+        parts = [batch]
+        while parts:
+            part = parts.pop()
+            error = self._attempt(part, patient)
+            if error is None:
+                self._committed(part)
+                continue
+            with self._condition:
+                closing = self._closing
+            if closing or (not patient and self.store.is_transient(error)):
+                return [entry for entries in (part, *reversed(parts)) for entry in entries]
+            if len(part) == 1:
+                self._dead_letter([part[0][1]], error)
+            else:
+                middle = len(part) // 2
+                parts.extend((part[middle:], part[:middle]))
+        return []
+
+    def _committed(self, part: List[Entry]) -> None:
+        self._notify([row for _, row in part])
+        with self._condition:
+            self.counters["flushed"] += len(part)
+            self.counters["batches"] += 1
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            unwritten = self._write(batch)
+            if unwritten:
+                # Shutting down: keep the rest on disk instead of retrying.
+                self._spill([row for _, row in unwritten])
+            with self._condition:
+                self._settled += len(batch)
+                self._in_flight = 0
+                self._condition.notify_all()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Write every update submitted so far without waiting out the batch delay.
+
+        Returns False on timeout. Updates submitted meanwhile are not waited
+        for, so a steady stream of new notes cannot hold a flush open.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            target = self.counters["submitted"]
+            self._flush_target = max(self._flush_target, target)
+            self._condition.notify_all()
+            while self._settled < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._thread is None:
+                    return False
+                self._condition.wait(min(remaining, self.max_delay or 0.01))
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush what can be flushed within ``timeout`` and spill the rest."""
+        with self._condition:
+            thread = self._thread
+            self._closing = True
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+        with self._condition:
+            leftover = [row for _, row in self._pending]
+            self._pending.clear()
+            self._thread = None
+        if leftover:
+            self._spill(leftover)
+
+    def _append(self, path: Path, lines: List[str]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as handle:
+            for line in lines:
+                handle.write(line + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    @contextmanager
+    def _spill_lock(self, path: Path) -> Iterator[None]:
+        lock_path = path.with_name(path.name + ".lock")
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        # A separate file, since replay replaces or unlinks the spill itself.
+        with lock_path.open("a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _drop(self, count: int, reason: str) -> None:
+        logger.error("Dropped %d ticket updates: %s", count, reason)
+        with self._condition:
+            self.counters["dropped"] += count
+
+    def _spill(self, rows: List[UpdateRow]) -> None:
+        if self.spill_path is None:
+            self._drop(len(rows), "not written at shutdown and no spill path is set")
+            return
+        try:
+            with self._spill_lock(self.spill_path):
+                self._append(self.spill_path, [json.dumps(row) for row in rows])
+        except OSError as exc:
+            self._drop(len(rows), f"could not spill to {self.spill_path}: {exc}")
+            return
+        with self._condition:
+            self.counters["spilled"] += len(rows)
+
+    def _dead_letter(self, updates: List[Any], error: Exception) -> None:
+        reason = f"{type(error).__name__}: {error}"
+        if self.dead_letter_path is None:
+            self._drop(len(updates), f"rejected with {reason} and no dead-letter path is set")
+            return
+        lines = [json.dumps({"update": update, "error": reason}) for update in updates]
+        try:
+            self._append(self.dead_letter_path, lines)
+        except OSError as exc:
+            self._drop(len(updates), f"could not dead-letter to {self.dead_letter_path}: {exc}")
+            return
+        logger.warning(
+            "Dead-lettered %d ticket updates to %s: %s", len(updates), self.dead_letter_path, reason
+        )
+        with self._condition:
+            self.counters["dead_lettered"] += len(updates)
+
+    def _replay_spill(self) -> None:
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+        with self._spill_lock(self.spill_path):
+            # Another worker may have replayed it while this one waited.
+            if self.spill_path.exists():
+                self._replay(self.spill_path)
+
+    def _replay(self, path: Path) -> None:
+        now = time.monotonic()
+        entries: List[Entry] = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                ticket_id, update_type, note = json.loads(line)
+            except ValueError as exc:
+                self._dead_letter([line], exc)
+                continue
+            entries.append((now, (ticket_id, update_type, note)))
+
+        # Written synchronously before new updates so spilled notes keep
+        # their order. If the store is unavailable, stop and keep the rest.
+        unwritten: List[Entry] = []
+        for start in range(0, len(entries), self.max_batch):
+            unwritten = self._write(entries[start : start + self.max_batch], patient=False)
+            if unwritten:
+                unwritten.extend(entries[start + self.max_batch :])
+                break
+        if unwritten:
+            staged = path.with_name(path.name + ".tmp")
+            staged.unlink(missing_ok=True)
+            self._append(staged, [json.dumps(row) for _, row in unwritten])
+            os.replace(staged, path)
+        else:
+            path.unlink()
+        with self._condition:
+            self.counters["replayed"] += len(entries) - len(unwritten)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            state: Dict[str, Any] = {
+                "running": self._thread is not None,
+                "pending": len(self._pending),
+                "in_flight": self._in_flight,
+                "max_batch": self.max_batch,
+                "max_delay_ms": self.max_delay * 1000,
+                **self.counters,
+            }
+        batches = state["batches"]
+        state["mean_batch_rows"] = round(state["flushed"] / batches, 1) if batches else 0.0
+        state["flush"] = self.flush_stats.snapshot()
+        state["lag"] = self.lag_stats.snapshot()
+        return state
+
+
+_QUEUE: Optional[UpdateQueue] = None
+_QUEUE_PID: Optional[int] = None
+_QUEUE_LOCK = threading.Lock()
+
+
+def get_update_queue(on_flush: Optional[Callable[[List[str]], None]] = None) -> UpdateQueue:
+    """Return the process-wide write-behind queue, started and closed at exit."""
+    global _QUEUE, _QUEUE_PID
+    if _QUEUE is not None and _QUEUE_PID == os.getpid():
+        return _QUEUE
+    with _QUEUE_LOCK:
+        if _QUEUE is None or _QUEUE_PID != os.getpid():
+            queue = UpdateQueue(
+                get_store(),
+                max_batch=WRITE_BEHIND_BATCH,
+                max_delay_ms=WRITE_BEHIND_DELAY_MS,
+                max_pending=WRITE_BEHIND_MAX_PENDING,
+                spill_path=Path(WRITE_BEHIND_SPILL_PATH),
+                on_flush=on_flush,
+                max_attempts=WRITE_BEHIND_MAX_ATTEMPTS,
+                dead_letter_path=Path(WRITE_BEHIND_DEAD_LETTER_PATH),
+            )
+            queue.start()
+            atexit.register(queue.close)
+            _QUEUE, _QUEUE_PID = queue, os.getpid()
+        return _QUEUE
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+SearchHit = Tuple[float, Dict[str, Any]]
+
+KMEANS_ITERATIONS = 4
+# k-means trains on this many sampled vectors per cluster, not the whole catalog.
+KMEANS_SAMPLE_PER_CLUSTER = 64
+SIMILARITY_BLOCK = 1 << 22
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("numpy not installed") from exc
+    return numpy
+
+
+def _closest(vectors: Any, centroids: Any, k: int) -> Any:
+    """Indices of the ``k`` most similar centroids per vector, best first."""
+    np = _numpy()
+    rows = max(1, SIMILARITY_BLOCK // max(len(centroids), 1))
+    result = np.empty((len(vectors), k), dtype=np.int64)
+    for start in range(0, len(vectors), rows):
+        scores = vectors[start : start + rows] @ centroids.T
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(scores.shape[1]), (len(scores), 1))
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        result[start : start + rows] = np.take_along_axis(top, order, axis=1)
+    return result
+
+
+class ExactIndex:
+    """Brute-force cosine search over a float32 matrix of unit vectors."""
+
+    def __init__(self, vectors: Any, payloads: Sequence[Dict[str, Any]]) -> None:
+        np = _numpy()
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.payloads = payloads
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    def search(self, query: Sequence[float], limit: int) -> List[SearchHit]:
+        np = _numpy()
+        if not len(self.payloads):
+            return []
+        scores = self.vectors @ np.asarray(query, dtype=np.float32)
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(float(scores[row]), self.payloads[row]) for row in top]
+
+
+def quantize_int8(vectors: Any) -> Tuple[Any, Any]:
+    """Scalar-quantize rows to int8 codes with one float32 scale per vector."""
+    np = _numpy()
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class QuantizedIndex:
+    """Exact scan over int8 codes with full-precision rescoring of the top hits.
+
+    Each vector costs ``dim`` bytes plus a 4-byte scale instead of ``4 * dim``
+    bytes. The ``rescore_depth`` best approximate candidates are re-ranked
+    against full-precision vectors from ``rescore``, which receives row
+    numbers; the deterministic embeddings can simply be recomputed there, so
+    the float matrix never needs to stay resident.
+    """
+
+    def __init__(
+        self,
+        vectors: Any,
+        payloads: Sequence[Dict[str, Any]],
+        rescore: Optional[Callable[[Any], Any]] = None,
+        rescore_depth: int = 50,
+    ) -> None:
+        self.codes, self.scales = quantize_int8(vectors)
+        self.payloads = payloads
+        self.rescore = rescore
+        self.rescore_depth = rescore_depth
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    def _approximate(self, query: Any) -> Any:
+        np = _numpy()
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        rows = max(1, SIMILARITY_BLOCK // self.codes.shape[1])
+        for start in range(0, len(self.codes), rows):
+            block = self.codes[start : start + rows].astype(np.float32)
+            scores[start : start + rows] = (block @ query) * self.scales[start : start + rows]
+        return scores
+
+    def search(self, query: Sequence[float], limit: int) -> List[SearchHit]:
+        np = _numpy()
+        if not len(self.payloads):
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        scores = self._approximate(query)
+        depth = min(max(limit, self.rescore_depth if self.rescore else limit), len(scores))
+        top = np.argpartition(-scores, depth - 1)[:depth]
+        if self.rescore is not None:
+            full = np.asarray(self.rescore(top), dtype=np.float32)
+            scores = np.zeros_like(scores)
+            scores[top] = full @ query
+        top = top[np.argsort(-scores[top], kind="stable")][:limit]
+        return [(float(scores[row]), self.payloads[row]) for row in top]
+
+
+class GraphIndex:
+    """Approximate nearest-neighbour search over a proximity graph.
+
+    Construction stays vectorized: k-means trained on a sample splits the
+    vectors into about sqrt(n) clusters, each vector joins its
+    ``cluster_slots`` closest clusters, and its ``degree`` nearest neighbours
+    inside those clusters become its graph edges, plus up to ``degree``
+    reverse edges. A query scans the members of its ``entry_clusters`` best
+    clusters exactly to seed a best-first beam search of width ``ef_search``,
+    which expands ``expand_batch`` frontier nodes per matrix product.
+    """
+
+    def __init__(
+        self,
+        vectors: Any,
+        payloads: Sequence[Dict[str, Any]],
+        degree: int = 16,
+        ef_search: int = 512,
+        entry_clusters: int = 48,
+        cluster_slots: int = 2,
+        expand_batch: int = 32,
+        seed: int = 0,
+    ) -> None:
+        np = _numpy()
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.payloads = payloads
+        self.degree = degree
+        self.ef_search = ef_search
+        self.entry_clusters = entry_clusters
+        self.expand_batch = max(int(expand_batch), 1)
+
+        count = len(self.vectors)
+        clusters = max(1, min(count, int(math.sqrt(count))))
+        rng = np.random.default_rng(seed)
+        sample = self.vectors[
+            rng.choice(count, min(count, clusters * KMEANS_SAMPLE_PER_CLUSTER), replace=False)
+        ]
+        centroids = sample[rng.choice(len(sample), clusters, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = _closest(sample, centroids, 1)[:, 0]
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            sizes = np.bincount(assignment, minlength=clusters)
+            filled = sizes > 0
+            centroids[filled] = sums[filled] / sizes[filled, None]
+            norms = np.linalg.norm(centroids, axis=1)
+            centroids[norms > 0] /= norms[norms > 0, None]
+        self.centroids = centroids
+
+        closest = _closest(self.vectors, centroids, min(cluster_slots, clusters))
+        self.neighbors = self._add_reverse(self._link(closest, clusters))
+        # Vectors grouped by their closest cluster, for seeding queries.
+        self.members = np.argsort(closest[:, 0], kind="stable")
+        self.bounds = np.searchsorted(closest[self.members, 0], np.arange(clusters + 1))
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    def _link(self, closest: Any, clusters: int) -> Any:
+        np = _numpy()
+        count, slots = closest.shape
+        # Group every (vector, slot) pair by cluster once instead of scanning
+        # the assignment table per cluster.
+        flat = closest.ravel()
+        order = np.argsort(flat, kind="stable")
+        bounds = np.searchsorted(flat[order], np.arange(clusters + 1))
+        candidates = np.full((count, slots * self.degree), -1, dtype=np.int64)
+        for cluster in range(clusters):
+            pairs = order[bounds[cluster] : bounds[cluster + 1]]
+            members, member_slots = pairs // slots, pairs % slots
+            if len(members) < 2:
+                continue
+            take = min(self.degree, len(members) - 1)
+            block = max(1, SIMILARITY_BLOCK // len(members))
+            member_vectors = self.vectors[members]
+            for start in range(0, len(members), block):
+                rows = slice(start, start + block)
+                scores = member_vectors[rows] @ member_vectors.T
+                np.fill_diagonal(scores[:, start:], -np.inf)
+                top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+                columns = member_slots[rows, None] * self.degree + np.arange(take)
+                candidates[members[rows, None], columns] = members[top]
+
+        return self._select(np.arange(count), candidates)
+
+    def _select(self, rows: Any, candidates: Any) -> Any:
+        """Keep the ``degree`` closest distinct candidates for each row."""
+        np = _numpy()
+        candidates = np.sort(candidates, axis=1)
+        invalid = (candidates < 0) | (candidates == rows[:, None])
+        invalid[:, 1:] |= candidates[:, 1:] == candidates[:, :-1]
+        scores = np.einsum(
+            "ij,ikj->ik", self.vectors[rows], self.vectors[np.maximum(candidates, 0)]
+        )
+        scores[invalid] = -np.inf
+        keep = np.argsort(-scores, axis=1)[:, : self.degree]
+        neighbors = np.take_along_axis(candidates, keep, axis=1)
+        neighbors[np.take_along_axis(scores, keep, axis=1) == -np.inf] = -1
+        return neighbors
+
+    def _add_reverse(self, neighbors: Any) -> Any:
+        """Append up to ``degree`` incoming edges per node so hubs stay reachable."""
+        np = _numpy()
+        count = len(neighbors)
+        sources = np.repeat(np.arange(count), neighbors.shape[1])
+        targets = neighbors.ravel()
+        valid = targets >= 0
+        sources, targets = sources[valid], targets[valid]
+        order = np.argsort(targets, kind="stable")
+        sources, targets = sources[order], targets[order]
+        starts = np.searchsorted(targets, np.arange(count))
+        rank = np.arange(len(targets)) - starts[targets]
+        keep = rank < self.degree
+        reverse = np.full((count, self.degree), -1, dtype=np.int64)
+        reverse[targets[keep], rank[keep]] = sources[keep]
+        return np.concatenate([neighbors, reverse], axis=1)
+
+    def search(self, query: Sequence[float], limit: int) -> List[SearchHit]:
+        np = _numpy()
+        if not len(self.payloads):
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        ef = max(self.ef_search, limit)
+
+        probe = min(self.entry_clusters, len(self.centroids))
+        best = np.argpartition(-(self.centroids @ query), probe - 1)[:probe]
+        rows = np.concatenate(
+            [self.members[self.bounds[cluster] : self.bounds[cluster + 1]] for cluster in best]
+        )
+        if not len(rows):
+            rows = self.members[:1]
+        scores = self.vectors[rows] @ query
+        seeds = np.argpartition(-scores, min(ef, len(rows)) - 1)[:ef]
+        visited = np.zeros(len(self.vectors), dtype=bool)
+        visited[rows] = True
+        found = list(zip(scores[seeds].tolist(), rows[seeds].tolist()))
+        heapq.heapify(found)
+        frontier = [(-score, node) for score, node in found]
+        heapq.heapify(frontier)
+
+        while frontier:
+            nodes = []
+            while frontier and len(nodes) < self.expand_batch:
+                negative, node = heapq.heappop(frontier)
+                if len(found) >= ef and -negative < found[0][0]:
+                    frontier.clear()
+                    break
+                nodes.append(node)
+            if not nodes:
+                break
+            # Forward and reverse edges can repeat a node; score each once.
+            fresh = np.unique(self.neighbors[nodes])
+            fresh = fresh[fresh >= 0]
+            fresh = fresh[~visited[fresh]]
+            if not len(fresh):
+                continue
+            visited[fresh] = True
+            for score, other in zip((self.vectors[fresh] @ query).tolist(), fresh.tolist()):
+                if len(found) < ef or score > found[0][0]:
+                    heapq.heappush(frontier, (-score, other))
+                    heapq.heappush(found, (score, other))
+                    if len(found) > ef:
+                        heapq.heappop(found)
+
+        return [(score, self.payloads[node]) for score, node in heapq.nlargest(limit, found)]
+
+
+def build_index(
+    vectors: Any,
+    payloads: Sequence[Dict[str, Any]],
+    exact_max: int,
+    quantize: bool = False,
+    rescore: Optional[Callable[[Any], Any]] = None,
+) -> Any:
+    """Pick exact search for small catalogs and the graph index above ``exact_max``.
+
+    With ``quantize`` every catalog size uses the int8 ``QuantizedIndex``.
+    """
+    if quantize:
+        return QuantizedIndex(vectors, payloads, rescore=rescore)
+    if len(payloads) <= exact_max:
+        return ExactIndex(vectors, payloads)
+    return GraphIndex(vectors, payloads)
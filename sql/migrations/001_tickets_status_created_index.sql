@@ -0,0 +1,8 @@
+-- Keyset pagination for list_open_tickets.
+-- (status, created_at, ticket_id) lets each status branch read newest-first
+-- straight off the index and resume from a (created_at, ticket_id) cursor.
+-- It also covers every lookup idx_tickets_status served, so that index goes.
+USE driftdesk_support;
+
+CREATE INDEX idx_tickets_status_created ON support_tickets(status, created_at, ticket_id);
+DROP INDEX idx_tickets_status ON support_tickets;
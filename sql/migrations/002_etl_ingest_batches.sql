@@ -0,0 +1,15 @@
+-- Per-batch row counts and timings for the bulk ETL load.
+-- One row per committed batch; method is "multirow" or "infile".
+USE driftdesk_support;
+
+CREATE TABLE IF NOT EXISTS etl_ingest_batches (
+  batch_id INT AUTO_INCREMENT PRIMARY KEY,
+  ingest_id INT NOT NULL,
+  entity VARCHAR(32) NOT NULL,
+  records INT NOT NULL,
+  rows_written INT NOT NULL,
+  method VARCHAR(16) NOT NULL,
+  duration_ms DECIMAL(12,3) NOT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (ingest_id) REFERENCES etl_ingest_log(ingest_id)
+) ENGINE=InnoDB;
@@ -0,0 +1,14 @@
+-- Incremental ETL: the newest source updated_at applied per (source, entity).
+-- The ETL asks the source for records updated after it and advances it in
+-- the same transaction as each batch.
+USE driftdesk_support;
+
+CREATE TABLE IF NOT EXISTS etl_watermarks (
+  source VARCHAR(128) NOT NULL,
+  entity VARCHAR(32) NOT NULL,
+  watermark VARCHAR(64) NOT NULL,
+  ingest_id INT NOT NULL,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (source, entity),
+  FOREIGN KEY (ingest_id) REFERENCES etl_ingest_log(ingest_id)
+) ENGINE=InnoDB;
@@ -0,0 +1,12 @@
+-- Idempotent ETL ticket updates.
+-- The ETL stores a SHA-256 content_hash with each ingested update and
+-- inserts with IGNORE, so re-syncing a ticket no longer appends its issue
+-- again. Agent-written updates keep content_hash NULL and are unaffected.
+-- Existing rows stay NULL here; run `python -m scripts.etl_sync --full` and
+-- then `python -m scripts.compact_ticket_updates` to delete the duplicates
+-- already present and hash the survivors.
+USE driftdesk_support;
+
+ALTER TABLE ticket_updates
+  ADD COLUMN content_hash CHAR(64) NULL AFTER note,
+  ADD UNIQUE KEY uq_updates_ticket_hash (ticket_id, content_hash);
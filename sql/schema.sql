@@ -37,7 +37,10 @@ CREATE TABLE IF NOT EXISTS ticket_updates (
   ticket_id VARCHAR(32) NOT NULL,
   update_type VARCHAR(32) NOT NULL,
   note TEXT NOT NULL,
+  -- Set only for ingested updates (see update_content_hash); NULLs never clash.
+  content_hash CHAR(64) NULL,
   updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uq_updates_ticket_hash (ticket_id, content_hash),
   FOREIGN KEY (ticket_id) REFERENCES support_tickets(ticket_id)
 ) ENGINE=InnoDB;
 
@@ -57,7 +60,29 @@ CREATE TABLE IF NOT EXISTS etl_ingest_log (
   status VARCHAR(32) NOT NULL DEFAULT 'running'
 ) ENGINE=InnoDB;
 
+CREATE TABLE IF NOT EXISTS etl_ingest_batches (
+  batch_id INT AUTO_INCREMENT PRIMARY KEY,
+  ingest_id INT NOT NULL,
+  entity VARCHAR(32) NOT NULL,
+  records INT NOT NULL,
+  rows_written INT NOT NULL,
+  method VARCHAR(16) NOT NULL,
+  duration_ms DECIMAL(12,3) NOT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (ingest_id) REFERENCES etl_ingest_log(ingest_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS etl_watermarks (
+  source VARCHAR(128) NOT NULL,
+  entity VARCHAR(32) NOT NULL,
+  watermark VARCHAR(64) NOT NULL,
+  ingest_id INT NOT NULL,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (source, entity),
+  FOREIGN KEY (ingest_id) REFERENCES etl_ingest_log(ingest_id)
+) ENGINE=InnoDB;
+
 CREATE INDEX idx_orders_customer ON orders(customer_id);
 CREATE INDEX idx_tickets_customer ON support_tickets(customer_id);
-CREATE INDEX idx_tickets_status ON support_tickets(status);
+CREATE INDEX idx_tickets_status_created ON support_tickets(status, created_at, ticket_id);
 CREATE INDEX idx_updates_ticket ON ticket_updates(ticket_id);
@@ -0,0 +1,93 @@
+from shared import catalog_search, qdrant_tools, tools
+from shared.product_index import ProductIndex
+
+PRODUCTS = [
+    {
+        "sku": "DSK-100",
+        "name": "DriftDesk Bamboo",
+        "category": "standing-desk",
+        "description": "Electric standing desk with a bamboo top.",
+        "tags": ["bamboo", "electric"],
+    },
+    {
+        "sku": "DSK-200",
+        "name": "DriftDesk Steel",
+        "category": "standing-desk",
+        "description": "Manual standing desk.",
+        "tags": ["steel"],
+    },
+    {
+        "sku": "CHR-100",
+        "name": "Drift Chair",
+        "category": "chair",
+        "description": "Ergonomic office chair.",
+        "tags": ["mesh"],
+    },
+]
+
+
+class _Store:
+    def __init__(self, products):
+        self.product_index = ProductIndex(products)
+
+    def current(self):
+        return self
+
+
+def _use_catalog(monkeypatch, vector_matches):
+    monkeypatch.setattr(tools, "FIXTURE_STORE", _Store(PRODUCTS))
+    monkeypatch.setattr(
+        qdrant_tools,
+        "search_product_vectors",
+        lambda query, limit: {"matches": vector_matches[:limit]},
+    )
+
+
+def test_question_returns_keyword_hits(monkeypatch):
+    _use_catalog(monkeypatch, [])
+    result = catalog_search.search_catalog("do you have a bamboo standing desk?", limit=3)
+
+    skus = [match["sku"] for match in result["matches"]]
+    assert skus[0] == "DSK-100"
+    assert "DSK-200" in skus
+    assert all("keyword" in match["ranks"] for match in result["matches"])
+
+
+def test_category_filters_keyword_hits(monkeypatch):
+    _use_catalog(monkeypatch, [])
+    result = catalog_search.search_catalog("bamboo chair", category="chair")
+
+    assert [match["sku"] for match in result["matches"]] == ["CHR-100"]
+
+
+def test_fusion_rewards_agreement_between_retrievers():
+    keyword = [{"sku": "A"}, {"sku": "B"}]
+    vector = [{"sku": "B"}, {"sku": "C"}, {"sku": "A", "name": "ignored"}]
+
+    fused = catalog_search._fuse({"keyword": keyword, "vector": vector}, limit=3)
+
+    # B appears near the top of both lists, so it outranks A, which leads only one.
+    assert [entry["sku"] for entry in fused] == ["B", "A", "C"]
+    assert fused[0]["ranks"] == {"keyword": 2, "vector": 1}
+    k = catalog_search.RRF_K
+    assert fused[0]["score"] == round(1 / (k + 2) + 1 / (k + 1), 6)
+    assert fused[1]["score"] == round(1 / (k + 1) + 1 / (k + 3), 6)
+
+
+def test_short_and_filler_words_do_not_outrank_the_asked_for_product(monkeypatch):
+    dock = {
+        "sku": "ACC-900",
+        "name": "Dock Adapter",
+        "category": "accessory",
+        "description": "Docking adapter pad for a desk and a laptop.",
+        "tags": ["adapter", "dock", "docking", "laptop"],
+    }
+    monkeypatch.setattr(tools, "FIXTURE_STORE", _Store(PRODUCTS + [dock]))
+
+    # "a" and "do" are substrings of most of the dock's terms; only "bamboo desk" counts.
+    result = catalog_search._keyword_search("do you have a bamboo desk?", None, 5)
+
+    skus = [match["sku"] for match in result["matches"]]
+    assert skus[0] == "DSK-100"
+    assert "CHR-100" not in skus
+    assert result["count"] == 3
@@ -0,0 +1,52 @@
+from scripts.compact_ticket_updates import INGESTED_UPDATE_TYPE, _plan
+from shared.ticket_store import update_content_hash
+
+
+def test_content_hash_depends_on_type_and_note():
+    digest = update_content_hash("customer", "Desk arrived damaged")
+
+    assert digest == update_content_hash("customer", "Desk arrived damaged")
+    assert len(digest) == 64
+    assert digest != update_content_hash("agent", "Desk arrived damaged")
+    assert digest != update_content_hash("customer", "Desk arrived damaged ")
+    # The separator keeps type and note from running together.
+    assert update_content_hash("ab", "c") != update_content_hash("a", "bc")
+
+
+def _hash(note):
+    return update_content_hash(INGESTED_UPDATE_TYPE, note)
+
+
+def test_plan_collapses_notes_the_etl_ingested_onto_the_oldest_copy():
+    rows = [
+        # Synced before migration 004, then once more by the full sync.
+        (1, "TCK-1", "hello", None),
+        (2, "TCK-1", "hello", None),
+        (3, "TCK-1", "other", None),
+        (4, "TCK-1", "hello", _hash("hello")),
+        (5, "TCK-2", "hello", _hash("hello")),
+    ]
+
+    delete, backfill = _plan(rows)
+
+    assert delete == [2, 4]
+    assert backfill == [(_hash("hello"), 1)]
+
+
+def test_plan_leaves_repeated_agent_notes_alone():
+    rows = [
+        # An agent-created ticket: its opening note plus the same text added again.
+        (10, "TCK-AGENT", "Desk wobbles", None),
+        (11, "TCK-AGENT", "Desk wobbles", None),
+        # An ingested ticket where an agent repeated a note the ETL never wrote.
+        (12, "TCK-ETL", "issue", _hash("issue")),
+        (13, "TCK-ETL", "Called back", None),
+        (14, "TCK-ETL", "Called back", None),
+    ]
+
+    assert _plan(rows) == ([], [])
+
+
+def test_plan_is_a_no_op_once_compacted():
+    rows = [(7, "TCK-1", "only", _hash("only")), (8, "TCK-2", "only", _hash("only"))]
+    assert _plan(rows) == ([], [])
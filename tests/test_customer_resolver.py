@@ -0,0 +1,151 @@
+import sqlite3
+import unicodedata
+
+import pytest
+
+from shared import customer_resolver, mysql_tools, ticket_store
+from shared.customer_resolver import CustomerResolver
+from shared.ticket_store import SQLiteTicketStore
+
+
+def _mysql_fold(value):
+    stripped = unicodedata.normalize("NFD", value.rstrip(" ").lower())
+    return "".join(char for char in stripped if unicodedata.category(char) != "Mn")
+
+
+def _mysql_ai_ci(left, right):
+    """Accent/case-insensitive PAD SPACE comparison, like utf8mb4_general_ci."""
+    left, right = _mysql_fold(left), _mysql_fold(right)
+    return (left > right) - (left < right)
+
+
+@pytest.fixture
+def cursor():
+    connection = sqlite3.connect(":memory:", isolation_level=None)
+    connection.create_collation("mysql_ai_ci", _mysql_ai_ci)
+    connection.execute(
+        "CREATE TABLE customers ("
+        " customer_id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " email TEXT NOT NULL UNIQUE COLLATE mysql_ai_ci,"
+        " full_name TEXT NOT NULL)"
+    )
+    yield connection.cursor()
+    connection.close()
+
+
+def _rows(cursor):
+    cursor.execute("SELECT customer_id, email, full_name FROM customers ORDER BY customer_id")
+    return cursor.fetchall()
+
+
+def test_resolve_creates_once_then_serves_from_cache(cursor):
+    resolver = CustomerResolver("sqlite")
+
+    customer_id = resolver.resolve(cursor, "ana@example.com", "Ana")
+    assert resolver.resolve(cursor, "ANA@example.com", "Ana") == customer_id
+
+    assert _rows(cursor) == [(customer_id, "ana@example.com", "Ana")]
+    stats = resolver.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_resolve_many_keeps_names_unless_asked_to_update(cursor):
+    resolver = CustomerResolver("sqlite")
+    first = resolver.resolve_many(cursor, {"ana@example.com": "Ana", "bo@example.com": "Bo"})
+
+    resolver.clear()
+    again = resolver.resolve_many(cursor, {"ana@example.com": "Ana B", "cy@example.com": "Cy"})
+    assert again["ana@example.com"] == first["ana@example.com"]
+    assert [row[2] for row in _rows(cursor)] == ["Ana", "Bo", "Cy"]
+
+    resolver.resolve_many(cursor, {"ana@example.com": "Ana B"}, update_names=True)
+    assert _rows(cursor)[0][2] == "Ana B"
+
+
+def test_deferred_entries_are_cached_only_when_remembered(cursor):
+    resolver = CustomerResolver("sqlite")
+    deferred = {}
+
+    ids = resolver.resolve_many(
+        cursor, {"ana@example.com": "Ana", "bo@example.com": "Bo"}, deferred=deferred
+    )
+
+    assert resolver.stats()["entries"] == 0
+    assert {email: entry[0] for email, entry in deferred.items()} == ids
+    resolver.remember(deferred)
+    assert resolver.resolve_many(cursor, {"bo@example.com": "Bo"}) == {
+        "bo@example.com": ids["bo@example.com"]
+    }
+    assert resolver.stats()["hits"] == 1
+
+
+def test_rows_stored_with_another_spelling_resolve_to_the_existing_customer(cursor):
+    cursor.execute(
+        "INSERT INTO customers (email, full_name) VALUES (?, ?), (?, ?)",
+        ("José.Díaz@Example.com  ", "José", "ANA@EXAMPLE.COM", "Ana"),
+    )
+    resolver = CustomerResolver("sqlite")
+
+    ids = resolver.resolve_many(
+        cursor, {"jose.diaz@example.com": "Jose", "ana@example.com": "Ana"}
+    )
+
+    assert ids == {"jose.diaz@example.com": 1, "ana@example.com": 2}
+    assert len(_rows(cursor)) == 2
+
+
+def test_rows_the_fold_misses_are_looked_up_one_by_one(cursor, monkeypatch):
+    cursor.execute(
+        "INSERT INTO customers (email, full_name) VALUES (?, ?)", ("Zoë@example.com", "Zoë")
+    )
+    # A collation rule the key does not model: the email lookup still finds it.
+    monkeypatch.setattr(customer_resolver, "_collation_key", str.lower)
+    resolver = CustomerResolver("sqlite")
+
+    assert resolver.resolve(cursor, "zoe@example.com", "Zoe") == 1
+    assert resolver.stats()["unresolved"] == 0
+
+
+class VanishingRows:
+    """A cursor whose SELECTs come back empty, as if the rows were deleted meanwhile."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, sql, params=()):
+        self.cursor.execute(sql, params)
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        return None
+
+
+def test_emails_that_cannot_be_read_back_are_left_out(cursor):
+    resolver = CustomerResolver("sqlite")
+
+    assert resolver.resolve_many(VanishingRows(cursor), {"ana@example.com": "Ana"}) == {}
+    assert resolver.resolve(VanishingRows(cursor), "bo@example.com", "Bo") is None
+    assert resolver.stats()["unresolved"] == 2
+    assert resolver.stats()["entries"] == 0
+
+
+def test_ticket_tools_report_unresolved_customers(tmp_path, monkeypatch):
+    store = SQLiteTicketStore(str(tmp_path / "tickets.sqlite3"))
+    ticket_store.set_store(store)
+    monkeypatch.setattr(store.customers, "resolve_many", lambda *args, **kwargs: {})
+    try:
+        result = mysql_tools.create_support_ticket(
+            "ana@example.com", "Ana", "Desk", "Wobbles"
+        )
+        with store.connection() as connection:
+            (tickets,) = connection.execute("SELECT COUNT(*) FROM support_tickets").fetchone()
+    finally:
+        ticket_store.set_store(None)
+        store.close_connection()
+
+    assert result == {
+        "error": "Could not create ticket: No customer row matched: ana@example.com"
+    }
+    assert tickets == 0
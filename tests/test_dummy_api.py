@@ -0,0 +1,25 @@
+from scripts import dummy_api
+from scripts.dummy_api import RecordSource
+
+
+def test_updated_since_is_inclusive_of_shared_timestamps(monkeypatch):
+    customers = [
+        {"email": "a@example.com", "updated_at": "2024-12-01T00:00:00Z"},
+        {"email": "b@example.com", "updated_at": "2024-12-01T00:00:05Z"},
+        {"email": "c@example.com", "updated_at": "2024-12-01T00:00:05Z"},
+        {"email": "d@example.com", "updated_at": "2024-12-01T00:00:09Z"},
+    ]
+    monkeypatch.setitem(dummy_api.DATA, "customers", customers)
+    source = RecordSource()
+
+    # A sync whose batch ended on "b" must still see "c", stamped the same second.
+    start = source.first_since("customers", "2024-12-01T00:00:05Z")
+    emails = [record["email"] for record in source.iter_from("customers", start)]
+    assert emails == ["b@example.com", "c@example.com", "d@example.com"]
+    assert source.first_since("customers", "2024-12-01T00:00:10Z") == 4
+
+
+def test_synthetic_records_resume_at_the_watermark():
+    source = RecordSource(synthetic=100)
+    watermark = source.record("tickets", 41)["updated_at"]
+    assert source.first_since("tickets", watermark) == 41
@@ -0,0 +1,70 @@
+import sqlite3
+
+from shared.embedding_cache import EmbeddingCache
+
+
+class Counting:
+    """Deterministic stand-in for the embedder that records which texts it computed."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text, dim):
+        self.calls.append((text, dim))
+        return [len(text) / (index + 1) for index in range(dim)]
+
+
+def _never(text, dim):
+    raise AssertionError(f"recomputed {text!r}")
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = EmbeddingCache(max_entries=2)
+    compute = Counting()
+
+    for text in ("alpha", "beta", "alpha", "gamma", "alpha", "beta"):
+        cache.get(text, 4, compute)
+
+    # "alpha" was refreshed before "gamma" arrived, so "beta" went first, then "gamma".
+    assert [text for text, _ in compute.calls] == ["alpha", "beta", "gamma", "beta"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 4, 2)
+    assert stats["entries"] == 2
+    assert stats["hit_ratio"] == round(2 / 6, 4)
+
+
+def test_dimensions_are_cached_separately():
+    cache = EmbeddingCache()
+    compute = Counting()
+
+    assert cache.get("desk", 2, compute) == [4.0, 2.0]
+    assert cache.get("desk", 3, compute) == [4.0, 2.0, 4 / 3]
+    assert cache.get("desk", 2, _never) == [4.0, 2.0]
+    assert compute.calls == [("desk", 2), ("desk", 3)]
+
+
+def test_sqlite_tier_persists_computed_vectors(tmp_path):
+    path = tmp_path / "embeddings.sqlite3"
+    cache = EmbeddingCache(path=path)
+
+    vector = cache.get("standing desk", 3, Counting())
+
+    assert cache.stats()["disk_writes"] == 1
+    with sqlite3.connect(str(path)) as db:
+        rows = db.execute("SELECT text_hash, dim FROM embeddings").fetchall()
+    assert rows == [EmbeddingCache.key("standing desk", 3)]
+    assert vector == Counting()("standing desk", 3)
+
+
+def test_restarted_cache_serves_misses_from_sqlite(tmp_path):
+    path = tmp_path / "embeddings.sqlite3"
+    expected = EmbeddingCache(path=path).get("standing desk", 3, Counting())
+
+    restarted = EmbeddingCache(path=path)
+    assert restarted.stats()["entries"] == 0
+    assert restarted.get("standing desk", 3, _never) == expected
+    assert restarted.get("standing desk", 3, _never) == expected
+
+    stats = restarted.stats()
+    assert (stats["misses"], stats["disk_hits"], stats["hits"]) == (1, 1, 1)
+    assert stats["disk_writes"] == 0
@@ -0,0 +1,394 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from scripts import etl_sync
+from scripts.dummy_api import DummyHandler, RecordSource
+from scripts.etl_sync import EtlPipeline
+from shared.customer_resolver import CustomerResolver
+
+
+class FakeDatabase:
+    """Just enough of MySQL for the ETL: a customers table plus a statement log."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.customers = {}
+        self.statements = []
+        self.next_id = 1
+        self.failures = []
+
+    def connect(self):
+        return FakeConnection(self)
+
+    def fail(self, needle, errno, times=1):
+        """Raise a MySQL-style error for the next ``times`` statements containing ``needle``."""
+        self.failures.extend([(needle, errno)] * times)
+
+
+class FakeMySQLError(Exception):
+    def __init__(self, errno):
+        super().__init__(f"MySQL error {errno}")
+        self.errno = errno
+
+
+class FakeCursor:
+    def __init__(self, database):
+        self.database = database
+        self.lastrowid = None
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        database = self.database
+        with database.lock:
+            database.statements.append((" ".join(sql.split()), tuple(params)))
+            for position, (needle, errno) in enumerate(database.failures):
+                if needle in sql:
+                    del database.failures[position]
+                    raise FakeMySQLError(errno)
+            if sql.startswith("INSERT INTO customers"):
+                for email, full_name in zip(params[::2], params[1::2]):
+                    if email.lower() not in database.customers:
+                        database.customers[email.lower()] = (database.next_id, full_name)
+                        database.next_id += 1
+            elif sql.startswith("SELECT email, customer_id"):
+                self._rows = [
+                    (email, *database.customers[email.lower()])
+                    for email in params
+                    if email.lower() in database.customers
+                ]
+            elif "etl_ingest_log" in sql and sql.lstrip().startswith("INSERT"):
+                self.lastrowid = 42
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+class FakeConnection:
+    def __init__(self, database):
+        self.database = database
+        self.commits = 0
+        self.rollbacks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def cursor(self):
+        return FakeCursor(self.database)
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def _feed(customers=7, orders=5, tickets=3):
+    emails = [f"customer{number}@example.com" for number in range(customers)]
+    stamp = "2024-12-01T00:00:{:02d}Z".format
+    return {
+        "customers": [
+            {"email": email, "full_name": f"Customer {number}", "updated_at": stamp(number)}
+            for number, email in enumerate(emails)
+        ],
+        "orders": [
+            {
+                "order_id": f"ORD-{number}",
+                "customer_email": emails[number % customers],
+                "status": "shipped",
+                "order_total": 10.0 * number,
+                "ordered_at": "2024-11-30 12:00:00",
+                "updated_at": stamp(number),
+            }
+            for number in range(orders)
+        ],
+        "tickets": [
+            {
+                "ticket_id": f"TCK-{number}",
+                "customer_email": emails[number % customers],
+                "subject": "Desk",
+                "issue": f"Issue {number}",
+                "tags": ["desk"],
+                "updated_at": stamp(number),
+            }
+            for number in range(tickets)
+        ],
+    }
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(etl_sync, "_get_connection", database.connect)
+    monkeypatch.setattr(etl_sync, "CUSTOMERS", CustomerResolver("mysql"))
+    return database
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    feed = _feed()
+    monkeypatch.setattr(
+        etl_sync, "iter_records", lambda base_url, entity, updated_since=None: iter(feed[entity])
+    )
+    return feed
+
+
+def _ingest_status(database):
+    (status,) = [
+        params for sql, params in database.statements if sql.startswith("UPDATE etl_ingest_log")
+    ]
+    return status
+
+
+def test_run_etl_loads_every_entity_and_reports_throughput(database, feed):
+    report = etl_sync.run_etl("http://source", batch_size=2, queue_depth=1)
+
+    assert report["ingest_id"] == 42
+    assert report["records"] == 15
+    for stage in EtlPipeline.STAGES:
+        summary = report["stages"][stage]
+        assert summary["records"] == 15
+        for entity, records in feed.items():
+            stats = summary["entities"][entity]
+            assert stats["records"] == len(records)
+            # One busy-time sample per batch of two.
+            assert stats["batch"]["count"] == (len(records) + 1) // 2
+    loaded, _, status, ingest_id = _ingest_status(database)
+    assert (loaded, status, ingest_id) == (15, "success", 42)
+    assert len(database.customers) == 7
+
+
+def test_order_and_ticket_loaders_wait_for_customers(database, feed, monkeypatch):
+    loaded = []
+    run_batch = etl_sync.BatchLoader.run_batch
+
+    def slow_customers(loader, batch):
+        if batch.entity == "customers":
+            time.sleep(0.05)
+        loaded.append(batch.entity)
+        return run_batch(loader, batch)
+
+    monkeypatch.setattr(etl_sync.BatchLoader, "run_batch", slow_customers)
+    pipeline = EtlPipeline("http://source", 42, {}, batch_size=1, queue_depth=8)
+
+    assert pipeline.run() == 15
+    assert loaded[:7] == ["customers"] * 7
+    assert sorted(loaded[7:]) == ["orders"] * 5 + ["tickets"] * 3
+
+
+def test_full_queues_hold_back_the_fetcher(database, monkeypatch):
+    records = _feed(customers=50, orders=0, tickets=0)
+    monkeypatch.setattr(
+        etl_sync, "iter_records", lambda base_url, entity, updated_since=None: iter(records[entity])
+    )
+    release = threading.Event()
+    run_batch = etl_sync.BatchLoader.run_batch
+
+    def stalled(loader, batch):
+        release.wait(5)
+        return run_batch(loader, batch)
+
+    monkeypatch.setattr(etl_sync.BatchLoader, "run_batch", stalled)
+    pipeline = EtlPipeline("http://source", 42, {}, batch_size=1, queue_depth=1)
+    runner = threading.Thread(target=pipeline.run)
+    runner.start()
+    time.sleep(0.5)
+    fetched = pipeline.stats["fetch"]["customers"].records
+    release.set()
+    runner.join(10)
+
+    # Loader, staged queue, transform, raw queue and fetcher hold one batch each.
+    assert fetched <= 5
+    assert pipeline.stats["fetch"]["customers"].blocked_seconds > 0.3
+    assert pipeline.stats["load"]["customers"].records == 50
+
+
+def test_a_failing_stage_aborts_the_run_and_is_re_raised(database, feed, monkeypatch):
+    def broken(orders):
+        raise RuntimeError("bad order feed")
+
+    monkeypatch.setitem(etl_sync.TRANSFORMS, "orders", broken)
+    started = time.perf_counter()
+
+    with pytest.raises(RuntimeError, match="bad order feed"):
+        etl_sync.run_etl("http://source", batch_size=1, queue_depth=1)
+
+    assert time.perf_counter() - started < 5
+    loaded, _, status, _ = _ingest_status(database)
+    assert status == "failed"
+    assert loaded <= 7
+    # Nothing for orders reached the database.
+    assert not any("INSERT INTO orders" in sql for sql, _ in database.statements)
+
+
+def _executed(database, needle):
+    return [params for sql, params in database.statements if needle in sql]
+
+
+@pytest.fixture
+def loader(database):
+    connection = database.connect()
+    return etl_sync.BatchLoader(connection, 42, "http://source")
+
+
+def test_run_batch_commits_rows_watermark_and_batch_log(database, loader):
+    batch = etl_sync.TRANSFORMS["orders"](_feed()["orders"][:2])
+
+    assert loader.run_batch(batch) == 2
+    assert loader.connection.commits == 1
+    (watermark,) = _executed(database, "INSERT INTO etl_watermarks")
+    assert watermark == ("http://source", "orders", "2024-12-01T00:00:01Z", 42)
+    (logged,) = _executed(database, "INSERT INTO etl_ingest_batches")
+    assert logged[:5] == (42, "orders", 2, 2, "multirow")
+    assert logged[5] >= 0
+    # Customer ids are only cached once the transaction commits.
+    assert etl_sync.CUSTOMERS.stats()["entries"] == 2
+
+
+def test_run_batch_retries_a_deadlocked_transaction(database, loader):
+    batch = etl_sync.TRANSFORMS["orders"](_feed()["orders"][:2])
+    database.fail("INSERT INTO orders", etl_sync.ER_LOCK_DEADLOCK)
+
+    assert loader.run_batch(batch) == 2
+    assert (loader.connection.rollbacks, loader.connection.commits) == (1, 1)
+    assert len(_executed(database, "INSERT INTO orders")) == 2
+    assert len(_executed(database, "INSERT INTO etl_ingest_batches")) == 1
+
+
+def test_run_batch_gives_up_on_other_errors_and_repeated_deadlocks(database, loader):
+    batch = etl_sync.TRANSFORMS["orders"](_feed()["orders"][:2])
+    database.fail("INSERT INTO orders", 1062)
+    with pytest.raises(FakeMySQLError):
+        loader.run_batch(batch)
+    assert loader.connection.rollbacks == 1
+
+    attempts = etl_sync.ETL_DEADLOCK_RETRIES + 1
+    database.fail("INSERT INTO orders", etl_sync.ER_LOCK_DEADLOCK, attempts)
+    with pytest.raises(FakeMySQLError):
+        loader.run_batch(batch)
+    assert loader.connection.rollbacks == 2 + etl_sync.ETL_DEADLOCK_RETRIES
+    assert loader.connection.commits == 0
+    assert not _executed(database, "etl_ingest_batches")
+    assert etl_sync.CUSTOMERS.stats()["entries"] == 0
+
+
+def test_infile_batches_stage_through_a_temporary_table(database, loader):
+    loader.infile_min_rows = 2
+    batch = etl_sync.TRANSFORMS["orders"](_feed()["orders"][:2])
+
+    loader.run_batch(batch)
+
+    statements = [sql.split(" (")[0] for sql, _ in database.statements[2:6]]
+    assert statements == [
+        "CREATE TEMPORARY TABLE IF NOT EXISTS etl_stage_orders LIKE orders",
+        "DELETE FROM etl_stage_orders",
+        "LOAD DATA LOCAL INFILE %s INTO TABLE etl_stage_orders CHARACTER SET utf8mb4 FIELDS"
+        " TERMINATED BY ',' ENCLOSED BY '\"' ESCAPED BY '' LINES TERMINATED BY '\\n'",
+        "INSERT INTO orders",
+    ]
+    assert _executed(database, "etl_ingest_batches")[0][4] == "infile"
+
+
+def test_refused_infile_falls_back_to_multirow_inserts(database, loader):
+    loader.infile_min_rows = 1
+    database.fail("LOAD DATA", 3948)
+    orders = _feed()["orders"]
+
+    loader.run_batch(etl_sync.TRANSFORMS["orders"](orders[:2]))
+    loader.run_batch(etl_sync.TRANSFORMS["orders"](orders[2:]))
+
+    assert loader.infile_min_rows == 0
+    assert len(_executed(database, "LOAD DATA")) == 1
+    assert len(_executed(database, "INSERT INTO orders (")) == 2
+    assert [row[4] for row in _executed(database, "etl_ingest_batches")] == ["multirow"] * 2
+
+
+def test_infile_errors_other_than_a_refusal_are_raised(database, loader):
+    loader.infile_min_rows = 1
+    database.fail("LOAD DATA", 1205)
+
+    with pytest.raises(FakeMySQLError):
+        loader.run_batch(etl_sync.TRANSFORMS["orders"](_feed()["orders"][:2]))
+    assert loader.infile_min_rows == 1
+
+
+def test_a_failing_load_marks_the_run_failed(database, feed):
+    database.fail("INSERT INTO support_tickets", 1452)
+
+    with pytest.raises(FakeMySQLError):
+        etl_sync.run_etl("http://source", batch_size=2)
+
+    loaded, _, status, ingest_id = _ingest_status(database)
+    assert (status, ingest_id) == ("failed", 42)
+    assert loaded < 15
+
+
+class RecordingHandler(DummyHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(parse_qs(urlparse(self.path).query))
+        super().do_GET()
+
+
+@pytest.fixture
+def api(monkeypatch):
+    source = RecordSource(synthetic=25)
+    monkeypatch.setattr(RecordingHandler, "source", source)
+    monkeypatch.setattr(RecordingHandler, "requests", [])
+    monkeypatch.setattr(etl_sync, "ETL_PAGE_SIZE", 10)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", source
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_pages_follow_next_cursor_until_it_runs_out(api, monkeypatch):
+    base_url, source = api
+    monkeypatch.setattr(etl_sync, "ETL_SOURCE_MODE", "pages")
+
+    records = list(etl_sync.iter_records(base_url, "orders"))
+
+    assert records == list(source.iter_from("orders"))
+    # The third page ends the feed with next_cursor=None, so no fourth request.
+    assert [query.get("cursor") for query in RecordingHandler.requests] == [
+        None,
+        ["10"],
+        ["20"],
+    ]
+    assert all(query["limit"] == ["10"] for query in RecordingHandler.requests)
+
+
+def test_stream_reads_one_ndjson_response(api, monkeypatch):
+    base_url, source = api
+    monkeypatch.setattr(etl_sync, "ETL_SOURCE_MODE", "stream")
+
+    records = list(etl_sync.iter_records(base_url, "tickets"))
+
+    assert records == list(source.iter_from("tickets"))
+    assert RecordingHandler.requests == [{"format": ["ndjson"]}]
+
+
+@pytest.mark.parametrize("mode", ["pages", "stream"])
+def test_a_watermark_resumes_at_the_first_record_updated_since(api, monkeypatch, mode):
+    base_url, source = api
+    monkeypatch.setattr(etl_sync, "ETL_SOURCE_MODE", mode)
+    watermark = source.record("customers", 13)["updated_at"]
+
+    records = list(etl_sync.iter_records(base_url, "customers", watermark))
+
+    assert records == list(source.iter_from("customers", 13))
+    assert all(query["updated_since"] == [watermark] for query in RecordingHandler.requests)
@@ -0,0 +1,55 @@
+import json
+import os
+
+from shared.fixtures import FixtureStore
+
+PRODUCTS = [
+    {
+        "sku": "DSK-100",
+        "name": "DriftDesk Pro",
+        "category": "standing-desk",
+        "description": "Electric standing desk.",
+        "tags": ["bamboo"],
+    }
+]
+
+
+def _write(path, payload, mtime_ns):
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _store(tmp_path):
+    _write(tmp_path / "products.json", PRODUCTS, 1_000_000_000)
+    _write(tmp_path / "pricing.json", {"items": {}}, 1_000_000_000)
+    _write(tmp_path / "orders.json", {}, 1_000_000_000)
+    store = FixtureStore(tmp_path)
+    assert store.current().version == 1
+    return store
+
+
+def test_failed_reload_is_retried_without_another_write(tmp_path):
+    store = _store(tmp_path)
+    broken = tmp_path / "orders.json"
+    broken.write_text("{not jsn}", encoding="utf-8")
+    os.utime(broken, ns=(2_000_000_000, 2_000_000_000))
+
+    assert store.reload() is False
+    assert store.stats()["failed_reloads"] == 1
+
+    # Fixed in place with the same mtime and size: only a retry can pick it up.
+    broken.write_text('{"A": 10}', encoding="utf-8")
+    os.utime(broken, ns=(2_000_000_000, 2_000_000_000))
+
+    assert store.reload() is True
+    assert store.current().version == 2
+    assert store.current().orders == {"A": 10}
+
+
+def test_unchanged_content_is_not_reread(tmp_path):
+    store = _store(tmp_path)
+    os.utime(tmp_path / "pricing.json", ns=(3_000_000_000, 3_000_000_000))
+
+    assert store.reload() is False
+    assert store._changed() is False
+    assert store.current().version == 1
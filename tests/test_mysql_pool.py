@@ -0,0 +1,56 @@
+from shared.mysql_pool import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self, fail_rollback=False):
+        self.autocommit = True
+        self.rollbacks = 0
+        self.closed = False
+        self.fail_rollback = fail_rollback
+
+    def is_connected(self):
+        return not self.closed
+
+    def rollback(self):
+        if self.fail_rollback:
+            raise OSError("connection lost")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_checkin_rolls_back_and_restores_autocommit():
+    created = []
+
+    def connector():
+        created.append(FakeConnection())
+        return created[-1]
+
+    pool = ConnectionPool(size=1, max_overflow=0, connector=connector)
+    with pool.connection() as connection:
+        connection.autocommit = False
+
+    assert connection.rollbacks == 1
+    assert connection.autocommit is True
+    with pool.connection() as again:
+        assert again is connection
+    assert len(created) == 1
+
+
+def test_connection_that_cannot_be_reset_is_discarded():
+    created = []
+
+    def connector():
+        created.append(FakeConnection(fail_rollback=not created))
+        return created[-1]
+
+    pool = ConnectionPool(size=1, max_overflow=0, connector=connector)
+    with pool.connection():
+        pass
+
+    assert created[0].closed
+    assert pool.stats()["reset_failures"] == 1
+    assert pool.stats()["open"] == 0
+    with pool.connection() as connection:
+        assert connection is not created[0]
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+from shared import mysql_tools, ticket_store
+from shared.ticket_store import SQLiteTicketStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteTicketStore(str(tmp_path / "tickets.sqlite3"))
+    ticket_store.set_store(store)
+    yield store
+    ticket_store.set_store(None)
+    store.close_connection()
+
+
+def test_cursor_round_trip():
+    row = {"created_at": datetime(2025, 1, 2, 3, 4, 5), "ticket_id": "TCK-00AB"}
+    cursor = mysql_tools._encode_cursor(row)
+
+    assert mysql_tools._decode_cursor(cursor) == ("2025-01-02 03:04:05", "TCK-00AB")
+    # SQLite hands back created_at as text; it must encode the same way.
+    as_text = {"created_at": "2025-01-02 03:04:05", "ticket_id": "TCK-00AB"}
+    assert mysql_tools._encode_cursor(as_text) == cursor
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "W10=", "é"])
+def test_invalid_cursor_is_an_error(cursor):
+    assert mysql_tools.list_open_tickets(cursor=cursor) == {"error": f"Invalid cursor: {cursor}"}
+
+
+def test_pages_cover_every_open_ticket_once(store):
+    tickets = [
+        {
+            "email": f"customer{number % 3}@example.com",
+            "full_name": f"Customer {number % 3}",
+            "subject": f"Issue {number}",
+            "issue": "Details",
+        }
+        for number in range(7)
+    ]
+    created = mysql_tools.create_support_tickets_bulk(tickets)["ticket_ids"]
+
+    seen = []
+    cursor = None
+    while True:
+        page = mysql_tools.list_open_tickets(limit=3, cursor=cursor)
+        seen.extend(ticket["ticket_id"] for ticket in page["tickets"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # One bulk insert shares a created_at, so the ticket_id tiebreak carries the order.
+    assert sorted(seen) == sorted(created)
+    assert len(seen) == len(set(seen))
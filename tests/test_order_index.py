@@ -0,0 +1,107 @@
+import json
+import threading
+
+import pytest
+
+from shared import tools
+from shared.order_index import OrderIndex, build_order_index
+
+
+def _build(tmp_path, orders):
+    source = tmp_path / "orders.json"
+    source.write_text(json.dumps(orders), encoding="utf-8")
+    build_order_index(source, tmp_path / "orders")
+
+
+def test_rebuilt_index_is_picked_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools, "ORDER_INDEX_PATH", str(tmp_path / "orders"))
+    monkeypatch.setattr(tools, "_ORDER_INDEX", None)
+    _build(tmp_path, {"ORD-1": {"status": "processing"}})
+    assert tools._lookup_order("ORD-1") == {"status": "processing"}
+
+    _build(tmp_path, {"ORD-1": {"status": "shipped"}, "ORD-2": {"status": "processing"}})
+    assert tools._lookup_order("ORD-1") == {"status": "shipped"}
+    assert tools._lookup_order("ORD-2") == {"status": "processing"}
+
+
+def test_concurrent_first_lookups_open_one_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(tools, "ORDER_INDEX_PATH", str(tmp_path / "orders"))
+    monkeypatch.setattr(tools, "_ORDER_INDEX", None)
+    _build(tmp_path, {"ORD-1": {"status": "processing"}})
+    opened = []
+    original_init = OrderIndex.__init__
+
+    def counting_init(self, prefix):
+        opened.append(prefix)
+        original_init(self, prefix)
+
+    monkeypatch.setattr(OrderIndex, "__init__", counting_init)
+    start = threading.Barrier(8)
+
+    def lookup():
+        start.wait()
+        tools._lookup_order("ORD-1")
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(opened) == 1
+
+
+def test_lookups_stay_consistent_while_the_index_is_rebuilt(tmp_path, monkeypatch):
+    prefix = tmp_path / "orders"
+    monkeypatch.setattr(tools, "ORDER_INDEX_PATH", str(prefix))
+    monkeypatch.setattr(tools, "_ORDER_INDEX", None)
+    # The two builds lay records out differently, so a key table from one
+    # over the data of the other would point at the wrong bytes.
+    builds = [
+        {f"ORD-{n}": {"status": "shipped", "pad": "x" * n} for n in range(50)},
+        {f"ORD-{n}": {"status": "delivered", "pad": "y" * (50 - n)} for n in range(50)},
+    ]
+    valid = {order_id: [build[order_id] for build in builds] for order_id in builds[0]}
+    _build(tmp_path, builds[0])
+
+    done = threading.Event()
+    errors = []
+
+    def rebuild():
+        for round_number in range(60):
+            source = tmp_path / f"orders-{round_number % 2}.json"
+            source.write_text(json.dumps(builds[round_number % 2]), encoding="utf-8")
+            build_order_index(source, prefix)
+        done.set()
+
+    def read(fresh):
+        while not done.is_set():
+            try:
+                index = OrderIndex(prefix) if fresh else None
+                for order_id in ("ORD-3", "ORD-47"):
+                    order = index.get(order_id) if fresh else tools._lookup_order(order_id)
+                    if order not in valid[order_id]:
+                        errors.append((order_id, order))
+                if fresh:
+                    index.close()
+            except Exception as exc:
+                errors.append(exc)
+
+    threads = [threading.Thread(target=rebuild)]
+    threads += [threading.Thread(target=read, args=(fresh,)) for fresh in (True, True, False)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_index_from_another_build_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr("shared.order_index.OPEN_ATTEMPTS", 2)
+    monkeypatch.setattr("shared.order_index.OPEN_RETRY_SECONDS", 0)
+    _build(tmp_path, {"ORD-1": {"status": "processing"}})
+    stale = (tmp_path / "orders.dat").read_bytes()
+    _build(tmp_path, {"ORD-1": {"status": "shipped"}})
+    (tmp_path / "orders.dat").write_bytes(stale)
+
+    with pytest.raises(ValueError, match="different builds"):
+        OrderIndex(tmp_path / "orders")
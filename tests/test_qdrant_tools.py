@@ -0,0 +1,60 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from shared import qdrant_tools
+
+
+@pytest.fixture
+def resets(monkeypatch):
+    calls = []
+    monkeypatch.setattr(qdrant_tools, "_get_client", lambda: object())
+    monkeypatch.setattr(qdrant_tools, "reset_client", lambda: calls.append(1))
+    return calls
+
+
+def test_transport_error_reconnects_and_retries(resets):
+    attempts = []
+
+    def operation(client):
+        attempts.append(client)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connection reset")
+        return "ok"
+
+    assert qdrant_tools._call(operation) == "ok"
+    assert len(attempts) == 2
+    assert len(resets) == 1
+
+
+def test_server_errors_are_not_retried(resets):
+    attempts = []
+
+    def operation(client):
+        attempts.append(client)
+        raise ValueError("Not found: collection missing")
+
+    with pytest.raises(ValueError):
+        qdrant_tools._call(operation)
+    assert len(attempts) == 1
+    assert resets == []
+
+
+def test_start_warm_up_does_not_block(monkeypatch):
+    release = threading.Event()
+
+    def slow_warm_up():
+        release.wait(5)
+        return {"status": "ok"}
+
+    monkeypatch.setattr(qdrant_tools, "warm_up", slow_warm_up)
+    monkeypatch.setattr(qdrant_tools, "_WARM_UP_THREAD", None)
+    started = time.perf_counter()
+    thread = qdrant_tools.start_warm_up()
+    assert time.perf_counter() - started < 1
+    assert qdrant_tools.start_warm_up() is None  # already running
+    release.set()
+    thread.join(5)
+    assert qdrant_tools.client_stats()["warm_up"] == {"status": "ok"}
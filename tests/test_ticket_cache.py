@@ -0,0 +1,39 @@
+from shared.ticket_cache import TicketCache
+
+
+def _view(ticket_id, status="open"):
+    return {"ticket": {"ticket_id": ticket_id, "status": status}, "updates": [{"note": "hi"}]}
+
+
+def test_write_during_load_keeps_stale_view_out_of_cache():
+    cache = TicketCache()
+    loads = []
+
+    def load_racing_a_write(ticket_id):
+        loads.append(ticket_id)
+        view = _view(ticket_id)
+        # A writer commits and invalidates while this read is in flight.
+        cache.invalidate(ticket_id)
+        return view
+
+    assert cache.get("TCK-1", load_racing_a_write)["ticket"]["status"] == "open"
+    assert cache.stats()["entries"] == 0
+    assert cache._generations == {}
+
+    fresh = cache.get("TCK-1", lambda ticket_id: _view(ticket_id, "closed"))
+    assert fresh["ticket"]["status"] == "closed"
+    # Now cached: the racing loader is not called again.
+    assert cache.get("TCK-1", load_racing_a_write)["ticket"]["status"] == "closed"
+    assert loads == ["TCK-1"]
+
+
+def test_callers_cannot_mutate_cached_views():
+    cache = TicketCache()
+    first = cache.get("TCK-1", _view)
+    first["ticket"]["status"] = "closed"
+    first["updates"][0]["note"] = "changed"
+
+    cached = cache.get("TCK-1", _view)
+    assert cached["ticket"]["status"] == "open"
+    assert cached["updates"][0]["note"] == "hi"
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,62 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from shared import mysql_tools, ticket_store
+from shared.ticket_store import SQLiteTicketStore, TicketStore
+
+
+def _ticket(number):
+    return {
+        "email": f"customer{number}@example.com",
+        "full_name": f"Customer {number}",
+        "subject": "Wobbly desk",
+        "issue": "The desk wobbles at full height.",
+        "priority": "normal",
+        "channel": "email",
+        "tags": ["hardware"],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteTicketStore(str(tmp_path / "tickets.sqlite3"))
+    ticket_store.set_store(store)
+    yield store
+    ticket_store.set_store(None)
+    store.close_connection()
+
+
+def test_new_ticket_ids_are_wide_and_unique():
+    ids = ticket_store._new_ticket_ids(50_000)
+    assert len(set(ids)) == len(ids)
+    assert all(len(ticket_id) == 20 and ticket_id.startswith("TCK-") for ticket_id in ids)
+
+
+def test_bulk_create_reports_database_errors(store, monkeypatch):
+    created = mysql_tools.create_support_tickets_bulk([_ticket(1)])
+    assert created["count"] == 1
+
+    taken = created["ticket_ids"]
+    monkeypatch.setattr(ticket_store, "_new_ticket_ids", lambda count: taken * count)
+    result = mysql_tools.create_support_tickets_bulk([_ticket(2), _ticket(3)])
+
+    assert "UNIQUE" in result["error"]
+    assert mysql_tools.create_support_ticket(**_ticket(4)).keys() == {"error"}
+
+
+def test_store_backends_must_supply_connection_handling():
+    class Incomplete(TicketStore):
+        def connection(self):
+            raise AssertionError
+
+    with pytest.raises(TypeError, match="_begin"):
+        Incomplete()
+
+
+@pytest.mark.skipif("TICKET_SQLITE_PATH" in os.environ, reason="path set by the environment")
+def test_default_sqlite_path_is_anchored_to_the_repo():
+    path = Path(SQLiteTicketStore().path)
+    assert path.is_absolute()
+    assert path.parent == ticket_store.REPO_ROOT
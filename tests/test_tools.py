@@ -0,0 +1,48 @@
+import pytest
+
+from shared.tools import pricing_table, quote_cart, quote_cart_bulk
+
+ORDERS = [
+    # BUNDLE10 needs a $300 subtotal: three lamps reach it, two do not.
+    [("LMP-300", 3)],
+    [("LMP-300", 2)],
+    # Quantities below one count as one; unknown SKUs are skipped.
+    [("ACC-410", 0), ("NOPE-1", 2), ("DSK-100", 1)],
+    [("CHR-210", 5), ("DSK-120", 2), ("ACC-410", -3), ("NOPE-2", 1)],
+]
+
+
+@pytest.mark.parametrize("promo_code", [None, "BUNDLE10", "bundle10", "FREESHIP", "NOPE"])
+def test_bulk_quote_matches_quote_cart_line_for_line(promo_code):
+    skus, _ = pricing_table()
+    position = {sku: index for index, sku in enumerate(skus)}
+    lines = [(order, sku, quantity) for order, cart in enumerate(ORDERS) for sku, quantity in cart]
+
+    bulk = quote_cart_bulk(
+        [position.get(sku, -1) for _, sku, _ in lines],
+        [quantity for _, _, quantity in lines],
+        order_index=[order for order, _, _ in lines],
+        promo_code=promo_code,
+    )
+
+    for order, cart in enumerate(ORDERS):
+        cart_lines = [{"sku": sku, "quantity": quantity} for sku, quantity in cart]
+        quote = quote_cart(cart_lines, promo_code)
+        rows = [row for row, line in enumerate(lines) if line[0] == order]
+        known = [row for row in rows if not bulk["unknown"][row]]
+        assert [bulk["line_totals"][row] for row in known] == [
+            line["line_total"] for line in quote["lines"]
+        ]
+        assert [lines[row][1] for row in rows if bulk["unknown"][row]] == quote["unknown_skus"]
+        assert bulk["order_subtotals"][order] == quote["subtotal"]
+        assert bulk["order_discounts"][order] == quote["discount"]
+        assert bulk["order_totals"][order] == quote["total"]
+
+
+def test_unknown_positions_do_not_wrap_around_the_price_table():
+    skus, _ = pricing_table()
+
+    result = quote_cart_bulk([-1, len(skus)], [2, 2])
+
+    assert list(result["unknown"]) == [True, True]
+    assert list(result["line_totals"]) == [0.0, 0.0]
@@ -0,0 +1,225 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from shared import mysql_tools, ticket_store, update_queue
+from shared.ticket_store import SQLiteTicketStore
+from shared.update_queue import UpdateQueue
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteTicketStore(str(tmp_path / "tickets.sqlite3"))
+    yield store
+    store.close_connection()
+
+
+@pytest.fixture
+def ticket_id(store):
+    ticket = {"email": "a@example.com", "full_name": "A", "subject": "Desk", "issue": "Wobbles"}
+    (ticket_id,) = store.create_tickets([ticket])
+    return ticket_id
+
+
+class Unavailable:
+    """Wraps a store; writes fail with a transient error while ``failing(call)`` is true."""
+
+    def __init__(self, store, failing=lambda call: True):
+        self.store = store
+        self.failing = failing
+        self.calls = 0
+
+    def add_updates(self, rows):
+        self.calls += 1
+        if self.failing(self.calls):
+            raise sqlite3.OperationalError("database is locked")
+        self.store.add_updates(rows)
+
+    def is_transient(self, exc):
+        return self.store.is_transient(exc)
+
+
+def _notes(store, ticket_id):
+    with store.connection() as connection:
+        rows = connection.execute(
+            "SELECT note FROM ticket_updates WHERE ticket_id = ? ORDER BY update_id", (ticket_id,)
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def _queue(store, tmp_path, **options):
+    options.setdefault("max_delay_ms", 10_000)
+    return UpdateQueue(
+        store,
+        max_batch=4,
+        max_attempts=2,
+        retry_backoff=0,
+        spill_path=tmp_path / "spill.jsonl",
+        dead_letter_path=tmp_path / "dead.jsonl",
+        **options,
+    )
+
+
+def _dead_letters(tmp_path):
+    return [json.loads(line) for line in (tmp_path / "dead.jsonl").read_text().splitlines()]
+
+
+def test_bad_row_is_dead_lettered_and_the_rest_commit(store, ticket_id, tmp_path):
+    queue = _queue(store, tmp_path)
+    for note in ("one", "two"):
+        queue.submit(ticket_id, "note", note)
+    queue.submit("TCK-MISSING", "note", "orphan")
+    queue.submit(ticket_id, "note", "three")
+    assert queue.flush(timeout=5)
+    queue.close()
+
+    assert _notes(store, ticket_id)[-3:] == ["one", "two", "three"]
+    (dead,) = _dead_letters(tmp_path)
+    assert dead["update"] == ["TCK-MISSING", "note", "orphan"]
+    assert "IntegrityError" in dead["error"]
+    stats = queue.stats()
+    assert stats["flushed"] == 3 and stats["dead_lettered"] == 1
+
+
+def test_transient_errors_are_retried_past_max_attempts(store, ticket_id, tmp_path):
+    flaky = Unavailable(store, lambda call: call <= 5)
+    queue = _queue(flaky, tmp_path)
+    queue.submit(ticket_id, "note", "eventually")
+    assert queue.flush(timeout=5)
+    queue.close()
+
+    assert _notes(store, ticket_id)[-1] == "eventually"
+    assert flaky.calls == 6
+    assert queue.stats()["dead_lettered"] == 0
+
+
+def test_unwritten_updates_spill_and_replay_on_next_start(store, ticket_id, tmp_path):
+    queue = _queue(Unavailable(store), tmp_path, max_delay_ms=0)
+    for note in ("one", "two", "three"):
+        queue.submit(ticket_id, "note", note)
+    queue.close(timeout=5)
+    assert queue.stats()["spilled"] == 3
+
+    # A truncated line from a crash mid-write is dead-lettered, not retried forever.
+    with (tmp_path / "spill.jsonl").open("a") as handle:
+        handle.write('["TCK-')
+
+    replay = _queue(store, tmp_path)
+    replay.start()
+    replay.close()
+
+    assert _notes(store, ticket_id)[-3:] == ["one", "two", "three"]
+    assert not (tmp_path / "spill.jsonl").exists()
+    assert replay.stats()["replayed"] == 3
+    assert _dead_letters(tmp_path)[0]["update"] == '["TCK-'
+
+
+def test_replay_keeps_only_rows_it_could_not_write(store, ticket_id, tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    spill.write_text(
+        "".join(json.dumps([ticket_id, "note", f"note {n}"]) + "\n" for n in range(6))
+    )
+    # The first batch of four commits, then the store goes away.
+    queue = _queue(Unavailable(store, lambda call: call > 1), tmp_path)
+    queue._replay_spill()
+
+    assert _notes(store, ticket_id)[-4:] == [f"note {n}" for n in range(4)]
+    assert [json.loads(line)[2] for line in spill.read_text().splitlines()] == ["note 4", "note 5"]
+    assert queue.stats()["replayed"] == 4
+
+
+class Gated:
+    """Wraps a store; every write waits until ``opened`` is set and announces it started."""
+
+    def __init__(self, store):
+        self.store = store
+        self.writing = threading.Event()
+        self.opened = threading.Event()
+
+    def add_updates(self, rows):
+        self.writing.set()
+        self.opened.wait(5)
+        time.sleep(0.01)
+        self.store.add_updates(rows)
+
+    def is_transient(self, exc):
+        return self.store.is_transient(exc)
+
+
+def _spill_notes(tmp_path, ticket_id, count):
+    (tmp_path / "spill.jsonl").write_text(
+        "".join(json.dumps([ticket_id, "note", f"note {n}"]) + "\n" for n in range(count))
+    )
+
+
+def test_workers_sharing_a_spill_replay_it_once(store, ticket_id, tmp_path):
+    _spill_notes(tmp_path, ticket_id, 6)
+    gated = Gated(store)
+    gated.opened.set()
+    workers = [_queue(gated, tmp_path) for _ in range(2)]
+
+    starts = [threading.Thread(target=worker.start) for worker in workers]
+    for thread in starts:
+        thread.start()
+    for thread in starts:
+        thread.join()
+    for worker in workers:
+        worker.close()
+
+    assert _notes(store, ticket_id)[-6:] == [f"note {n}" for n in range(6)]
+    assert _notes(store, ticket_id).count("note 0") == 1
+    assert sum(worker.stats()["replayed"] for worker in workers) == 6
+    assert not (tmp_path / "spill.jsonl").exists()
+
+
+def test_rows_spilled_during_a_replay_are_kept(store, ticket_id, tmp_path):
+    _spill_notes(tmp_path, ticket_id, 2)
+    # Already running (its own replay found the store down and kept the file).
+    closing = _queue(Unavailable(store), tmp_path, max_delay_ms=0)
+    closing.start()
+    gated = Gated(store)
+    replaying = _queue(gated, tmp_path)
+    replay = threading.Thread(target=replaying.start)
+    replay.start()
+    assert gated.writing.wait(5)
+
+    # The other worker shuts down mid-replay with a note it could not write.
+    closing.submit(ticket_id, "note", "late")
+    closer = threading.Thread(target=closing.close, kwargs={"timeout": 5})
+    closer.start()
+    time.sleep(0.1)
+    gated.opened.set()
+    replay.join()
+    closer.join()
+    replaying.close()
+
+    assert _notes(store, ticket_id)[-2:] == ["note 0", "note 1"]
+    lines = (tmp_path / "spill.jsonl").read_text().splitlines()
+    assert [json.loads(line)[2] for line in lines] == ["late"]
+
+
+def test_spill_without_a_path_drops_instead_of_raising(store, tmp_path):
+    queue = UpdateQueue(Unavailable(store), max_delay_ms=0, retry_backoff=0)
+    queue.submit("TCK-1", "note", "lost")
+    queue.close(timeout=5)
+
+    assert queue.stats()["dropped"] == 1
+
+
+def test_close_ticket_commits_queued_notes_first(store, ticket_id, tmp_path, monkeypatch):
+    queue = _queue(store, tmp_path, on_flush=mysql_tools._invalidate_tickets)
+    monkeypatch.setattr(ticket_store, "_STORE", store)
+    monkeypatch.setattr(ticket_store, "_STORE_PID", os.getpid())
+    monkeypatch.setattr(update_queue, "_QUEUE", queue)
+    monkeypatch.setattr(update_queue, "_QUEUE_PID", os.getpid())
+    monkeypatch.setattr(mysql_tools, "WRITE_BEHIND_ENABLED", True)
+
+    assert mysql_tools.add_ticket_update(ticket_id, "note", "queued")["status"] == "queued"
+    assert mysql_tools.close_ticket(ticket_id, "resolved")["status"] == "closed"
+    queue.close()
+
+    assert _notes(store, ticket_id)[-2:] == ["queued", "resolved"]
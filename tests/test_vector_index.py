@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from scripts.bench_embed import _descriptions
+from shared.qdrant_tools import embed_batch
+from shared.vector_index import ExactIndex, GraphIndex, QuantizedIndex, quantize_int8
+
+CATALOG_SIZE = 20_000
+QUERIES = 100
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    vectors = embed_batch(_descriptions(CATALOG_SIZE))
+    payloads = [{"row": row} for row in range(CATALOG_SIZE)]
+    queries = embed_batch(_descriptions(QUERIES, seed=CATALOG_SIZE + 1))
+    exact = ExactIndex(vectors, payloads)
+    truth = [[hit[1]["row"] for hit in exact.search(query, 10)] for query in queries]
+    return vectors, payloads, queries, truth
+
+
+def _recall(index, queries, truth):
+    hits = 0
+    for query, expected in zip(queries, truth):
+        found = [hit[1]["row"] for hit in index.search(query, 10)]
+        assert len(found) == len(set(found)) == 10
+        hits += len(set(found) & set(expected))
+    return hits / (len(truth) * 10)
+
+
+def test_graph_index_recall_matches_exact_search(catalog):
+    vectors, payloads, queries, truth = catalog
+    assert _recall(GraphIndex(vectors, payloads), queries, truth) >= 0.95
+
+
+def test_graph_search_reaches_neighbours_outside_the_seed_clusters(catalog):
+    vectors, payloads, queries, truth = catalog
+    # Two seed clusters cover ~1% of the catalog; the beam search must find the rest.
+    index = GraphIndex(vectors, payloads, entry_clusters=2)
+    assert _recall(index, queries, truth) >= 0.95
+
+
+def test_int8_codes_stay_within_half_a_scale_step(catalog):
+    vectors = catalog[0][:1000].copy()
+    vectors[0] = 0.0
+
+    codes, scales = quantize_int8(vectors)
+
+    assert codes.dtype == np.int8 and scales.dtype == np.float32
+    assert np.abs(codes).max(axis=1)[1:].min() == 127
+    error = np.abs(codes * scales[:, None] - vectors)
+    assert np.all(error <= scales[:, None] / 2 + 1e-6)
+    # An all-zero vector must not divide by zero.
+    assert scales[0] == 1.0 and not codes[0].any()
+
+
+def test_quantized_index_with_rescoring_matches_exact_search(catalog):
+    vectors, payloads, queries, truth = catalog
+    index = QuantizedIndex(vectors, payloads, rescore=lambda rows: vectors[rows])
+
+    assert _recall(index, queries, truth) >= 0.99
+    score, payload = index.search(queries[0], 1)[0]
+    # Rescored hits carry the full-precision similarity.
+    assert score == pytest.approx(float(vectors[payload["row"]] @ queries[0]), rel=1e-5)